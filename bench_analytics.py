@@ -0,0 +1,114 @@
+"""Time the stats, first sorted screen and histogram window against the old code.
+
+The "before" functions are the original implementations from movies.py:
+each re-reads the JSON file and works through the list of dicts. The
+"after" numbers call the current movies.py functions, first on a cold
+store (loading the file and building its indexes) and
+then on a warm one, as repeated menu actions do.
+
+Usage: python bench_analytics.py [number_of_movies]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from itertools import islice
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+import movie_storage
+import movies
+from bench_common import synthetic_movies
+
+# Lines of the sorted listing the pager shows first.
+SCREEN = 20
+
+
+def timed(label, func, repeat=3):
+    best = min(_once(func) for _ in range(repeat))
+    print(f"{label:<36} {best * 1000:10.2f} ms")
+    return best
+
+
+def _once(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def load_movies():
+    """The original movie_storage.load_movies(): the whole file, every call."""
+    with open(movie_storage.MOVIES_FILE, "r", encoding="utf-8") as file:
+        return json.load(file).get("movies", [])
+
+
+def before_get_stats():
+    movies = load_movies()
+    ratings = [movie["rating"] for movie in movies]
+    try:
+        mode_rating = statistics.mode(ratings)
+    except statistics.StatisticsError:
+        mode_rating = "No unique mode"
+    max_rating = max(ratings)
+    min_rating = min(ratings)
+    return {
+        "total_movies": len(movies),
+        "average_rating": round(statistics.mean(ratings), 2),
+        "median_rating": round(statistics.median(ratings), 2),
+        "mode_rating": mode_rating,
+        "highest_rated": [m for m in movies if m["rating"] == max_rating],
+        "lowest_rated": [m for m in movies if m["rating"] == min_rating],
+    }
+
+
+def before_sorted_by_rating():
+    return sorted(load_movies(), key=lambda x: x["rating"], reverse=True)[:SCREEN]
+
+
+def sorted_first_screen():
+    return list(islice(movie_storage.iter_movies_by_rating(), SCREEN))
+
+
+def before_histogram():
+    ratings = [movie["rating"] for movie in load_movies()]
+    plt.hist(ratings, bins=10, edgecolor="black")
+    plt.xlabel("Ratings")
+    plt.ylabel("Number of Movies")
+    plt.title("Movie Ratings Distribution")
+    plt.show()
+
+
+def cold(func):
+    def run():
+        movie_storage._store = None  # the next call loads the file again
+        func()
+    return run
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    plt.show = plt.close  # draw the figure, then drop it
+    with tempfile.TemporaryDirectory() as directory:
+        movie_storage.MOVIES_FILE = os.path.join(directory, "data.json")
+        movie_storage.JsonBackend(movie_storage.MOVIES_FILE).save(synthetic_movies(n))
+        print(f"{n} movies")
+        speedups = []
+        for name, before, after in (
+                ("stats", before_get_stats, movies.get_stats),
+                ("sorted screen", before_sorted_by_rating, sorted_first_screen),
+                ("histogram window", before_histogram, movies.show_ratings_histogram)):
+            old = timed(f"{name}: before", before)
+            timed(f"{name}: after, cold store", cold(after))
+            after()
+            new = timed(f"{name}: after, warm store", after)
+            speedups.append((name, old / new))
+        for name, speedup in speedups:
+            print(f"{name + ' speedup (warm):':<36} {speedup:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
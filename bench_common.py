@@ -0,0 +1,12 @@
+"""Shared helpers for the bench_*.py scripts."""
+import random
+from typing import List
+
+from movie_record import Movie
+
+
+def synthetic_movies(n: int, seed: int = 0) -> List[Movie]:
+    """Return n movies titled "Movie 0".. with random ratings and years."""
+    rng = random.Random(seed)
+    return [Movie(f"Movie {i}", round(rng.uniform(0, 10), 1), rng.randint(1900, 2024))
+            for i in range(n)]
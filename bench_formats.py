@@ -0,0 +1,83 @@
+"""Compare save, load and cold random-pick time and file size of the snapshot formats.
+
+Usage: python bench_formats.py [number_of_movies ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import movie_formats
+import movie_storage
+from bench_common import synthetic_movies
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def formats():
+    for fmt in movie_formats.SNAPSHOT_FORMATS:
+        if fmt == "jsonl-zstd":
+            try:
+                movie_formats._zstandard()
+            except ValueError:
+                continue
+        yield fmt
+
+
+def bench(n, directory):
+    movies = synthetic_movies(n)
+    path = os.path.join(directory, "data.snapshot")
+    print(f"\n{n} movies")
+    print(f"{'format':<24} {'save ms':>10} {'load ms':>10} {'pick ms':>10} {'size KiB':>10}")
+
+    def json_dump():
+        data = {"version": 1, "movies": [m.to_dict() for m in movies]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+    def json_load():
+        with open(path, encoding="utf-8") as f:
+            json.load(f)
+
+    rows = [("json.dump (before)", json_dump, json_load)]
+    for fmt in formats():
+        def save(fmt=fmt):
+            with open(path, "wb") as f:
+                movie_formats.write_snapshot(f, movies, 1, fmt)
+
+        def load():
+            for _ in movie_formats.read_snapshot(path):
+                pass
+
+        rows.append((fmt, save, load))
+
+    def pick():
+        # a fresh store, as in a new process
+        movie_storage.MovieStore(path).random_movie()
+
+    for label, save, load in rows:
+        save_time = timed(save)
+        load_time = timed(load)
+        pick_time = timed(pick)
+        size = os.path.getsize(path)
+        print(f"{label:<24} {save_time * 1000:10.1f} {load_time * 1000:10.1f}"
+              f" {pick_time * 1000:10.1f} {size / 1024:10.0f}")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            bench(n, directory)
+
+
+if __name__ == "__main__":
+    main()
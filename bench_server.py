@@ -0,0 +1,161 @@
+"""Load-test the JSON server with keep-alive connections and report latencies.
+
+Usage: python bench_server.py [--url http://host:port] [--movies N]
+                              [--connections C] [--requests R] [--writes FRACTION]
+
+Without --url, a server is started on a free port over a temporary
+database of --movies synthetic movies, and stopped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+import movie_storage
+from bench_common import synthetic_movies
+
+MOVIES_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "movies.py")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length:
+            await self.reader.readexactly(length)
+        return status
+
+    def close(self):
+        self.writer.close()
+
+
+def make_request(rng, n, writes, counter):
+    """Return (kind, method, path, payload) for one random request."""
+    if rng.random() < writes:
+        if rng.random() < 0.5:
+            counter[0] += 1
+            return "write", "POST", "/movies", {"title": f"Bench {os.getpid()} {counter[0]}",
+                                                 "rating": round(rng.uniform(0, 10), 1),
+                                                 "year": 2000}
+        return ("write", "PATCH", "/movies/" + quote(f"Movie {rng.randrange(n)}"),
+                {"rating": round(rng.uniform(0, 10), 1)})
+    choice = rng.random()
+    if choice < 0.3:
+        return "read", "GET", "/movies/" + quote(f"Movie {rng.randrange(n)}"), None
+    if choice < 0.5:
+        return "read", "GET", "/random?min_rating=8", None
+    if choice < 0.7:
+        return "read", "GET", f"/search?q={quote(f'movie {rng.randrange(n)}')}", None
+    if choice < 0.9:
+        return "read", "GET", "/movies?limit=20", None
+    return "read", "GET", "/stats", None
+
+
+async def load(host, port, n, connections, requests, writes):
+    latencies = {"read": [], "write": []}
+    errors = 0
+    counter = [0]
+    remaining = [requests]
+
+    async def worker(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        client = Client(host, port)
+        await client.connect()
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                kind, method, path, payload = make_request(rng, n, writes, counter)
+                start = time.perf_counter()
+                status = await client.request(method, path, payload)
+                latencies[kind].append(time.perf_counter() - start)
+                if status >= 500:
+                    errors += 1
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(latencies, errors, elapsed):
+    total = sum(map(len, latencies.values()))
+    print(f"{total} requests in {elapsed:.2f} s, {total / elapsed:.0f} req/s, {errors} errors")
+    print(f"{'kind':<8} {'count':>8} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    everything = sorted(value for values in latencies.values() for value in values)
+    for kind, values in list(latencies.items()) + [("all", everything)]:
+        values = sorted(values)
+        if values:
+            print(f"{kind:<8} {len(values):8} {percentile(values, 0.5) * 1000:10.2f}"
+                  f" {percentile(values, 0.99) * 1000:10.2f} {values[-1] * 1000:10.2f}")
+
+
+def start_server(directory, n):
+    movie_storage.JsonBackend(os.path.join(directory, "data.json")).save(synthetic_movies(n))
+    server = subprocess.Popen([sys.executable, MOVIES_PY, "--no-color", "serve", "--port", "0"],
+                              cwd=directory, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line:
+        raise SystemExit("The server did not start.")
+    return server, urlsplit(line.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="an already running server")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--writes", type=float, default=0.1, help="fraction of writes")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if args.url:
+            url = urlsplit(args.url)
+        else:
+            server, url = start_server(directory, args.movies)
+        try:
+            print(f"{args.connections} connections, {args.writes:.0%} writes, "
+                  f"{args.movies} movies")
+            report(*asyncio.run(load(url.hostname, url.port, args.movies, args.connections,
+                                     args.requests, args.writes)))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time a full website build with an increasing number of worker processes.
+
+Usage: python bench_website.py [number_of_movies ...]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import movie_website
+from bench_common import synthetic_movies
+
+
+def site_digest(directory):
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            digest.update(name.encode() + f.read())
+    return digest.hexdigest()
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    count = 1
+    while count < cores:
+        yield count
+        count *= 2
+    yield cores
+
+
+def bench(n, directory):
+    movies = synthetic_movies(n)
+    print(f"\n{n} movies, {movie_website.PAGE_SIZE} per page, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'build s':>10} {'speedup':>10}  output")
+    baseline = reference = None
+    for workers in worker_counts():
+        output = os.path.join(directory, f"site-{workers}")
+        start = time.perf_counter()
+        movie_website.generate_website(output, movies, workers=workers)
+        elapsed = time.perf_counter() - start
+        digest = site_digest(output)
+        baseline = baseline or elapsed
+        reference = reference or digest
+        same = "identical" if digest == reference else "DIFFERENT"
+        print(f"{workers:8} {elapsed:10.2f} {baseline / elapsed:9.1f}x  {same}")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            bench(n, directory)
+
+
+if __name__ == "__main__":
+    main()
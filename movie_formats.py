@@ -0,0 +1,539 @@
+import csv
+import io
+import json
+import mmap
+import os
+import re
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from movie_record import Movie, normalize_title
+
+# Import/export formats by file extension.
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+CSV_FIELDS = ("title", "rating", "year")
+
+# Characters read at a time when streaming a JSON snapshot.
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Snapshot encodings. "json" is the original pretty-printed layout.
+SNAPSHOT_FORMATS = ("json", "json-compact", "jsonl-gzip", "jsonl-zstd", "binary")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+BINARY_MAGIC = b"MOVB"
+# magic, layout version, database version, movie count
+BINARY_HEADER = struct.Struct("<4sHQQ")
+BINARY_LAYOUT = 2
+
+# Records are encoded and written this many at a time.
+WRITE_BATCH = 10000
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Return fmt, or the format implied by the file extension."""
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Unsupported file type: {path} (use .csv or .jsonl)")
+    return fmt
+
+
+def read_movies(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield movie dicts from a CSV or JSON lines file, one row at a time.
+
+    CSV files need a header row naming title, rating and year; their values
+    come back as strings. Blank JSON lines are skipped; any other line
+    must hold a JSON object.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                movie = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"Line {number}: {error}") from None
+            if not isinstance(movie, dict):
+                raise ValueError(f"Line {number}: expected a JSON object")
+            yield movie
+
+
+def write_movies(path: str, movies: Iterable[Any], fmt: Optional[str] = None) -> int:
+    """Write movies to a CSV or JSON lines file; returns how many were written."""
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            for movie in movies:
+                writer.writerow([movie[field] for field in CSV_FIELDS])
+                count += 1
+        else:
+            for movie in movies:
+                file.write(json.dumps(dict(movie)) + "\n")
+                count += 1
+    return count
+
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_SEPARATOR = re.compile(r"[ \t\r\n]*([,\]])[ \t\r\n]*")
+
+
+class _JsonReader:
+    """Decodes JSON values one at a time from a file read in chunks."""
+
+    def __init__(self, file, chunk_size: int) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = 0) -> None:
+        chunk = self.file.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, or "" at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete value, reading more input as needed.
+
+        A value that runs to the end of the buffer may be cut short (a
+        number can go on in the next chunk), so it is only accepted once
+        more input has been read or there is none left.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill(size)
+            size *= 2
+
+    def items(self) -> Iterator[Any]:
+        """Yield the values of the array just opened, up to its "]".
+
+        Values are decoded straight from the buffer together with the
+        separator after them; value() and expect() take over only where a
+        chunk boundary gets in the way.
+        """
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        decode = self.decoder.raw_decode
+        while True:
+            buf, pos = self.buf, self.pos
+            try:
+                value, end = decode(buf, pos)
+                sep = _SEPARATOR.match(buf, end)
+            except json.JSONDecodeError:
+                sep = None
+            if sep is not None and sep.end() < len(buf):
+                self.pos = sep.end()
+                yield value
+                if sep.group(1) == "]":
+                    return
+                continue
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+            self.peek()
+
+
+def iter_json_movies(path: str, chunk_size: int = JSON_CHUNK_SIZE,
+                     meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a `{"movies": [...]}` file one at a time.
+
+    Only one record and a chunk of text are held at a time, instead of the
+    whole document. Other top-level keys are skipped, or stored in `meta`
+    if it is given. Raises json.JSONDecodeError on malformed input,
+    possibly after yielding the records before the error.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        reader = _JsonReader(file, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "movies":
+                reader.expect("[")
+                yield from reader.items()
+            elif meta is not None:
+                meta[key] = reader.value()
+            else:
+                reader.value()
+            if reader.expect(",}") == "}":
+                return
+
+
+def detect_snapshot_format(path: str) -> Optional[str]:
+    """Return the encoding of a snapshot file from its first bytes.
+
+    Returns None for a missing or empty file.
+    """
+    try:
+        with open(path, "rb") as file:
+            head = file.read(4)
+    except FileNotFoundError:
+        return None
+    if not head:
+        return None
+    if head.startswith(GZIP_MAGIC):
+        return "jsonl-gzip"
+    if head == ZSTD_MAGIC:
+        return "jsonl-zstd"
+    if head == BINARY_MAGIC:
+        return "binary"
+    if head.startswith(b'{"'):
+        return "json-compact"
+    return "json"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("The jsonl-zstd snapshot format needs the 'zstandard' package") from None
+    return zstandard
+
+
+def _open_jsonl(path: str, fmt: str):
+    """Open a compressed JSON lines snapshot for reading text."""
+    if fmt == "jsonl-gzip":
+        import gzip
+        return gzip.open(path, "rt", encoding="utf-8")
+    reader = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return io.TextIOWrapper(reader, encoding="utf-8")
+
+
+def _read_jsonl(path: str, fmt: str, meta: Optional[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    try:
+        with _open_jsonl(path, fmt) as file:
+            header = json.loads(file.readline() or "null")
+            if not isinstance(header, dict):
+                raise ValueError(f"{path}: missing snapshot header")
+            if meta is not None:
+                meta.update(header)
+            for line in file:
+                yield json.loads(line)
+    except (EOFError, OSError) as error:
+        if isinstance(error, FileNotFoundError):
+            raise
+        raise ValueError(f"{path}: corrupt snapshot ({error})") from None
+
+
+class BinaryCatalog:
+    """A binary snapshot mapped into memory for random access.
+
+    The layout after the header is a run of fixed-width columns, one entry
+    per movie: ratings (`<d`), int-rating flags (one byte), years (`<i`),
+    title end offsets and extra end offsets (`<Q`, cumulative), and the
+    record numbers sorted by normalize_title() (`<I`). The UTF-8 titles and
+    the JSON-encoded extra fields follow as two blobs. `catalog[i]` or
+    `find(title)` decode only the entries they touch, so the cost of
+    opening the catalog and reading one movie does not grow with its size.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path}: empty snapshot") from None
+        try:
+            self._parse_header(path)
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _parse_header(self, path: str) -> None:
+        try:
+            magic, layout, self.version, count = BINARY_HEADER.unpack_from(self._map)
+        except struct.error:
+            raise ValueError(f"{path}: corrupt snapshot (short header)") from None
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{path}: not a binary snapshot")
+        if layout != BINARY_LAYOUT:
+            raise ValueError(f"{path}: unknown binary layout {layout}")
+        self._count = count
+        self._ratings = BINARY_HEADER.size
+        self._int_flags = self._ratings + 8 * count
+        self._years = self._int_flags + count
+        self._title_ends = self._years + 4 * count
+        self._extra_ends = self._title_ends + 8 * count
+        self._order = self._extra_ends + 8 * count
+        self._titles = self._order + 4 * count
+        try:
+            self._extras = self._titles + self._end(self._title_ends, count - 1)
+            size = self._extras + self._end(self._extra_ends, count - 1)
+        except struct.error:
+            size = -1
+        if size != len(self._map):
+            raise ValueError(f"{path}: corrupt snapshot (truncated)")
+
+    def _end(self, column: int, i: int) -> int:
+        """Return the cumulative end offset stored at entry i, 0 for i < 0."""
+        return struct.unpack_from("<Q", self._map, column + 8 * i)[0] if i >= 0 else 0
+
+    def _title(self, i: int) -> str:
+        start = self._titles + self._end(self._title_ends, i - 1)
+        end = self._titles + self._end(self._title_ends, i)
+        return self._map[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> Movie:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("catalog index out of range")
+        rating, = struct.unpack_from("<d", self._map, self._ratings + 8 * i)
+        year, = struct.unpack_from("<i", self._map, self._years + 4 * i)
+        if self._map[self._int_flags + i]:
+            rating = int(rating)
+        movie = Movie(self._title(i), rating, year)
+        start = self._extras + self._end(self._extra_ends, i - 1)
+        end = self._extras + self._end(self._extra_ends, i)
+        if end > start:
+            movie.extra = json.loads(self._map[start:end])
+        return movie
+
+    def find(self, title: str) -> Optional[Movie]:
+        """Return the movie with this title by binary search, or None."""
+        key = normalize_title(title)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i, = struct.unpack_from("<I", self._map, self._order + 4 * mid)
+            if normalize_title(self._title(i)) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count:
+            return None
+        i, = struct.unpack_from("<I", self._map, self._order + 4 * lo)
+        return self[i] if normalize_title(self._title(i)) == key else None
+
+    def __iter__(self) -> Iterator[Movie]:
+        """Decode every movie in file order, a column at a time."""
+        count, data = self._count, self._map
+        ratings = struct.unpack_from(f"<{count}d", data, self._ratings)
+        int_flags = data[self._int_flags:self._int_flags + count]
+        years = struct.unpack_from(f"<{count}i", data, self._years)
+        title_ends = struct.unpack_from(f"<{count}Q", data, self._title_ends)
+        extra_ends = struct.unpack_from(f"<{count}Q", data, self._extra_ends)
+        start = extra_start = 0
+        for i in range(count):
+            end = title_ends[i]
+            rating = ratings[i]
+            movie = Movie(data[self._titles + start:self._titles + end].decode("utf-8"),
+                          int(rating) if int_flags[i] else rating, years[i])
+            extra_end = extra_ends[i]
+            if extra_end > extra_start:
+                movie.extra = json.loads(data[self._extras + extra_start:self._extras + extra_end])
+            start, extra_start = end, extra_end
+            yield movie
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "BinaryCatalog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _read_binary(path: str, meta: Optional[Dict[str, Any]]) -> Iterator[Movie]:
+    """Decode the column layout written by _write_binary()."""
+    with BinaryCatalog(path) as catalog:
+        if meta is not None:
+            meta["version"] = catalog.version
+        yield from catalog
+
+
+def read_snapshot(path: str, meta: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Yield the movies of a snapshot in any SNAPSHOT_FORMATS encoding.
+
+    The encoding is detected from the file header. Top-level values other
+    than the movies (such as "version") are stored in `meta` if given.
+    Raises FileNotFoundError for a missing file and ValueError for a
+    corrupt one.
+    """
+    fmt = detect_snapshot_format(path)
+    if fmt is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        raise json.JSONDecodeError("Empty snapshot", "", 0)
+    if fmt in ("json", "json-compact"):
+        return iter_json_movies(path, meta=meta)
+    if fmt == "binary":
+        return _read_binary(path, meta)
+    return _read_jsonl(path, fmt, meta)
+
+
+def load_snapshot(path: str, meta: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Return the movies of a snapshot as a list, like read_snapshot().
+
+    For a whole load, JSON snapshots are parsed with json.load, which is
+    several times faster than the incremental reader read_snapshot() uses
+    to keep memory flat.
+    """
+    fmt = detect_snapshot_format(path)
+    if fmt not in ("json", "json-compact"):
+        return list(read_snapshot(path, meta))
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or not isinstance(data.get("movies", []), list):
+        raise ValueError(f"{path} is not a movie snapshot")
+    movies = data.pop("movies", [])
+    if meta is not None:
+        meta.update(data)
+    return movies
+
+
+def _batches(movies: Iterable[Any]) -> Iterator[List[Movie]]:
+    batch = []
+    for movie in movies:
+        batch.append(Movie.from_dict(movie))
+        if len(batch) == WRITE_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _pretty_record(movie: Movie) -> str:
+    """Return a record exactly as json.dump(..., indent=4) lays it out."""
+    if movie.extra:
+        body = json.dumps(movie.to_dict(), indent=4)
+        return "\n".join("        " + line for line in body.split("\n"))
+    return ('        {\n'
+            f'            "title": {json.dumps(movie.title)},\n'
+            f'            "rating": {json.dumps(movie.rating)},\n'
+            f'            "year": {json.dumps(movie.year)}\n'
+            '        }')
+
+
+def _write_json(text, movies: Iterable[Any], version: int, pretty: bool) -> None:
+    if pretty:
+        text.write(f'{{\n    "version": {version},\n    "movies": [')
+        separator, end = ",\n", "\n    ]\n}"
+        encode = _pretty_record
+    else:
+        text.write(f'{{"version":{version},"movies":[')
+        separator, end = ",", "]}"
+        compact = json.JSONEncoder(separators=(",", ":")).encode
+    first = True
+    for batch in _batches(movies):
+        if pretty:
+            chunk = separator.join(map(encode, batch))
+        else:
+            # one C-level encode per batch; strip the list brackets
+            chunk = compact([movie.to_dict() for movie in batch])[1:-1]
+        if pretty:
+            chunk = "\n" + chunk
+        text.write(chunk if first else separator + chunk)
+        first = False
+    text.write((end if not first else end.lstrip()) if pretty else end)
+
+
+def _write_jsonl(text, movies: Iterable[Any], version: int) -> None:
+    text.write(json.dumps({"version": version}) + "\n")
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    for batch in _batches(movies):
+        text.write("".join(encode(movie.to_dict()) + "\n" for movie in batch))
+
+
+def _cumulative_ends(blobs: List[bytes]) -> List[int]:
+    ends = []
+    end = 0
+    for blob in blobs:
+        end += len(blob)
+        ends.append(end)
+    return ends
+
+
+def _write_binary(file: BinaryIO, movies: Iterable[Any], version: int) -> None:
+    """Write movies in the column layout BinaryCatalog reads."""
+    records = [Movie.from_dict(movie) for movie in movies]
+    count = len(records)
+    titles = [movie.title.encode("utf-8") for movie in records]
+    extras = [json.dumps(movie.extra).encode("utf-8") if movie.extra else b""
+              for movie in records]
+    keys = [normalize_title(movie.title) for movie in records]
+    order = sorted(range(count), key=keys.__getitem__)
+    file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_LAYOUT, version, count))
+    file.write(struct.pack(f"<{count}d", *(movie.rating for movie in records)))
+    file.write(bytes(isinstance(movie.rating, int) for movie in records))
+    file.write(struct.pack(f"<{count}i", *(movie.year for movie in records)))
+    file.write(struct.pack(f"<{count}Q", *_cumulative_ends(titles)))
+    file.write(struct.pack(f"<{count}Q", *_cumulative_ends(extras)))
+    file.write(struct.pack(f"<{count}I", *order))
+    file.write(b"".join(titles))
+    file.write(b"".join(extras))
+
+
+def write_snapshot(file: BinaryIO, movies: Iterable[Any], version: int,
+                   fmt: str = "json") -> None:
+    """Write movies to a binary file in one of SNAPSHOT_FORMATS."""
+    if fmt == "binary":
+        _write_binary(file, movies, version)
+        return
+    if fmt == "jsonl-gzip":
+        import gzip
+        stream = gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6, mtime=0)
+    elif fmt == "jsonl-zstd":
+        stream = _zstandard().ZstdCompressor().stream_writer(file, closefd=False)
+    elif fmt in ("json", "json-compact"):
+        stream = None
+    else:
+        raise ValueError(f"Unknown snapshot format: {fmt!r}")
+    text = io.TextIOWrapper(stream or file, encoding="utf-8", newline="\n")
+    if stream is None:
+        _write_json(text, movies, version, pretty=fmt == "json")
+    else:
+        _write_jsonl(text, movies, version)
+    text.flush()
+    text.detach()
+    if stream is not None:
+        stream.close()
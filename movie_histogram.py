@@ -0,0 +1,74 @@
+import io
+from typing import Dict, List, Sequence
+
+from movie_search import LRUCache
+
+# Rendered images kept, keyed on the bin counts and the output format.
+IMAGE_CACHE_SIZE = 8
+
+IMAGE_FORMATS = ("png", "svg")
+
+_images = LRUCache(IMAGE_CACHE_SIZE)
+
+
+def render(counts: Sequence[int], edges: Sequence[float], fmt: str = "png") -> bytes:
+    """Return the histogram as PNG or SVG bytes.
+
+    Draws on a bare matplotlib Figure with the Agg canvas, so no GUI
+    backend or pyplot state is involved. The same counts and edges give
+    back the cached bytes without touching matplotlib.
+    """
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt} (use png or svg)")
+    key = (tuple(counts), tuple(edges), fmt)
+    image = _images.get(key)
+    if image is None:
+        image = _draw(counts, edges, fmt)
+        _images.put(key, image)
+    return image
+
+
+def _draw(counts: Sequence[int], edges: Sequence[float], fmt: str) -> bytes:
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.subplots()
+    widths = [right - left for left, right in zip(edges, edges[1:])]
+    axes.bar(edges[:-1], counts, width=widths, align="edge", edgecolor="black")
+    axes.set_xlabel("Ratings")
+    axes.set_ylabel("Number of Movies")
+    axes.set_title("Movie Ratings Distribution")
+    buffer = io.BytesIO()
+    # no timestamps or random ids, so equal histograms give equal files
+    metadata = {"Date": None} if fmt == "svg" else {"Software": None}
+    with matplotlib.rc_context({"svg.hashsalt": "movies"}):
+        figure.savefig(buffer, format=fmt, metadata=metadata)
+    return buffer.getvalue()
+
+
+def cache_info() -> Dict[str, int]:
+    """Return hit/miss counters of the image cache."""
+    return _images.info()
+
+
+def text(counts: Sequence[int], edges: Sequence[float], width: int = 40) -> List[str]:
+    """Return the histogram as lines of text, one bar per bin."""
+    if width < 1:
+        raise ValueError(f"width must be at least 1, got {width}")
+    peak = max(counts, default=0) or 1
+    labels = [f"{left:g}-{right:g}" for left, right in zip(edges, edges[1:])]
+    pad = max(map(len, labels), default=0)
+    number = len(str(max(counts, default=0)))
+    return [f"{label:>{pad}} | {'#' * round(count * width / peak):<{width}} {count:>{number}}"
+            for label, count in zip(labels, counts)]
+
+
+def format_for(path: str) -> str:
+    """Return the image format implied by a file name."""
+    fmt = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image file: {path} (use .png or .svg)")
+    return fmt
@@ -0,0 +1,466 @@
+import heapq
+import math
+import random
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from movie_record import Movie
+
+Predicate = Callable[[Movie], bool]
+
+
+class SortedList:
+    """A sorted sequence stored as a list of small sorted buckets.
+
+    Inserting or removing a value only shifts the items of one bucket, and
+    positional lookups walk bucket lengths instead of items, so both stay
+    cheap on catalogs with millions of entries.
+    """
+
+    LOAD = 1000
+
+    def __init__(self, iterable: Iterable[Any] = (), presorted: bool = False) -> None:
+        values = list(iterable) if presorted else sorted(iterable)
+        self._buckets: List[List[Any]] = [
+            values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)]
+        self._maxes: List[Any] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(values)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __reversed__(self) -> Iterator[Any]:
+        for bucket in reversed(self._buckets):
+            yield from reversed(bucket)
+
+    def __contains__(self, value: Any) -> bool:
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return False
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, value)
+        return j < len(bucket) and bucket[j] == value
+
+    def add(self, value: Any) -> None:
+        """Insert a value, keeping the list sorted."""
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+            self._len = 1
+            return
+        i = bisect_right(self._maxes, value)
+        if i == len(self._maxes):
+            i -= 1
+        bucket = self._buckets[i]
+        insort(bucket, value)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets.insert(i + 1, bucket[self.LOAD:])
+            del bucket[self.LOAD:]
+            self._maxes.insert(i, bucket[-1])
+
+    def remove(self, value: Any) -> None:
+        """Remove one occurrence of value; raise ValueError if absent."""
+        i = bisect_left(self._maxes, value)
+        if i < len(self._maxes):
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, value)
+            if j < len(bucket) and bucket[j] == value:
+                del bucket[j]
+                self._len -= 1
+                if bucket:
+                    self._maxes[i] = bucket[-1]
+                else:
+                    del self._buckets[i]
+                    del self._maxes[i]
+                return
+        raise ValueError(f"{value!r} not in list")
+
+    def _position(self, value: Any, right: bool = False) -> Tuple[int, int]:
+        """Return (bucket, offset) at which value would be inserted."""
+        find = bisect_right if right else bisect_left
+        i = find(self._maxes, value)
+        if i == len(self._maxes):
+            return i, 0
+        return i, find(self._buckets[i], value)
+
+    def bisect_left(self, value: Any) -> int:
+        i, j = self._position(value)
+        return sum(map(len, self._buckets[:i])) + j
+
+    def bisect_right(self, value: Any) -> int:
+        i, j = self._position(value, right=True)
+        return sum(map(len, self._buckets[:i])) + j
+
+    def irange(self, start: Any = None, stop: Any = None) -> Iterator[Any]:
+        """Yield the values v with start <= v < stop in order.
+
+        Either bound may be None for no limit. Only the buckets actually
+        reached are visited.
+        """
+        i, j = (0, 0) if start is None else self._position(start)
+        for bucket in self._buckets[i:]:
+            for value in bucket[j:] if j else bucket:
+                if stop is not None and value >= stop:
+                    return
+                yield value
+            j = 0
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("list index out of range")
+        for bucket in self._buckets:
+            if index < len(bucket):
+                return bucket[index]
+            index -= len(bucket)
+        raise IndexError("list index out of range")
+
+
+class FenwickTree:
+    """Prefix sums over a growable list of non-negative integer weights.
+
+    Changing a weight, appending, and finding the slot a running total
+    falls in are all O(log n). Integer weights keep the sums exact however
+    many updates go through.
+    """
+
+    def __init__(self, weights: Iterable[int] = ()) -> None:
+        self._weights = list(weights)
+        tree = [0] + self._weights
+        n = len(self._weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __getitem__(self, index: int) -> int:
+        return self._weights[index]
+
+    def prefix(self, end: int) -> int:
+        """Return the sum of the first `end` weights."""
+        total = 0
+        tree = self._tree
+        while end:
+            total += tree[end]
+            end &= end - 1
+        return total
+
+    def total(self) -> int:
+        return self.prefix(len(self._weights))
+
+    def set(self, index: int, weight: int) -> None:
+        """Change the weight at index."""
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        if not delta:
+            return
+        i = index + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def append(self, weight: int) -> None:
+        i = len(self._weights) + 1
+        self._weights.append(weight)
+        self._tree.append(weight + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def pop(self) -> int:
+        """Remove and return the last weight.
+
+        No node covers a range past its own index, so nothing else changes.
+        """
+        self._tree.pop()
+        return self._weights.pop()
+
+    def find(self, target: int) -> int:
+        """Return the first index whose prefix sum exceeds target.
+
+        target must be in [0, total()); zero-weight slots are never returned.
+        """
+        tree = self._tree
+        n = len(self._weights)
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+Cursor = Tuple[Any, int]
+
+
+class RatingIndex:
+    """Movies ordered by rating, highest first, kept sorted as they change.
+
+    Entries are (-rating, seq, key) in a SortedList, where seq is the
+    movie's position in file order, so ties come out in file order just as
+    with sorted(movies, key=rating, reverse=True). Adds, deletes and
+    re-ratings move one entry; top_n(k) and paging read only the entries
+    they return.
+    """
+
+    def __init__(self, movies: Iterable[Tuple[str, Movie]] = ()) -> None:
+        self._movies: Dict[str, Movie] = dict(movies)
+        self._entries: Dict[str, Tuple[Any, int, str]] = {
+            key: (-movie.rating, seq, key) for seq, (key, movie) in enumerate(self._movies.items())}
+        self._next_seq = len(self._entries)
+        # seq already rises in input order, so a stable sort on the rating
+        # alone gives the full tuple order without comparing tuples.
+        self._sorted = SortedList(sorted(self._entries.values(), key=itemgetter(0)),
+                                  presorted=True)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __iter__(self) -> Iterator[Movie]:
+        movies = self._movies
+        return (movies[key] for _, _, key in self._sorted)
+
+    # -- maintenance ------------------------------------------------------
+
+    def add(self, key: str, movie: Movie) -> None:
+        entry = (-movie.rating, self._next_seq, key)
+        self._next_seq += 1
+        self._movies[key] = movie
+        self._entries[key] = entry
+        self._sorted.add(entry)
+
+    def remove(self, key: str) -> None:
+        del self._movies[key]
+        self._sorted.remove(self._entries.pop(key))
+
+    def rerate(self, key: str, movie: Movie) -> None:
+        """Move a movie to its new rating, keeping its place among ties."""
+        old = self._entries[key]
+        self._sorted.remove(old)
+        entry = (-movie.rating, old[1], key)
+        self._entries[key] = entry
+        self._sorted.add(entry)
+
+    # -- queries ----------------------------------------------------------
+
+    def _movies_for(self, entries: Iterable[Tuple[Any, int, str]]) -> List[Movie]:
+        movies = self._movies
+        return [movies[key] for _, _, key in entries]
+
+    def top_n(self, k: int) -> List[Movie]:
+        """Return the k highest-rated movies, highest first."""
+        return self._movies_for(islice(self._sorted, max(k, 0)))
+
+    def bottom_n(self, k: int) -> List[Movie]:
+        """Return the k lowest-rated movies, lowest first.
+
+        Ties are in file order, as with sorted(movies, key=rating)[:k].
+        """
+        if k <= 0 or not self._sorted:
+            return []
+        tail = list(islice(reversed(self._sorted), k))
+        boundary = tail[-1][0]
+        # Below the boundary rating everything is taken; at it, only the
+        # earliest movies in file order, which sort first within the tie.
+        lower = sorted((entry for entry in tail if entry[0] != boundary),
+                       key=lambda entry: (-entry[0], entry[1]))
+        tied = islice(self._sorted.irange((boundary,), (boundary, math.inf)), k - len(lower))
+        return self._movies_for(lower + list(tied))
+
+    def between(self, low: Optional[float] = None, high: Optional[float] = None) -> List[Movie]:
+        """Return the movies rated low..high inclusive, highest first."""
+        start = None if high is None else (-high,)
+        stop = None if low is None else (-low, math.inf)
+        return self._movies_for(self._sorted.irange(start, stop))
+
+    def page(self, limit: int, cursor: Optional[Cursor] = None
+             ) -> Tuple[List[Movie], Optional[Cursor]]:
+        """Return up to limit movies after cursor, and the cursor for the next page.
+
+        Start with cursor=None. The next cursor is None after the last
+        page. A cursor marks a place in the order rather than a count, so
+        paging stays consistent while movies are added or deleted.
+        """
+        if limit <= 0:
+            return [], cursor
+        start = None if cursor is None else (cursor[0], cursor[1] + 1)
+        entries = list(islice(self._sorted.irange(start), limit + 1))
+        if len(entries) <= limit:
+            return self._movies_for(entries), None
+        last = entries[limit - 1]
+        return self._movies_for(entries[:limit]), (last[0], last[1])
+
+
+def movie_filter(min_rating: Optional[float] = None, max_rating: Optional[float] = None,
+                 start_year: Optional[int] = None, end_year: Optional[int] = None) -> Predicate:
+    """Return a predicate for MovieSampler picks; bounds are inclusive."""
+    def matches(movie: Movie) -> bool:
+        return ((min_rating is None or movie.rating >= min_rating)
+                and (max_rating is None or movie.rating <= max_rating)
+                and (start_year is None or movie.year >= start_year)
+                and (end_year is None or movie.year <= end_year))
+    return matches
+
+
+class MovieSampler:
+    """Random picks from a changing set of movies, uniform or by rating.
+
+    Movies sit in a flat list, and a delete moves the last movie into the
+    freed slot, so a uniform pick is one random index. A FenwickTree over
+    the same slots holds each rating (scaled to an integer by
+    WEIGHT_SCALE) for weighted picks. Both are updated in place as movies
+    change; nothing is rebuilt per pick.
+
+    Filters are applied by drawing and rejecting. If a filter turns down
+    too many draws, the matching movies are collected once and sampled
+    directly instead, so rare filters stay correct, just O(n).
+    """
+
+    # Weighted picks resolve ratings to this many steps per point.
+    WEIGHT_SCALE = 1000
+    # Rejected draws allowed per requested movie before scanning instead.
+    REJECTIONS = 256
+
+    def __init__(self, movies: Iterable[Tuple[str, Movie]] = ()) -> None:
+        self._keys: List[str] = []
+        self._movies: List[Movie] = []
+        for key, movie in movies:
+            self._keys.append(key)
+            self._movies.append(movie)
+        self._slot: Dict[str, int] = {key: i for i, key in enumerate(self._keys)}
+        self._weights = FenwickTree(map(self._weight, self._movies))
+
+    def __len__(self) -> int:
+        return len(self._movies)
+
+    def _weight(self, movie: Movie) -> int:
+        return max(0, round(movie.rating * self.WEIGHT_SCALE))
+
+    # -- maintenance ------------------------------------------------------
+
+    def add(self, key: str, movie: Movie) -> None:
+        self._slot[key] = len(self._movies)
+        self._keys.append(key)
+        self._movies.append(movie)
+        self._weights.append(self._weight(movie))
+
+    def remove(self, key: str) -> None:
+        """Drop a movie, filling its slot with the last one."""
+        slot = self._slot.pop(key)
+        last_key = self._keys.pop()
+        last_movie = self._movies.pop()
+        last_weight = self._weights.pop()
+        if slot < len(self._movies):
+            self._keys[slot] = last_key
+            self._movies[slot] = last_movie
+            self._weights.set(slot, last_weight)
+            self._slot[last_key] = slot
+
+    def rerate(self, key: str, movie: Movie) -> None:
+        """Pick up a movie's new rating."""
+        self._weights.set(self._slot[key], self._weight(movie))
+
+    # -- picks ------------------------------------------------------------
+
+    def pick(self, rng: Any = random, weighted: bool = False,
+             where: Optional[Predicate] = None) -> Optional[Movie]:
+        """Return one random movie, or None if none qualifies."""
+        movies = self.sample(1, rng, weighted, where)
+        return movies[0] if movies else None
+
+    def sample(self, k: int, rng: Any = random, weighted: bool = False,
+               where: Optional[Predicate] = None) -> List[Movie]:
+        """Return up to k distinct random movies, in the order drawn.
+
+        With weighted=True a movie is drawn with probability proportional
+        to its rating (uniformly if every rating is 0). `where` keeps only
+        movies it returns True for. Fewer than k movies come back only if
+        fewer than k qualify.
+        """
+        if k <= 0 or not self._movies:
+            return []
+        weighted = weighted and self._weights.total() > 0
+        if where is None and not weighted:
+            n = len(self._movies)
+            return [self._movies[i] for i in rng.sample(range(n), min(k, n))]
+        if weighted:
+            slots = self._draw_weighted(k, rng, where)
+        else:
+            slots = self._draw_uniform(k, rng, where)
+        if slots is None:
+            return self._sample_scan(k, rng, weighted, where)
+        return [self._movies[i] for i in slots]
+
+    def _draw_uniform(self, k: int, rng: Any, where: Predicate) -> Optional[List[int]]:
+        n = len(self._movies)
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        budget = self.REJECTIONS * k
+        while len(chosen) < k:
+            slot = rng.randrange(n)
+            if slot in seen:
+                budget -= 1
+            else:
+                seen.add(slot)
+                if where(self._movies[slot]):
+                    chosen.append(slot)
+                    continue
+                budget -= 1
+            if budget < 0 or len(seen) == n:
+                return None
+        return chosen
+
+    def _draw_weighted(self, k: int, rng: Any, where: Optional[Predicate]) -> Optional[List[int]]:
+        # Drawn and rejected slots get weight 0 until the draw is over, so
+        # they cannot come up again; their weights are put back afterwards.
+        weights = self._weights
+        chosen: List[int] = []
+        zeroed: List[Tuple[int, int]] = []
+        budget = self.REJECTIONS * k
+        try:
+            while len(chosen) < k:
+                total = weights.total()
+                if not total:
+                    return None
+                slot = weights.find(rng.randrange(total))
+                zeroed.append((slot, weights[slot]))
+                weights.set(slot, 0)
+                if where is None or where(self._movies[slot]):
+                    chosen.append(slot)
+                else:
+                    budget -= 1
+                    if budget < 0:
+                        return None
+            return chosen
+        finally:
+            for slot, weight in reversed(zeroed):
+                weights.set(slot, weight)
+
+    def _sample_scan(self, k: int, rng: Any, weighted: bool,
+                     where: Optional[Predicate]) -> List[Movie]:
+        candidates = [i for i, movie in enumerate(self._movies)
+                      if where is None or where(movie)]
+        if not weighted:
+            return [self._movies[i] for i in rng.sample(candidates, min(k, len(candidates)))]
+        # Efraimidis-Spirakis: the k largest u ** (1 / w) are a weighted
+        # sample without replacement. Zero weights can only fill the tail.
+        def priority(slot: int) -> float:
+            weight = self._weights[slot]
+            return rng.random() ** (1 / weight) if weight else -rng.random()
+        keyed = [(priority(slot), slot) for slot in candidates]
+        return [self._movies[slot] for _, slot in heapq.nlargest(k, keyed)]
+
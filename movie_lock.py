@@ -0,0 +1,47 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive advisory lock on a side file, held with `with lock:`.
+
+    Uses fcntl.flock, so it only keeps out other processes that take the
+    same lock. Where fcntl is missing it does nothing, and writers rely on
+    the optimistic check in MovieStore.mutate(). Nested `with` blocks in
+    one process share a single lock.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd = None
+        self._depth = 0
+
+    @property
+    def supported(self) -> bool:
+        """True if this platform has fcntl locks."""
+        return fcntl is not None
+
+    def __enter__(self) -> "FileLock":
+        if self._depth == 0 and fcntl is not None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
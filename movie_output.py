@@ -0,0 +1,124 @@
+import sys
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
+
+import colorama
+
+# Lines joined into a single write when listing movies.
+OUTPUT_CHUNK = 1000
+
+# Movies per screen in the interactive pager; 0 turns paging off.
+PAGE_SIZE = 20
+
+COLOR_NAMES = ("BLACK", "RED", "GREEN", "YELLOW", "BLUE", "MAGENTA", "CYAN", "WHITE", "RESET")
+
+
+class Palette:
+    """Color codes looked up at print time, so they can be switched off.
+
+    `Fore.RED` and friends hold colorama's codes while color is on and
+    empty strings once use_color(False) has run.
+    """
+
+    def __init__(self, codes: object) -> None:
+        self._codes = codes
+        self.enable(True)
+
+    def enable(self, enabled: bool) -> None:
+        for name in COLOR_NAMES:
+            setattr(self, name, getattr(self._codes, name) if enabled else "")
+
+
+Fore = Palette(colorama.Fore)
+
+
+def use_color(enabled: bool) -> None:
+    """Turn colored output on (through colorama) or off.
+
+    With color off, colorama's stdout wrapper is removed as well, so plain
+    output goes straight to the real stream without being scanned.
+    """
+    Fore.enable(enabled)
+    if enabled:
+        colorama.init(autoreset=True)
+    elif sys.stdout is colorama.initialise.wrapped_stdout:
+        # leave a stream someone else swapped in (a test, a redirect) alone
+        colorama.deinit()
+
+
+def format_movie(movie) -> str:
+    return f"{movie['title']} ({movie['year']}) - Rating: {movie['rating']}"
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_lines(lines: Iterable[str], color: str = "", stream: Optional[TextIO] = None) -> None:
+    """Write lines in OUTPUT_CHUNK-sized blocks, one write() per block.
+
+    The color code (and the reset after it) is emitted once per block
+    instead of once per line.
+    """
+    stream = stream or sys.stdout
+    reset = colorama.Style.RESET_ALL if color else ""
+    for chunk in _chunks(lines, OUTPUT_CHUNK):
+        stream.write(color + "\n".join(chunk) + reset + "\n")
+    stream.flush()
+
+
+class Pager:
+    """Show lines a page at a time, with next, previous and quit.
+
+    Pages are pulled from the iterator only when first shown and kept for
+    going back, so a long listing is never read further than viewed.
+    """
+
+    def __init__(self, lines: Iterable[str], page_size: int = PAGE_SIZE, color: str = "",
+                 prompt: Optional[Callable[[str], str]] = None) -> None:
+        self._lines = iter(lines)
+        self._pages: List[List[str]] = []
+        self._done = False
+        self.page_size = page_size
+        self.color = color
+        self.prompt = prompt or input
+
+    def page(self, number: int) -> Optional[List[str]]:
+        """Return page `number` (from 0), or None past the end."""
+        while len(self._pages) <= number and not self._done:
+            page = list(islice(self._lines, self.page_size))
+            if page:
+                self._pages.append(page)
+            if len(page) < self.page_size:
+                self._done = True
+        return self._pages[number] if number < len(self._pages) else None
+
+    def run(self) -> None:
+        number = 0
+        while True:
+            write_lines(self.page(number) or [], self.color)
+            last = self.page(number + 1) is None
+            if last and number == 0:
+                return
+            status = f"page {number + 1}{' (end)' if last else ''}"
+            answer = self.prompt(f"{Fore.CYAN}-- {status} -- [Enter] next, [p]rev, [q]uit: ")
+            answer = answer.strip().lower()
+            if answer == "q" or (last and answer in ("", "n")):
+                return
+            if answer == "p":
+                number = max(number - 1, 0)
+            elif answer in ("", "n"):
+                number += 1
+
+
+def show_lines(lines: Iterable[str], color: str = "") -> None:
+    """Page lines on an interactive terminal, otherwise write them all."""
+    if PAGE_SIZE > 0 and sys.stdin.isatty() and sys.stdout.isatty():
+        Pager(lines, PAGE_SIZE, color).run()
+    else:
+        write_lines(lines, color)
@@ -0,0 +1,153 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+FIELDS = ("title", "rating", "year")
+
+
+def normalize_title(title: str) -> str:
+    """Return the key titles are compared by.
+
+    Every lookup, duplicate check and index goes through this, so " Heat"
+    and "heat" always name the same movie.
+    """
+    return title.strip().lower()
+
+
+class Movie:
+    """One movie, stored in slots rather than a per-movie dict.
+
+    The store hands these out, as read-only FrozenMovie records (its
+    copies from load_movies() are writable). They also behave like the dicts
+    used before (`movie["rating"]`, `movie.get("year")`, `dict(movie)`,
+    equality with a plain dict), so callers can move to attribute access
+    at their own pace. Keys other than title, rating and year are kept in
+    `extra` so they survive a round trip through the file.
+    """
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, title: str, rating: Union[int, float], year: int,
+                 extra: Optional[Dict[str, Any]] = None) -> None:
+        self.title = title
+        self.rating = rating
+        self.year = year
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Movie":
+        """Build a Movie from a dict; one of this class is returned unchanged."""
+        if isinstance(data, cls):
+            return data
+        extra = None
+        if len(data) > len(FIELDS):
+            extra = {k: v for k, v in data.items() if k not in FIELDS}
+        return cls(data["title"], data["rating"], data["year"], extra)
+
+    def copy(self) -> "Movie":
+        """Return an independent Movie with the same fields."""
+        return Movie(self.title, self.rating, self.year, dict(self.extra) if self.extra else None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the movie as a plain dict, for JSON."""
+        data = {"title": self.title, "rating": self.rating, "year": self.year}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key in FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return list(FIELDS) + list(self.extra or ())
+
+    def values(self) -> List[Any]:
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __contains__(self, key: object) -> bool:
+        return key in FIELDS or bool(self.extra and key in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(FIELDS) + len(self.extra or ())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Movie):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the dicts it replaces
+
+    def __repr__(self) -> str:
+        return f"Movie(title={self.title!r}, rating={self.rating!r}, year={self.year!r})"
+
+
+Mapping.register(Movie)
+
+
+class FrozenMovie(Movie):
+    """A Movie held by the store, which callers may read but not change.
+
+    The store's indexes are keyed on the title and ordered by rating, so
+    changes go through its functions (update_movie_rating() and so on);
+    copy() returns a writable Movie.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, title: str, rating: Union[int, float], year: int,
+                extra: Optional[Dict[str, Any]] = None) -> "FrozenMovie":
+        return _freeze(Movie(title, rating, year, extra))
+
+    def __init__(self, *args: Any) -> None:
+        pass  # built by __new__
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "FrozenMovie":
+        """Return data as a FrozenMovie; a writable Movie is copied first."""
+        if isinstance(data, FrozenMovie):
+            return data
+        return _freeze(data.copy() if isinstance(data, Movie) else Movie.from_dict(data))
+
+    def _read_only(self, *args: Any) -> None:
+        raise TypeError(f"{self.title!r} belongs to the movie store and is read-only; "
+                        "change it through the store, or copy() it")
+
+    __setattr__ = __setitem__ = __delattr__ = _read_only
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return FrozenMovie, (self.title, self.rating, self.year, self.extra)
+
+
+def _freeze(movie: Movie) -> FrozenMovie:
+    # Same slots, so switching the class is cheaper than building anew.
+    movie.__class__ = FrozenMovie
+    return movie
+
+
+# What the storage and stats functions accept: a Movie or a plain movie dict.
+MovieRecord = Union[Movie, Dict[str, Union[str, int, float]]]
@@ -0,0 +1,184 @@
+import heapq
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Suggestions must score above this (0-100) to be offered.
+FUZZY_CUTOFF = 70
+# At most this many titles are handed to the fuzzy scorer per query.
+MAX_FUZZY_CANDIDATES = 200
+
+
+def trigrams(text: str) -> set:
+    """Return the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from title trigrams to the titles containing them.
+
+    Titles are the store's normalized keys, numbered in file order. Each
+    trigram maps to a list of those numbers, which stays sorted because
+    new titles always get the next number. A substring query of three or
+    more characters can only match titles that contain every one of its
+    trigrams, so the candidates are read from the rarest trigram's posting
+    list and confirmed with a plain `in` check. Shorter queries fall back
+    to checking every title.
+
+    Deleted titles are left in the posting lists and skipped; the lists
+    are rebuilt once the dead entries outnumber the live ones.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._keys: Dict[int, str] = {}
+        self._seqs: Dict[str, int] = {}
+        self._next_seq = 0
+        self._dead = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str) -> None:
+        """Index a new title."""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._keys[seq] = key
+        self._seqs[key] = seq
+        postings = self._postings
+        for gram in trigrams(key):
+            postings[gram].append(seq)
+
+    def remove(self, key: str) -> None:
+        """Forget a title; its posting entries are dropped lazily."""
+        del self._keys[self._seqs.pop(key)]
+        self._dead += 1
+        if self._dead > len(self._keys):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        keys = list(self._keys.values())
+        self._postings = defaultdict(list)
+        self._keys = {}
+        self._seqs = {}
+        self._next_seq = 0
+        self._dead = 0
+        for key in keys:
+            self.add(key)
+
+    def search(self, query: str) -> List[str]:
+        """Return the titles containing query, in file order."""
+        keys = self._keys
+        if len(query) < 3:
+            return [key for key in keys.values() if query in key]
+        postings = []
+        for gram in trigrams(query):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        rarest = min(postings, key=len)
+        return [keys[seq] for seq in rarest if seq in keys and query in keys[seq]]
+
+    def candidates(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Return titles worth fuzzy-scoring against query.
+
+        Titles sharing the most trigrams with the query come first. Queries
+        too short to have trigrams are compared with titles of similar
+        length instead: a plain similarity ratio above FUZZY_CUTOFF needs
+        the longer string to be under about twice the shorter one.
+        """
+        if limit is None:
+            limit = MAX_FUZZY_CANDIDATES
+        keys = self._keys
+        grams = trigrams(query)
+        if not grams:
+            longest = 2 * len(query) + 1
+            return [key for key in keys.values() if len(key) <= longest][:limit]
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(seq for seq in self._postings.get(gram, ()) if seq in keys)
+        best = heapq.nsmallest(limit, shared.items(), key=lambda item: (-item[1], item[0]))
+        return [keys[seq] for seq, _ in best]
+
+
+def _fuzzy_extract():
+    """Return a function(query, choices, limit) -> [(choice, score), ...].
+
+    Uses rapidfuzz's C implementation when it is installed and falls back
+    to fuzzywuzzy otherwise. Both score with WRatio after their default
+    preprocessing. The import happens on first use.
+    """
+    try:
+        from rapidfuzz import fuzz, process, utils
+    except ImportError:
+        from fuzzywuzzy import process as fw_process
+
+        def extract(query, choices, limit):
+            return fw_process.extractBests(query, choices, limit=limit)
+    else:
+        def extract(query, choices, limit):
+            found = process.extract(query, choices, scorer=fuzz.WRatio,
+                                    processor=utils.default_process, limit=limit)
+            return [(choice, score) for choice, score, _ in found]
+    return extract
+
+
+_extract = None
+
+
+def fuzzy_matches(query: str, choices: List[str], limit: int = 3,
+                  cutoff: float = FUZZY_CUTOFF) -> List[Tuple[str, float]]:
+    """Return up to limit (choice, score) pairs scoring above cutoff, best first."""
+    global _extract
+    if not choices:
+        return []
+    if _extract is None:
+        _extract = _fuzzy_extract()
+    return [(choice, score) for choice, score in _extract(query, choices, limit)
+            if score > cutoff]
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry.
+
+    Counts hits and misses so the size can be tuned.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, marking it recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache value under key, evicting the oldest entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current and maximum size."""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._data), "maxsize": self.maxsize}
@@ -0,0 +1,363 @@
+import asyncio
+import contextlib
+import json
+import math
+import signal
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import movie_storage
+from movie_index import movie_filter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# Seconds writes are collected for before they are saved together.
+FLUSH_INTERVAL = 0.005
+
+# Largest request body accepted, in bytes.
+MAX_BODY = 64 * 1024
+
+# Movies per /movies page, by default and at most.
+LIST_LIMIT = 100
+MAX_LIST_LIMIT = 1000
+
+Response = Tuple[int, Any]
+
+
+class HttpError(Exception):
+    """A request that cannot be served; becomes a JSON error response."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def encode_cursor(cursor: Optional[movie_storage.Cursor]) -> Optional[str]:
+    """Return a rating-page cursor as text for a query string."""
+    return None if cursor is None else f"{cursor[0]}:{cursor[1]}"
+
+
+def decode_cursor(text: Optional[str]) -> Optional[movie_storage.Cursor]:
+    if not text:
+        return None
+    try:
+        key, seq = text.rsplit(":", 1)
+        rating = float(key)
+        if not math.isfinite(rating):
+            raise ValueError(rating)  # a cursor holds a real movie's rating
+        return rating, int(seq)
+    except ValueError:
+        raise HttpError(400, f"Invalid cursor: {text!r}") from None
+
+
+def _number(query: Dict[str, List[str]], name: str, kind=float) -> Any:
+    values = query.get(name)
+    if not values:
+        return None
+    try:
+        return kind(values[-1])
+    except ValueError:
+        raise HttpError(400, f"Invalid {name}: {values[-1]!r}") from None
+
+
+class MovieServer:
+    """JSON over HTTP for one shared, in-memory MovieStore.
+
+    Everything runs on the event loop: reads are answered straight from the
+    store's in-memory indexes, so many connections are served without
+    waiting on each other, and writes are applied one at a time between
+    them. Writes arriving within FLUSH_INTERVAL of each other are grouped
+    in a MovieStore.batch() and saved with one write; each is answered once
+    its batch is on disk. Reads may see a write up to FLUSH_INTERVAL before
+    its response is sent.
+
+    Opening a batch takes the database's write lock on the event loop, and
+    that call blocks: while another process (say the menu, saving a
+    change) holds the lock, every connection waits, reads included. Run
+    the server as the database's only writer.
+
+    Routes:
+        GET    /stats
+        GET    /movies?limit=&cursor=        highest rated first, cursor-paged
+        GET    /movies/<title>
+        GET    /search?q=
+        GET    /random?weighted=&min_rating=&max_rating=&start_year=&end_year=
+        POST   /movies                       {"title", "rating", "year"}
+        PATCH  /movies/<title>               {"rating"}
+        DELETE /movies/<title>
+    """
+
+    def __init__(self, store: Optional[movie_storage.MovieStore] = None,
+                 flush_interval: float = FLUSH_INTERVAL) -> None:
+        self.store = store if store is not None else movie_storage.get_store()
+        self.flush_interval = flush_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batch: Optional[contextlib.ExitStack] = None
+        self._flushed: Optional[asyncio.Future] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.requests = 0
+        self.flushes = 0
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        """Start listening; returns the bound address (port 0 picks a free one)."""
+        self._warm_up()
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    def _warm_up(self) -> None:
+        """Load the store and build its lazy indexes before the first request.
+
+        Each index takes a noticeable pause to build on a large catalog;
+        afterwards it is kept up to date as movies change.
+        """
+        self.store.stats
+        self.store.top_rated(1)
+        self.store.random_movie()
+        self.store.search("warm-up")  # any query builds the title index
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Save any pending writes, then close the server and its connections."""
+        if self._server is not None:
+            self._server.close()
+        self._flush()
+        await asyncio.sleep(0)  # let the writers that were waiting reply
+        for writer in self._connections.values():
+            writer.close()  # an idle connection sees the end of its stream
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    # Writes
+
+    async def _write(self, op: movie_storage.Operation) -> bool:
+        if self._batch is None:
+            self._batch = contextlib.ExitStack()
+            self._batch.enter_context(self.store.batch())
+            self._flushed = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+        flushed = self._flushed
+        try:
+            applied = self.store.mutate(op)
+        except BaseException:
+            self._flush()
+            raise
+        if applied:
+            await asyncio.shield(flushed)
+        return applied
+
+    def _flush(self) -> None:
+        batch, flushed = self._batch, self._flushed
+        if batch is None:
+            return
+        self._batch = self._flushed = None
+        try:
+            batch.close()
+        except Exception as error:
+            flushed.set_exception(error)
+            flushed.exception()  # retrieved by the waiting writers, if any
+        else:
+            flushed.set_result(None)
+        self.flushes += 1
+
+    # Requests
+
+    async def handle(self, method: str, target: str, body: bytes) -> Response:
+        """Return (status, JSON-able payload) for one request."""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip("/").split("/", 1)]
+        resource = parts[0]
+        title = parts[1] if len(parts) > 1 else None
+        if method == "GET":
+            if resource == "stats" and title is None:
+                return 200, self.store.stats.snapshot() or {"total_movies": 0}
+            if resource == "movies":
+                return self._get_movies(title, query)
+            if resource == "search" and title is None:
+                return self._search(query)
+            if resource == "random" and title is None:
+                return self._random(query)
+        elif resource == "movies":
+            if method == "POST" and title is None:
+                return await self._add(self._body(body))
+            if method == "PATCH" and title is not None:
+                return await self._update(title, self._body(body))
+            if method == "DELETE" and title is not None:
+                if await self._write({"op": "delete", "title": title}):
+                    return 204, None
+                raise HttpError(404, "Movie not found.")
+        raise HttpError(404, f"No route for {method} {url.path}")
+
+    @staticmethod
+    def _body(body: bytes) -> Dict[str, Any]:
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "The body must be a JSON object.") from None
+        if not isinstance(data, dict):
+            raise HttpError(400, "The body must be a JSON object.")
+        return data
+
+    def _get_movies(self, title: Optional[str], query: Dict[str, List[str]]) -> Response:
+        if title is not None:
+            movie = self.store.get(title)
+            if movie is None:
+                raise HttpError(404, "Movie not found.")
+            return 200, movie
+        limit = _number(query, "limit", int)
+        limit = LIST_LIMIT if limit is None else max(0, min(limit, MAX_LIST_LIMIT))
+        movies, cursor = self.store.rating_page(limit, decode_cursor(query.get("cursor", [""])[-1]))
+        return 200, {"movies": movies, "next": encode_cursor(cursor)}
+
+    def _search(self, query: Dict[str, List[str]]) -> Response:
+        text = query.get("q", [""])[-1]
+        if not text.strip():
+            raise HttpError(400, "Missing query parameter q.")
+        matches, suggestions = self.store.lookup(text)
+        return 200, {"matches": matches,
+                     "suggestions": [{"movie": movie, "score": score}
+                                     for movie, score in suggestions]}
+
+    def _random(self, query: Dict[str, List[str]]) -> Response:
+        bounds = {name: _number(query, name, kind) for name, kind in (
+            ("min_rating", float), ("max_rating", float), ("start_year", int), ("end_year", int))}
+        where = movie_filter(**bounds) if any(v is not None for v in bounds.values()) else None
+        weighted = query.get("weighted", [""])[-1].lower() in ("1", "true", "yes")
+        movie = self.store.random_movie(weighted=weighted, where=where)
+        if movie is None:
+            raise HttpError(404, "No movies available.")
+        return 200, movie
+
+    async def _add(self, data: Dict[str, Any]) -> Response:
+        try:
+            movie = movie_storage.validate_movie(data.get("title"), data.get("rating"),
+                                                 data.get("year"))
+        except ValueError as error:
+            raise HttpError(400, str(error)) from None
+        if not await self._write({"op": "add", "movie": movie.to_dict()}):
+            raise HttpError(409, "Movie already exists.")
+        return 201, movie
+
+    async def _update(self, title: str, data: Dict[str, Any]) -> Response:
+        try:
+            rating = movie_storage.parse_rating(data.get("rating"))
+        except ValueError as error:
+            raise HttpError(400, str(error)) from None
+        if not await self._write({"op": "update", "title": title, "rating": rating}):
+            raise HttpError(404, "Movie not found.")
+        return 200, self.store.get(title)
+
+    # HTTP/1.1
+
+    async def _serve_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                self.requests += 1
+                try:
+                    status, payload = await self.handle(method, target, body)
+                except HttpError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except OSError as error:
+                    status, payload = 500, {"error": f"Could not save: {error}"}
+                except Exception as error:
+                    status, payload = 500, {"error": f"Internal error: {error}"}
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HttpError as error:
+            writer.write(self._response(error.status, {"error": str(error)}, False))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, bytes, bool]]:
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                raise HttpError(400, "Malformed request line.") from None
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:  # a line longer than the reader's limit
+            raise HttpError(400, "Request header too long.") from None
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(411, "Send a Content-Length instead of a chunked body.")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length.") from None
+        if length > MAX_BODY:
+            raise HttpError(413, f"Bodies are limited to {MAX_BODY} bytes.")
+        body = await reader.readexactly(length) if length > 0 else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = (connection != "close" if version == "HTTP/1.1"
+                      else connection == "keep-alive")
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+        body = b"" if payload is None else json.dumps(payload, default=_json_default).encode()
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if body:
+            head.append("Content-Type: application/json")
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def _run(host: str, port: int, ready) -> None:
+    server = MovieServer()
+    address = await server.start(host, port)
+    with contextlib.suppress(NotImplementedError):  # no signal handlers on Windows
+        # stop like Ctrl+C does, saving pending writes
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel)
+    ready(address)
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+
+def run(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None) -> None:
+    """Serve the current MOVIES_FILE until interrupted.
+
+    `ready` is called with the bound (host, port) once listening.
+    """
+    try:
+        asyncio.run(_run(host, port, ready or (lambda address: None)))
+    except KeyboardInterrupt:
+        pass
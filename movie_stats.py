@@ -0,0 +1,270 @@
+import heapq
+import statistics
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from movie_index import SortedList
+from movie_record import Movie, MovieRecord
+
+Rating = Union[int, float]
+
+
+def compute_stats(movies: Iterable[MovieRecord]) -> Optional[Dict[str, Any]]:
+    """Calculate statistics about the movies from scratch.
+
+    Makes one pass over `movies`, keeping only the ratings and the current
+    highest and lowest rated movies, so it can consume a stream.
+    """
+    ratings = []
+    highest_rated: List[MovieRecord] = []
+    lowest_rated: List[MovieRecord] = []
+    for movie in movies:
+        rating = movie["rating"]
+        ratings.append(rating)
+        if not highest_rated or rating > highest_rated[0]["rating"]:
+            highest_rated = [movie]
+        elif rating == highest_rated[0]["rating"]:
+            highest_rated.append(movie)
+        if not lowest_rated or rating < lowest_rated[0]["rating"]:
+            lowest_rated = [movie]
+        elif rating == lowest_rated[0]["rating"]:
+            lowest_rated.append(movie)
+    if not ratings:
+        return None
+    total_movies = len(ratings)
+    average_rating = round(statistics.mean(ratings), 2)
+    median_rating = round(statistics.median(ratings), 2)
+    try:
+        mode_rating = statistics.mode(ratings)
+    except statistics.StatisticsError:
+        mode_rating = "No unique mode"
+
+    return {
+        "total_movies": total_movies,
+        "average_rating": average_rating,
+        "median_rating": median_rating,
+        "mode_rating": mode_rating,
+        "highest_rated": highest_rated,
+        "lowest_rated": lowest_rated,
+    }
+
+
+class RatingStats:
+    """Running rating aggregates, updated as movies come and go.
+
+    Gives the same answers as compute_stats() without touching every
+    movie:
+
+    * the mean comes from exact per-denominator sums (the way the
+      statistics module adds floats), so rounding matches;
+    * the median is read from a SortedList of ratings;
+    * the mode comes from a rating -> count table. Ties go to the rating
+      seen first in file order, like statistics.mode, so each movie carries
+      its file position and each count has a heap of (first position,
+      rating) entries, cleaned lazily;
+    * highest/lowest rated come from per-rating buckets of movies.
+    """
+
+    def __init__(self, movies: Iterable[Tuple[str, Movie]] = ()) -> None:
+        self._next_seq = 0
+        self._seq: Dict[str, int] = {}
+        self._partials: Dict[int, int] = {}
+        self._non_int = 0
+        self._members: Dict[Rating, Dict[int, Movie]] = {}
+        self._seq_heaps: Dict[Rating, List[int]] = {}
+        self._by_count: Dict[int, Set[Rating]] = {}
+        self._mode_heaps: Dict[int, List[Tuple[int, Rating]]] = {}
+        self._max_count = 0
+        ratings = []
+        for seq, (key, movie) in enumerate(movies):
+            rating = movie.rating
+            ratings.append(rating)
+            self._seq[key] = seq
+            n, d = rating.as_integer_ratio()
+            self._partials[d] = self._partials.get(d, 0) + n
+            self._members.setdefault(rating, {})[seq] = movie
+        self._next_seq = len(ratings)
+        self._non_int = sum(1 for rating in ratings if not isinstance(rating, int))
+        self._sorted = SortedList(ratings)
+        # Members were added in file order, so each seq list is already a heap.
+        for rating, members in self._members.items():
+            self._seq_heaps[rating] = list(members)
+            self._by_count.setdefault(len(members), set()).add(rating)
+        for count, bucket in self._by_count.items():
+            heap = [(self._seq_heaps[r][0], r) for r in bucket]
+            heapq.heapify(heap)
+            self._mode_heaps[count] = heap
+        self._max_count = max(self._by_count, default=0)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    # -- maintenance ------------------------------------------------------
+
+    def add(self, key: str, movie: Movie) -> None:
+        """Count a newly added movie."""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq[key] = seq
+        self._count(seq, movie)
+
+    def remove(self, key: str, movie: Movie) -> None:
+        """Forget a deleted movie."""
+        seq = self._seq.pop(key)
+        self._discard(seq, movie.rating)
+
+    def rerate(self, key: str, movie: Movie, old_rating: Rating) -> None:
+        """Move a movie whose rating changed from old_rating."""
+        seq = self._seq[key]
+        self._discard(seq, old_rating)
+        self._count(seq, movie)
+
+    def _count(self, seq: int, movie: Movie) -> None:
+        rating = movie.rating
+        n, d = rating.as_integer_ratio()
+        self._partials[d] = self._partials.get(d, 0) + n
+        if not isinstance(rating, int):
+            self._non_int += 1
+        self._sorted.add(rating)
+        members = self._members.setdefault(rating, {})
+        members[seq] = movie
+        heapq.heappush(self._seq_heaps.setdefault(rating, []), seq)
+        self._recount(rating, len(members) - 1)
+
+    def _discard(self, seq: int, rating: Rating) -> None:
+        n, d = rating.as_integer_ratio()
+        self._partials[d] -= n
+        if not self._partials[d]:
+            del self._partials[d]
+        if not isinstance(rating, int):
+            self._non_int -= 1
+        self._sorted.remove(rating)
+        members = self._members[rating]
+        del members[seq]
+        if not members:
+            del self._members[rating]
+            del self._seq_heaps[rating]
+        self._recount(rating, len(members) + 1)
+
+    def _recount(self, rating: Rating, old: int) -> None:
+        """Move rating from the `old` count bucket to its current one."""
+        new = len(self._members.get(rating, ()))
+        if old:
+            bucket = self._by_count[old]
+            bucket.discard(rating)
+            if not bucket:
+                del self._by_count[old]
+                self._mode_heaps.pop(old, None)
+        if new:
+            self._by_count.setdefault(new, set()).add(rating)
+            heap = self._mode_heaps.setdefault(new, [])
+            heapq.heappush(heap, (self._first_seq(rating), rating))
+            if len(heap) > 2 * len(self._by_count[new]) + 16:
+                self._mode_heaps[new] = heap = [
+                    (self._first_seq(r), r) for r in self._by_count[new]]
+                heapq.heapify(heap)
+        if new > self._max_count:
+            self._max_count = new
+        elif old == self._max_count and old not in self._by_count:
+            self._max_count = max(self._by_count, default=0)
+
+    def _first_seq(self, rating: Rating) -> int:
+        """Return the file position of the first movie with this rating."""
+        heap = self._seq_heaps[rating]
+        members = self._members[rating]
+        while heap[0] not in members:
+            heapq.heappop(heap)
+        if len(heap) > 2 * len(members) + 16:
+            heap[:] = sorted(members)
+        return heap[0]
+
+    # -- queries ----------------------------------------------------------
+
+    def mean(self) -> Rating:
+        """Return the mean rating, typed like statistics.mean()."""
+        total = sum(Fraction(n, d) for d, n in self._partials.items())
+        value = total / len(self._sorted)
+        if not self._non_int and value.denominator == 1:
+            return int(value)
+        return float(value)
+
+    def median(self) -> Rating:
+        """Return the median rating, like statistics.median()."""
+        n = len(self._sorted)
+        i = n // 2
+        if n % 2 == 1:
+            return self._sorted[i]
+        return (self._sorted[i - 1] + self._sorted[i]) / 2
+
+    def mode(self) -> Rating:
+        """Return the most common rating, first-seen on ties."""
+        count = self._max_count
+        heap = self._mode_heaps[count]
+        while True:
+            seq, rating = heap[0]
+            if (len(self._members.get(rating, ())) == count
+                    and self._first_seq(rating) == seq):
+                return rating
+            heapq.heappop(heap)
+
+    def movies_rated(self, rating: Rating) -> List[Movie]:
+        """Return the movies with exactly this rating, in file order."""
+        members = self._members.get(rating, {})
+        return [members[seq] for seq in sorted(members)]
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Return the same dict as compute_stats()."""
+        if not self._sorted:
+            return None
+        return {
+            "total_movies": len(self._sorted),
+            "average_rating": round(self.mean(), 2),
+            "median_rating": round(self.median(), 2),
+            "mode_rating": self.mode(),
+            "highest_rated": self.movies_rated(self._sorted[-1]),
+            "lowest_rated": self.movies_rated(self._sorted[0]),
+        }
+
+
+class RatingBins:
+    """Counts of ratings in `bins` equal-width bins over [low, high].
+
+    Unlike plt.hist's default, the edges are fixed rather than fitted to the
+    data, so the counts can be kept up to date one movie at a time. Like
+    np.histogram, the last bin includes `high`; ratings outside the range
+    are counted in the nearest end bin.
+    """
+
+    def __init__(self, ratings: Iterable[Rating] = (), bins: int = 10,
+                 low: Rating = 0, high: Rating = 10) -> None:
+        self.low = low
+        self.high = high
+        self._width = (high - low) / bins
+        self._counts = [0] * bins
+        for rating in ratings:
+            self._counts[self._bin(rating)] += 1
+
+    def _bin(self, rating: Rating) -> int:
+        index = int((rating - self.low) // self._width)
+        return min(max(index, 0), len(self._counts) - 1)
+
+    def add(self, rating: Rating) -> None:
+        self._counts[self._bin(rating)] += 1
+
+    def remove(self, rating: Rating) -> None:
+        self._counts[self._bin(rating)] -= 1
+
+    def rerate(self, old_rating: Rating, rating: Rating) -> None:
+        self.remove(old_rating)
+        self.add(rating)
+
+    @property
+    def counts(self) -> Tuple[int, ...]:
+        return tuple(self._counts)
+
+    @property
+    def edges(self) -> Tuple[float, ...]:
+        return tuple(self.low + i * self._width for i in range(len(self._counts) + 1))
+
+    def __len__(self) -> int:
+        return sum(self._counts)
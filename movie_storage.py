@@ -1,35 +1,1212 @@
+import atexit
+import contextlib
 import json
-from typing import Optional, Dict, List, Union
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+from typing import Any, BinaryIO, Callable, ContextManager, Optional, Dict, Iterable, Iterator, List, Tuple
+
+import movie_formats
+import movie_search
+from movie_index import Cursor, MovieSampler, Predicate, RatingIndex
+from movie_lock import FileLock
+from movie_record import FrozenMovie, Movie, MovieRecord, normalize_title
+from movie_search import LRUCache, TrigramIndex
+from movie_stats import RatingBins, RatingStats, compute_stats
 
 MOVIES_FILE = "data.json"
 
-def load_movies() -> List[Dict[str, Union[str, int, float]]]:
-    """Load movies from the JSON file."""
+# Mutations are appended to "<MOVIES_FILE>.journal" and folded back into the
+# snapshot once the journal grows past this many bytes.
+JOURNAL_ENABLED = True
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+# How often a write is retried when another process changes the database
+# between our re-read and our write (only possible without fcntl locks).
+WRITE_RETRIES = 5
+
+# Encoding for rewritten snapshots, one of movie_formats.SNAPSHOT_FORMATS.
+# None keeps whatever the file already uses (pretty JSON for new files).
+SNAPSHOT_FORMAT: Optional[str] = None
+
+# Previous snapshots kept as "<MOVIES_FILE>.1" (newest) .. ".N" each time
+# the snapshot is rewritten. 0 keeps none.
+BACKUP_COUNT = 0
+
+# Number of recent search queries whose results each store remembers.
+SEARCH_CACHE_SIZE = 256
+
+# Accepted ranges for new movies, shared by the menu and bulk imports.
+MIN_RATING, MAX_RATING = 0, 10
+MIN_YEAR, MAX_YEAR = 1800, 2100
+
+# Equal-width rating bins between MIN_RATING and MAX_RATING for histograms.
+HISTOGRAM_BINS = 10
+
+# Stream whole-catalog passes (listings, stats, histogram) from the file
+# instead of loading it, for catalogs too large to keep in memory. Every
+# listing then re-parses the file; stats and bins are kept until it changes.
+LOW_MEMORY = False
+
+Operation = Dict[str, Any]
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+def _file_signature(path: str) -> FileSignature:
+    """Return (mtime_ns, size, inode) of a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ConcurrentWriteError(RuntimeError):
+    """Raised when other writers keep changing the database under a write."""
+
+
+def _fsync_dir(directory: str) -> None:
+    """Flush a directory entry change (a rename) to disk where supported."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_backups(path: str, count: int) -> None:
+    """Shift path.1 .. path.N up by one and copy path to path.1."""
+    if not os.path.exists(path):
+        return
+    for i in range(count - 1, 0, -1):
+        older = f"{path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}")
+    newest = path + ".1"
+    try:
+        os.remove(newest)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], None], backups: int = 0) -> None:
+    """Replace the file at path with what write(file) produces, atomically.
+
+    `file` is opened in binary mode.
+
+    The new contents go to a temporary file in the same directory, which
+    is flushed, fsynced and then renamed over path with os.replace. Readers
+    and a crash at any point see either the old file or the new one, never
+    a mix. With backups > 0 the old file is first kept as path.1, and
+    older backups move up to path.N.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
     try:
-        with open(MOVIES_FILE, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return data.get("movies", [])
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, mode)
+        if backups > 0:
+            _rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+class JsonBackend:
+    """Stores movies as a `{"movies": [...]}` JSON snapshot plus a journal.
+
+    The snapshot may also use any other movie_formats.SNAPSHOT_FORMATS
+    encoding (compact JSON, compressed JSON lines, binary columns); it is
+    recognized from the file header when read.
+
+    Single-movie changes are not written by rewriting the snapshot. They are
+    appended as JSON lines to a journal next to it, replayed on load and
+    compacted into the snapshot once the journal passes JOURNAL_MAX_BYTES
+    (or when the process exits). The journal's first line records the
+    signature of the snapshot it applies to, so a journal left behind by a
+    snapshot that has since been replaced is ignored.
+
+    The snapshot itself is only ever replaced through atomic_write(), so a
+    crash mid-save leaves the previous one intact. It carries a "version"
+    that every change bumps; journal entries are stamped with theirs.
+    Writers serialize on an fcntl lock on "<path>.lock".
+    """
+
+    def __init__(self, path: str, journal: Optional[bool] = None,
+                 backups: Optional[int] = None, snapshot_format: Optional[str] = None) -> None:
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.journal = JOURNAL_ENABLED if journal is None else journal
+        self.backups = BACKUP_COUNT if backups is None else backups
+        self.snapshot_format = SNAPSHOT_FORMAT if snapshot_format is None else snapshot_format
+        self._file_format: Optional[str] = None
+        self.version = 0
+        self._lock = FileLock(path + ".lock")
+        self._snapshot: FileSignature = None
+        self._journal_end: Optional[int] = None
+        self._catalog: Optional[movie_formats.BinaryCatalog] = None
+        self._catalog_signature: FileSignature = None
+
+    def signature(self) -> Tuple[FileSignature, FileSignature]:
+        """Return the signatures of the snapshot and its journal."""
+        return _file_signature(self.path), _file_signature(self.journal_path)
+
+    def catalog(self) -> Optional[movie_formats.BinaryCatalog]:
+        """Return the snapshot mapped for random access, or None.
+
+        Only a binary snapshot with no journal on top can answer lookups
+        by itself. The mapping is kept until the snapshot is replaced.
+        """
+        if os.path.exists(self.journal_path):
+            return None
+        signature = _file_signature(self.path)
+        if self._catalog is None or signature != self._catalog_signature:
+            self._close_catalog()
+            if movie_formats.detect_snapshot_format(self.path) != "binary":
+                return None
+            try:
+                self._catalog = movie_formats.BinaryCatalog(self.path)
+            except (FileNotFoundError, ValueError):
+                return None
+            self._catalog_signature = signature
+        return self._catalog
+
+    def _close_catalog(self) -> None:
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    @property
+    def has_pending(self) -> bool:
+        """True if the journal holds changes not yet in the snapshot."""
+        return self._journal_end is not None
+
+    def lock(self) -> FileLock:
+        """Return the lock writers hold while they re-read and write."""
+        return self._lock
+
+    def _read_snapshot(self) -> List[MovieRecord]:
+        meta: Dict[str, Any] = {}
+        try:
+            self._file_format = movie_formats.detect_snapshot_format(self.path)
+            movies = [FrozenMovie.from_dict(m)
+                      for m in movie_formats.load_snapshot(self.path, meta)]
+        except (FileNotFoundError, ValueError):
+            movies = []
+        version = meta.get("version")
+        self.version = version if isinstance(version, int) else 0
+        return movies
+
+    def stream(self) -> Optional[Iterator[MovieRecord]]:
+        """Return an iterator over the snapshot read straight from disk.
+
+        Returns None if a journal exists, since its changes would have to
+        be replayed on top. A malformed snapshot ends the iteration early.
+        """
+        if os.path.exists(self.journal_path):
+            return None
+        return self._stream_snapshot()
+
+    def _stream_snapshot(self) -> Iterator[MovieRecord]:
+        try:
+            yield from map(Movie.from_dict, movie_formats.read_snapshot(self.path))
+        except (FileNotFoundError, ValueError):
+            return
+
+    def _read_journal(self) -> List[Operation]:
+        """Return journal entries written against the current snapshot.
+
+        Sets the offset just past the last complete entry, or None if there
+        is no journal or it belongs to another snapshot. A torn trailing
+        line from an interrupted write is skipped.
+        """
+        self._journal_end = None
+        ops = []
+        try:
+            with open(self.journal_path, "rb") as file:
+                header = file.readline()
+                try:
+                    written_for = json.loads(header).get("snapshot")
+                except (ValueError, AttributeError):
+                    return []
+                snapshot = self._snapshot
+                if written_for != (list(snapshot) if snapshot else None):
+                    return []
+                end = self._read_ops(file, len(header), ops)
+        except FileNotFoundError:
+            return []
+        self._journal_end = end
+        return ops
+
+    def _read_ops(self, file, end: int, ops: List[Operation]) -> int:
+        """Append the complete entries after offset `end` to ops.
+
+        Returns the offset just past the last one and advances the version.
+        """
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                op = json.loads(line)
+            except ValueError:
+                break
+            ops.append(op)
+            self.version = op.get("version", self.version + 1)
+            end += len(line)
+        return end
+
+    def load_changes(self) -> Optional[List[Operation]]:
+        """Return journal entries added since the last load, if that is all.
+
+        Returns None when the snapshot was replaced or the journal was
+        rewritten, in which case the caller has to load() again.
+        """
+        if _file_signature(self.path) != self._snapshot:
+            return None
+        if self._journal_end is None:
+            return self._read_journal()
+        ops: List[Operation] = []
+        try:
+            with open(self.journal_path, "rb") as file:
+                if os.fstat(file.fileno()).st_size < self._journal_end:
+                    return None
+                file.seek(self._journal_end)
+                self._journal_end = self._read_ops(file, self._journal_end, ops)
+        except FileNotFoundError:
+            return None
+        return ops
+
+    def load(self) -> Tuple[List[MovieRecord], List[Operation]]:
+        """Return the snapshot and the journal entries to replay on it."""
+        self._snapshot = _file_signature(self.path)
+        return self._read_snapshot(), self._read_journal()
+
+    def save(self, movies: Iterable[MovieRecord], changes: int = 1) -> None:
+        """Rewrite the snapshot and drop the journal.
+
+        The version goes up by `changes`; compaction passes 0 since it
+        only folds in changes already counted.
+        """
+        self.version += changes
+        fmt = self.snapshot_format or self._file_format or "json"
+        records = [Movie.from_dict(m) for m in movies]
+        self._close_catalog()
+        atomic_write(self.path,
+                     lambda file: movie_formats.write_snapshot(file, records, self.version, fmt),
+                     backups=self.backups)
+        self._file_format = fmt
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._snapshot = _file_signature(self.path)
+        self._journal_end = None
+
+    def execute_many(self, ops: List[Operation]) -> None:
+        """Journal entries can only be checked against the loaded movies."""
+        return None
+
+    def append(self, op: Operation, movies: Iterable[MovieRecord]) -> None:
+        """Persist an operation already applied to `movies`."""
+        self.append_many([op], movies)
+
+    def append_many(self, ops: List[Operation], movies: Iterable[MovieRecord]) -> None:
+        """Persist operations already applied to `movies` in one write.
+
+        They go to the journal unless that would take it past
+        JOURNAL_MAX_BYTES, in which case the snapshot is rewritten instead.
+        With no snapshot yet (a new database), one is written, so the
+        movies never live only in a journal.
+        """
+        if not self.journal or self._snapshot is None:
+            self.save(movies, changes=len(ops))
+            return
+        room = JOURNAL_MAX_BYTES - (self._journal_end or 0)
+        lines = []
+        for version, op in enumerate(ops, self.version + 1):
+            line = json.dumps(dict(op, version=version)).encode() + b"\n"
+            room -= len(line)
+            if room < 0:
+                self.save(movies, changes=len(ops))
+                return
+            lines.append(line)
+        if self._journal_end is None:
+            with open(self.journal_path, "wb") as file:
+                header = {"snapshot": self._snapshot}
+                file.write(json.dumps(header).encode() + b"\n")
+                self._journal_end = file.tell()
+        with open(self.journal_path, "r+b") as file:
+            # Seeking to the last good entry drops any torn tail.
+            file.seek(self._journal_end)
+            file.write(b"".join(lines))
+            file.truncate()
+            self._journal_end = file.tell()
+        self.version += len(ops)
+
+    def compact(self, movies: Iterable[MovieRecord]) -> None:
+        """Fold the journal into the snapshot."""
+        self.save(movies, changes=0)
+
+
+class SqliteBackend:
+    """Stores movies in an SQLite database, one row per movie.
+
+    Titles are looked up through a unique index on their normalized form,
+    so every single-movie change is one indexed statement. The version
+    stamp lives in `PRAGMA user_version`, and writers serialize on
+    SQLite's own write lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movies (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            title_key TEXT NOT NULL,
+            rating REAL NOT NULL,
+            year INTEGER NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_movies_title_key ON movies (title_key);
+        CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating);
+        CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year);
+    """
+
+    has_pending = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(self.SCHEMA)
+        self.version = 0
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the database's write lock (BEGIN IMMEDIATE) for the block."""
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+    def _set_version(self, version: int) -> None:
+        self.conn.execute(f"PRAGMA user_version = {int(version)}")
+        self.version = version
+
+    def signature(self) -> int:
+        """Return a counter that changes when another connection commits."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> Tuple[List[MovieRecord], List[Operation]]:
+        """Return all movies in insertion order."""
+        self.version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        rows = self.conn.execute("SELECT title, rating, year FROM movies ORDER BY id")
+        return [FrozenMovie(t, r, y) for t, r, y in rows], []
+
+    def load_changes(self) -> None:
+        """Changes are not tracked per statement; callers load() again."""
+        return None
+
+    def catalog(self) -> None:
+        """There is no mapped snapshot; lookups go through the store."""
+        return None
+
+    def stream(self) -> Iterator[MovieRecord]:
+        """Return an iterator over the table, fetched row by row."""
+        rows = self.conn.execute("SELECT title, rating, year FROM movies ORDER BY id")
+        return (Movie(t, r, y) for t, r, y in rows)
+
+    def save(self, movies: Iterable[MovieRecord]) -> None:
+        """Replace the whole table with `movies`."""
+        with self.lock():
+            self.conn.execute("DELETE FROM movies")
+            self.conn.executemany(
+                "INSERT INTO movies (title, title_key, rating, year) VALUES (?, ?, ?, ?)",
+                ((m["title"], normalize_title(m["title"]), m["rating"], m["year"])
+                 for m in movies))
+            self._set_version(self.version + 1)
+
+    def append(self, op: Operation, movies: Iterable[MovieRecord]) -> None:
+        """Persist an operation already applied to `movies`."""
+        self.append_many([op], movies)
+
+    def append_many(self, ops: List[Operation], movies: Iterable[MovieRecord]) -> None:
+        """Persist operations already applied to `movies` in one transaction.
+
+        Inside lock() this joins its transaction, so the commit (and the
+        release of the write lock) waits until the caller has recorded
+        the new signature.
+        """
+        with self.lock():
+            for op in ops:
+                self._execute(op)
+            self._set_version(self.version + len(ops))
+
+    def execute_many(self, ops: List[Operation]) -> List[Operation]:
+        """Run operations without the movies loaded; return those that changed a row.
+
+        Each is one indexed statement, and the unique title index rejects
+        duplicate adds, so nothing has to be read first.
+        """
+        with self.lock():
+            applied = [op for op in ops if self._execute(op)]
+            if applied:
+                version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+                self._set_version(version + len(applied))
+        return applied
+
+    def _execute(self, op: Operation) -> bool:
+        kind = op["op"]
+        if kind == "add":
+            m = op["movie"]
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO movies (title, title_key, rating, year) VALUES (?, ?, ?, ?)",
+                (m["title"], normalize_title(m["title"]), m["rating"], m["year"]))
+        elif kind == "delete":
+            cursor = self.conn.execute("DELETE FROM movies WHERE title_key = ?",
+                                       (normalize_title(op["title"]),))
+        elif kind == "update":
+            cursor = self.conn.execute("UPDATE movies SET rating = ? WHERE title_key = ?",
+                                       (op["rating"], normalize_title(op["title"])))
+        else:
+            raise ValueError(f"Unknown operation: {kind!r}")
+        return cursor.rowcount > 0
+
+    def compact(self, movies: Iterable[MovieRecord]) -> None:
+        """Nothing to do; every change is already in the table."""
+
+
+# Storage backends by file extension; anything else is treated as JSON.
+BACKENDS = {
+    ".db": SqliteBackend,
+    ".sqlite": SqliteBackend,
+    ".sqlite3": SqliteBackend,
+}
+
+
+def open_backend(path: str):
+    """Return the storage backend for `path`, chosen by its extension."""
+    backend = BACKENDS.get(os.path.splitext(path)[1].lower(), JsonBackend)
+    return backend(path)
+
+
+class MovieStore:
+    """In-memory copy of a movie database.
+
+    The database is read once and kept in memory; it is only re-read when
+    the backend reports a change (a new mtime, size or inode for JSON files,
+    a commit from another connection for SQLite), so repeated menu actions
+    stay cheap. Changes are applied in memory and handed to the backend as
+    small operations.
+
+    Movies are held in a dict keyed by normalize_title(), in file order, so
+    lookups, duplicate checks, deletes and rating updates are dictionary
+    operations. If a file lists the same title twice, the first entry wins.
+
+    `generation` goes up on every change to the in-memory movies, so
+    anything cached against a generation is never served stale. `version`
+    is the stamp persisted in the database, shared by every process.
+
+    Writes hold the backend's lock while they re-read the database and
+    apply their change on top, so concurrent processes never overwrite
+    each other's changes.
+    """
+
+    def __init__(self, path: str, backend=None) -> None:
+        self.path = path
+        self.backend = backend if backend is not None else open_backend(path)
+        self._by_key: Dict[str, MovieRecord] = {}
+        self._stats: Optional[RatingStats] = None
+        self._titles: Optional[TrigramIndex] = None
+        self._sampler: Optional[MovieSampler] = None
+        self._ratings: Optional[RatingIndex] = None
+        self._bins: Optional[RatingBins] = None
+        self.generation = 0
+        self.search_cache = LRUCache(SEARCH_CACHE_SIZE)
+        self._signature: Any = None
+        self._loaded = False
+        self._exit_hook = False
+        self._batch: Optional[List[Operation]] = None
+        self._passes: Dict[str, Tuple[Any, Any]] = {}
+
+    def is_stale(self) -> bool:
+        """Return True if the database changed since it was last read."""
+        return not self._loaded or self.backend.signature() != self._signature
+
+    def refresh(self) -> None:
+        """Reload the database if it changed.
+
+        If only new journal entries were added, just those are replayed.
+        """
+        if not self.is_stale():
+            return
+        if self._loaded:
+            signature = self.backend.signature()
+            ops = self.backend.load_changes()
+            if ops is not None:
+                for op in ops:
+                    self._apply(op)
+                self._signature = signature
+                return
+        self.reload()
+
+    @property
+    def version(self) -> int:
+        """The database's version stamp; every change bumps it."""
+        self.refresh()
+        return self.backend.version
+
+    def _reset(self, movies: Iterable[MovieRecord]) -> None:
+        """Rebuild the in-memory indexes from scratch."""
+        self._by_key = {}
+        self._stats = None
+        self._titles = None
+        self._sampler = None
+        self._ratings = None
+        self._bins = None
+        self.generation += 1
+        by_key = self._by_key
+        for movie in movies:
+            movie = FrozenMovie.from_dict(movie)
+            key = normalize_title(movie.title)
+            if key not in by_key:
+                by_key[key] = movie  # the indexes are built from these on first use
+
+    def reload(self) -> None:
+        """Unconditionally re-read the database."""
+        signature = self.backend.signature()
+        movies, ops = self.backend.load()
+        self._reset(movies)
+        for op in ops:
+            self._apply(op)
+        self._signature = signature
+        self._loaded = True
+
+    @property
+    def movies(self) -> List[MovieRecord]:
+        """Copies of the movies in file order, refreshed from disk if needed.
+
+        Changing a copy does not change the store; go through mutate()
+        (add_movie(), update_movie_rating(), ...) so the indexes follow.
+        """
+        self.refresh()
+        return [movie.copy() for movie in self._by_key.values()]
+
+    def __iter__(self) -> Iterator[MovieRecord]:
+        self.refresh()
+        return iter(self._by_key.values())
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._by_key)
+
+    @property
+    def in_memory(self) -> bool:
+        """True if the movies are loaded and up to date."""
+        return not self.is_stale()
+
+    @property
+    def streaming(self) -> bool:
+        """True if whole-catalog passes read the file instead of memory.
 
-def save_movies(movies: List[Dict[str, Union[str, int, float]]]) -> None:
-    """Save movies to the JSON file."""
-    with open(MOVIES_FILE, "w", encoding="utf-8") as file:
-        json.dump({"movies": movies}, file, indent=4)
+        Only with LOW_MEMORY set, and only while the store is not loaded.
+        """
+        return LOW_MEMORY and self.is_stale()
+
+    def stream(self) -> Iterator[MovieRecord]:
+        """Yield the movies in file order.
+
+        Normally the store is loaded (once) and iterated. In LOW_MEMORY
+        mode, if the store is not in memory and the backend can read its
+        records one at a time, they are streamed from disk and only their
+        title keys are kept, to skip duplicates the way loading does.
+        """
+        records = self.backend.stream() if self.streaming else None
+        if records is None:
+            yield from self
+            return
+        seen = set()
+        for movie in records:
+            key = normalize_title(movie["title"])
+            if key not in seen:
+                seen.add(key)
+                yield movie
+
+    def get(self, title: str) -> Optional[MovieRecord]:
+        """Return the movie with this title, or None.
+
+        If the store is not in memory and the backend has a mapped
+        catalog, the title is looked up there without loading anything.
+        """
+        if self.is_stale():
+            catalog = self.backend.catalog()
+            if catalog is not None:
+                return catalog.find(title)
+        self.refresh()
+        return self._by_key.get(normalize_title(title))
+
+    def random_movie(self, rng: Any = random, weighted: bool = False,
+                     where: Optional[Predicate] = None) -> Optional[MovieRecord]:
+        """Return a random movie, or None if none qualifies.
+
+        See sample() for `weighted` and `where`. A plain uniform pick
+        reads a single record from a mapped catalog, like get(), when
+        the store is not in memory.
+        """
+        if not weighted and where is None and self.is_stale():
+            catalog = self.backend.catalog()
+            if catalog is not None:
+                return catalog[rng.randrange(len(catalog))] if len(catalog) else None
+        return self._movie_sampler().pick(rng, weighted, where)
+
+    def sample(self, k: int, rng: Any = random, weighted: bool = False,
+               where: Optional[Predicate] = None) -> List[MovieRecord]:
+        """Return up to k distinct random movies.
+
+        With weighted=True, higher-rated movies are proportionally more
+        likely. `where` (for example movie_index.movie_filter(min_rating=8))
+        restricts the draw to the movies it accepts. Picks come from a
+        sampler built on first use and then kept up to date.
+        """
+        return self._movie_sampler().sample(k, rng, weighted, where)
+
+    def __contains__(self, title: str) -> bool:
+        return self.get(title) is not None
+
+    def save(self, movies: Iterable[MovieRecord]) -> None:
+        """Write movies to disk and keep them as the cached copy."""
+        with self.backend.lock():
+            if not self._loaded:
+                self.reload()  # to continue from the current version
+            self._reset(movies)
+            self.backend.save(self._by_key.values())
+            self._signature = self.backend.signature()
+            self._loaded = True
+            if self._batch:
+                self._batch.clear()  # replaced by the saved movies
+
+    def compact(self) -> None:
+        """Fold any journaled changes into the backend's snapshot."""
+        with self.backend.lock():
+            self.refresh()
+            if self._batch:
+                self.backend.append_many(self._batch, self._by_key.values())
+                self._batch.clear()
+            if not self.backend.has_pending:
+                return  # another process compacted, or nothing was written
+            self.backend.compact(self._by_key.values())
+            self._signature = self.backend.signature()
+
+    @property
+    def stats(self) -> RatingStats:
+        """Rating aggregates, built on first use and then kept up to date."""
+        self.refresh()
+        if self._stats is None:
+            self._stats = RatingStats(self._by_key.items())
+        return self._stats
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Return the compute_stats() dict for the movies, or None if there are none.
+
+        Served from the incrementally maintained stats, or in LOW_MEMORY
+        mode from one streaming pass, kept until the database changes.
+        """
+        if self.streaming:
+            return self._streamed_pass("summary", compute_stats)
+        return self.stats.snapshot()
+
+    @property
+    def bins(self) -> RatingBins:
+        """Histogram bin counts, built on first use and then kept up to date."""
+        if self.streaming:
+            return self._streamed_pass("bins", rating_bins)
+        self.refresh()
+        if self._bins is None:
+            self._bins = rating_bins(self._by_key.values())
+        return self._bins
+
+    def search(self, query: str) -> List[MovieRecord]:
+        """Return movies whose normalized title contains the normalized query.
+
+        Served from a trigram index that is built on the first search and
+        then kept up to date.
+        """
+        index = self._title_index()
+        by_key = self._by_key
+        return [by_key[key] for key in index.search(normalize_title(query))]
+
+    def suggest(self, query: str, limit: int = 3) -> List[Tuple[MovieRecord, float]]:
+        """Return up to limit (movie, score) fuzzy matches for query, best first.
+
+        Only the titles sharing the most trigrams with the query are scored.
+        """
+        index = self._title_index()
+        by_key = self._by_key
+        candidates = [by_key[key] for key in index.candidates(normalize_title(query))]
+        titles = [movie["title"] for movie in candidates]
+        by_title = dict(zip(titles, candidates))
+        return [(by_title[title], score) for title, score in
+                movie_search.fuzzy_matches(query, titles, limit)]
+
+    def lookup(self, query: str, limit: int = 3
+               ) -> Tuple[List[MovieRecord], List[Tuple[MovieRecord, float]]]:
+        """Return (substring matches, fuzzy suggestions) for query.
+
+        Suggestions are only looked for when nothing matches. Results are
+        cached per normalized query until the movies next change.
+        """
+        query = normalize_title(query)
+        self.refresh()
+        cache_key = (query, limit, self.generation)
+        result = self.search_cache.get(cache_key)
+        if result is None:
+            matches = self.search(query)
+            suggestions = [] if matches else self.suggest(query, limit)
+            result = (matches, suggestions)
+            self.search_cache.put(cache_key, result)
+        return list(result[0]), list(result[1])
+
+    def _title_index(self) -> TrigramIndex:
+        self.refresh()
+        if self._titles is None:
+            self._titles = TrigramIndex(self._by_key)
+        return self._titles
+
+    def _rating_index(self) -> RatingIndex:
+        self.refresh()
+        if self._ratings is None:
+            self._ratings = RatingIndex(self._by_key.items())
+        return self._ratings
+
+    def sorted_by_rating(self) -> List[MovieRecord]:
+        """Return all movies, highest rated first, ties in file order.
+
+        This and the queries below read a rating index that is built on
+        first use and then kept sorted as movies change.
+        """
+        return list(self._rating_index())
+
+    def iter_by_rating(self, page_size: int = 100) -> Iterator[MovieRecord]:
+        """Yield every movie, highest rated first, a page of the index at a time.
+
+        Only the pages actually read are looked up, so the first screen of
+        a sorted listing does not walk the whole catalog.
+        """
+        cursor = None
+        while True:
+            page, cursor = self.rating_page(page_size, cursor)
+            yield from page
+            if cursor is None:
+                return
+
+    def top_rated(self, k: int) -> List[MovieRecord]:
+        """Return the k highest-rated movies, highest first."""
+        return self._rating_index().top_n(k)
+
+    def lowest_rated(self, k: int) -> List[MovieRecord]:
+        """Return the k lowest-rated movies, lowest first."""
+        return self._rating_index().bottom_n(k)
+
+    def rated_between(self, low: Optional[float] = None,
+                      high: Optional[float] = None) -> List[MovieRecord]:
+        """Return the movies rated low..high inclusive, highest first."""
+        return self._rating_index().between(low, high)
+
+    def rating_page(self, limit: int, cursor: Optional[Cursor] = None
+                    ) -> Tuple[List[MovieRecord], Optional[Cursor]]:
+        """Return one page of movies by rating and the cursor for the next."""
+        return self._rating_index().page(limit, cursor)
+
+    def _movie_sampler(self) -> MovieSampler:
+        self.refresh()
+        if self._sampler is None:
+            self._sampler = MovieSampler(self._by_key.items())
+        return self._sampler
+
+    def _insert(self, key: str, movie: MovieRecord) -> None:
+        self._by_key[key] = movie
+        self.generation += 1
+        if self._titles is not None:
+            self._titles.add(key)
+        if self._stats is not None:
+            self._stats.add(key, movie)
+        if self._sampler is not None:
+            self._sampler.add(key, movie)
+        if self._ratings is not None:
+            self._ratings.add(key, movie)
+        if self._bins is not None:
+            self._bins.add(movie.rating)
+
+    def _remove(self, key: str) -> None:
+        movie = self._by_key.pop(key)
+        self.generation += 1
+        if self._titles is not None:
+            self._titles.remove(key)
+        if self._stats is not None:
+            self._stats.remove(key, movie)
+        if self._sampler is not None:
+            self._sampler.remove(key)
+        if self._ratings is not None:
+            self._ratings.remove(key)
+        if self._bins is not None:
+            self._bins.remove(movie.rating)
+
+    def _set_rating(self, key: str, rating: float) -> None:
+        movie = self._by_key[key]
+        old_rating = movie.rating
+        object.__setattr__(movie, "rating", rating)  # records are read-only to callers
+        self.generation += 1
+        if self._stats is not None:
+            self._stats.rerate(key, movie, old_rating)
+        if self._sampler is not None:
+            self._sampler.rerate(key, movie)
+        if self._ratings is not None:
+            self._ratings.rerate(key, movie)
+        if self._bins is not None:
+            self._bins.rerate(old_rating, rating)
+
+    def _apply(self, op: Operation) -> bool:
+        """Apply one operation to the in-memory indexes."""
+        kind = op["op"]
+        if kind == "add":
+            key = normalize_title(op["movie"]["title"])
+            if key in self._by_key:
+                return False
+            self._insert(key, FrozenMovie.from_dict(op["movie"]))
+            return True
+        key = normalize_title(op["title"])
+        if key not in self._by_key:
+            return False
+        if kind == "delete":
+            self._remove(key)
+            return True
+        if kind == "update":
+            self._set_rating(key, op["rating"])
+            return True
+        raise ValueError(f"Unknown operation: {kind!r}")
+
+    def mutate(self, op: Operation) -> bool:
+        """Apply an operation and persist it if it changed anything."""
+        return self.mutate_many([op]) == 1
+
+    def mutate_many(self, ops: Iterable[Operation]) -> int:
+        """Apply operations and persist the ones that changed anything.
+
+        Everything is applied in memory first and written in one go. The
+        operations are applied to a fresh read of the database. If the
+        database still changes before the write (possible only where the
+        lock is not supported), it is re-read and the batch retried.
+        Returns the number of operations applied.
+
+        When the movies are not loaded, or changed on disk since, a backend
+        that can check operations itself (SQLite) runs them directly, and
+        the database is read again only when something next needs it.
+
+        Inside batch(), operations are only applied in memory and written
+        when the batch ends.
+        """
+        if self._batch is not None:
+            applied = [op for op in ops if self._apply(op)]
+            self._batch.extend(applied)
+            return len(applied)
+        ops = list(ops)
+        for _ in range(WRITE_RETRIES):
+            with self.backend.lock():
+                if self.is_stale():
+                    applied = self.backend.execute_many(ops)
+                    if applied is not None:
+                        self._loaded = False
+                        if applied:
+                            self._passes.clear()  # our own commits keep the signature
+                        return len(applied)
+                self.refresh()
+                try:
+                    applied = [op for op in ops if self._apply(op)]
+                except Exception:
+                    self._loaded = False  # partly applied in memory; re-read
+                    raise
+                if not applied:
+                    return 0
+                if self.backend.signature() != self._signature:
+                    self._loaded = False  # lost the race; re-read and retry
+                    continue
+                try:
+                    self.backend.append_many(applied, self._by_key.values())
+                except Exception:
+                    self._loaded = False  # memory is ahead of disk; re-read
+                    raise
+                self._signature = self.backend.signature()
+            self._register_exit_hook()
+            return len(applied)
+        raise ConcurrentWriteError(
+            f"{self.path} kept changing; gave up after {WRITE_RETRIES} attempts")
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer every change made in the block to a single write at its end.
+
+        The backend's lock is held for the whole block, so the in-memory
+        copy stays current without re-reading the database, and reads see
+        the block's own changes. If the block raises, its changes are
+        dropped and the database is re-read on next use. Nested batches
+        join the outer one.
+        """
+        if self._batch is not None:
+            yield
+            return
+        with self.backend.lock():
+            self.refresh()
+            self._batch = []
+            try:
+                yield
+                if self._batch:
+                    self.backend.append_many(self._batch, self._by_key.values())
+                    self._signature = self.backend.signature()
+            except BaseException:
+                self._loaded = False  # memory is ahead of disk; re-read
+                raise
+            finally:
+                self._batch = None
+        self._register_exit_hook()
+
+    def _register_exit_hook(self) -> None:
+        if self.backend.has_pending and not self._exit_hook:
+            atexit.register(self._compact_at_exit)
+            self._exit_hook = True
+
+    def _streamed_pass(self, name: str, build: Callable[[Iterable[MovieRecord]], Any]) -> Any:
+        """Return build(stream()), reused until the backend's signature changes."""
+        signature = self.backend.signature()
+        cached = self._passes.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        result = build(self.stream())
+        self._passes[name] = (signature, result)
+        return result
+
+    def _compact_at_exit(self) -> None:
+        # Folding the journal is only housekeeping; a database that has
+        # gone away keeps its journal for the next load, and one whose
+        # snapshot was deleted is not recreated (nor is its lock file).
+        if self.backend.has_pending and os.path.exists(self.path):
+            try:
+                self.compact()
+            except OSError:
+                pass
+
+
+_store: Optional[MovieStore] = None
+
+
+def rating_bins(movies: Iterable[MovieRecord]) -> RatingBins:
+    """Count movies into the HISTOGRAM_BINS rating bins in one pass."""
+    return RatingBins((movie["rating"] for movie in movies),
+                      HISTOGRAM_BINS, MIN_RATING, MAX_RATING)
+
+
+def get_store() -> MovieStore:
+    """Return the shared store for the current MOVIES_FILE."""
+    global _store
+    if _store is None or _store.path != MOVIES_FILE:
+        _store = MovieStore(MOVIES_FILE)
+    return _store
+
+
+def load_movies() -> List[MovieRecord]:
+    """Load movies from the database."""
+    return list(get_store().movies)
+
+
+def iter_movies() -> Iterator[MovieRecord]:
+    """Yield movies one at a time, streaming from disk when not loaded."""
+    return get_store().stream()
+
+
+def iter_movies_by_rating() -> Iterator[MovieRecord]:
+    """Yield movies highest rated first, reading the rating index lazily."""
+    return get_store().iter_by_rating()
+
+
+def random_movie(weighted: bool = False, where: Optional[Predicate] = None) -> Optional[MovieRecord]:
+    """Return a random movie, or None if there are none."""
+    return get_store().random_movie(weighted=weighted, where=where)
+
+
+def top_rated_movies(k: int) -> List[MovieRecord]:
+    """Return the k highest-rated movies."""
+    return get_store().top_rated(k)
+
+
+def movies_by_rating_page(limit: int, cursor: Optional[Cursor] = None
+                          ) -> Tuple[List[MovieRecord], Optional[Cursor]]:
+    """Return a page of movies by rating and the cursor for the next page."""
+    return get_store().rating_page(limit, cursor)
+
+
+def sample_movies(k: int, weighted: bool = False,
+                  where: Optional[Predicate] = None) -> List[MovieRecord]:
+    """Return up to k distinct random movies."""
+    return get_store().sample(k, weighted=weighted, where=where)
+
+
+def batch() -> ContextManager[None]:
+    """Group the changes made in a `with` block into one write; see MovieStore.batch."""
+    return get_store().batch()
+
+
+def save_movies(movies: List[MovieRecord]) -> None:
+    """Save movies to the database."""
+    get_store().save(movies)
+
+
+def parse_rating(value: Any) -> float:
+    """Return value as a rating, or raise ValueError with a message for the user."""
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid rating input.") from None
+    if not (MIN_RATING <= rating <= MAX_RATING):
+        raise ValueError(f"Rating must be between {MIN_RATING} and {MAX_RATING}.")
+    return rating
+
+
+def parse_year(value: Any) -> int:
+    """Return value as a release year, or raise ValueError with a message for the user."""
+    try:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError
+        year = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid year input.") from None
+    if not (MIN_YEAR <= year <= MAX_YEAR):
+        raise ValueError(f"Please enter a valid 4-digit year between {MIN_YEAR} and {MAX_YEAR}.")
+    return year
+
+
+def validate_movie(title: Any, rating: Any, year: Any) -> Movie:
+    """Return a Movie built from raw input, or raise ValueError.
+
+    Applies the same rules as adding a movie from the menu; the title is
+    stripped.
+    """
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("Movie title cannot be empty.")
+    return Movie(title.strip(), parse_rating(rating), parse_year(year))
+
+
+def bulk_add_movies(movies: Iterable[Dict[str, Any]]) -> int:
+    """Validate and add many movies, persisting them in one write.
+
+    Every record is checked with validate_movie() before anything is
+    stored; the first invalid one raises ValueError naming its position
+    and nothing is added. Titles already in the database, or repeated in
+    `movies`, are skipped. Returns the number of movies added.
+    """
+    ops = []
+    for number, data in enumerate(movies, 1):
+        try:
+            movie = validate_movie(data.get("title"), data.get("rating"), data.get("year"))
+        except ValueError as error:
+            raise ValueError(f"Movie {number}: {error}") from None
+        ops.append({"op": "add", "movie": movie.to_dict()})
+    return get_store().mutate_many(ops)
+
+
+def bulk_delete_movies(titles: Iterable[str]) -> int:
+    """Delete many movies by title in one write; returns how many existed."""
+    return get_store().mutate_many({"op": "delete", "title": title} for title in titles)
+
+
+def add_movie(title: str, rating: float, year: int) -> bool:
+    """Add a new movie to the database.
+
+    Returns False if a movie with the same title already exists.
+    """
+    movie = {"title": title, "rating": rating, "year": year}
+    return get_store().mutate({"op": "add", "movie": movie})
+
+
+def search_movies(query: str) -> List[MovieRecord]:
+    """Return movies whose title contains query, ignoring case."""
+    return get_store().search(query)
+
+
+def suggest_movies(query: str, limit: int = 3) -> List[Tuple[MovieRecord, float]]:
+    """Return up to limit (movie, score) fuzzy matches for query, best first."""
+    return get_store().suggest(query, limit)
+
+
+def lookup_movies(query: str, limit: int = 3
+                  ) -> Tuple[List[MovieRecord], List[Tuple[MovieRecord, float]]]:
+    """Return (substring matches, fuzzy suggestions) for query, cached."""
+    return get_store().lookup(query, limit)
+
+
+def search_cache_info() -> Dict[str, int]:
+    """Return hit/miss counters of the search result cache."""
+    return get_store().search_cache.info()
+
+
+def movie_exists(title: str) -> bool:
+    """Return True if a movie with this title is in the database."""
+    return title in get_store()
 
-def add_movie(title: str, rating: float, year: int) -> None:
-    """Add a new movie to the database."""
-    movies = load_movies()
-    movies.append({"title": title, "rating": rating, "year": year})
-    save_movies(movies)
 
 def delete_movie(title: str) -> bool:
     """Delete a movie by title."""
-    movies = load_movies()
-    updated_movies = [m for m in movies if m["title"].lower() != title.lower()]
+    return get_store().mutate({"op": "delete", "title": title})
+
+
+def update_movie_rating(title: str, rating: float) -> bool:
+    """Update the rating of a movie by title."""
+    return get_store().mutate({"op": "update", "title": title, "rating": rating})
+
 
-    if len(updated_movies) == len(movies):
-        return False  # Movie not found
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """Copy a `{"movies": [...]}` JSON file into an SQLite database.
 
-    save_movies(updated_movies)
-    return True  # Movie deleted
\ No newline at end of file
+    Titles already present in the database are left alone. Returns the
+    number of movies inserted.
+    """
+    movies = MovieStore(json_path, backend=JsonBackend(json_path)).movies
+    backend = SqliteBackend(db_path)
+    with backend.conn:
+        before = backend.conn.total_changes
+        backend.conn.executemany(
+            "INSERT OR IGNORE INTO movies (title, title_key, rating, year) VALUES (?, ?, ?, ?)",
+            ((m["title"], normalize_title(m["title"]), m["rating"], m["year"])
+             for m in movies))
+        inserted = backend.conn.total_changes - before
+    backend.conn.close()
+    return inserted
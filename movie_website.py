@@ -0,0 +1,295 @@
+import hashlib
+import html
+import json
+import os
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import movie_storage
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_static")
+TEMPLATE_FILE = os.path.join(STATIC_DIR, "index_template.html")
+STYLE_FILE = os.path.join(STATIC_DIR, "style.css")
+
+TITLE_PLACEHOLDER = "__TEMPLATE_TITLE__"
+GRID_PLACEHOLDER = "__TEMPLATE_MOVIE_GRID__"
+
+DEFAULT_TITLE = "My Movie App"
+
+# Movies per generated page; 0 puts the whole catalog on index.html.
+PAGE_SIZE = 1000
+
+# Movie items rendered and joined per write.
+CHUNK_SIZE = 500
+
+# Content hashes of the pages written by the last build, per output dir.
+MANIFEST_FILE = ".website-manifest.json"
+
+# Processes rendering pages; 1 builds in this process, 0 uses every core.
+WORKERS = 1
+
+# One movie as sent to a worker: title, rating, year and poster (or None).
+Row = Tuple[str, Any, Any, Optional[str]]
+
+
+def page_name(number: int) -> str:
+    """Return the file name of page `number` (from 1)."""
+    return "index.html" if number == 1 else f"index-{number}.html"
+
+
+def _row(movie) -> Row:
+    return movie["title"], movie["rating"], movie["year"], movie.get("poster")
+
+
+def _render_row(row: Row) -> str:
+    title, rating, year, poster = row
+    title = html.escape(str(title))
+    image = (f'\n            <img class="movie-poster" src="{html.escape(str(poster))}" alt="{title}"/>'
+             if poster else "")
+    return (f'<li>\n'
+            f'            <div class="movie" title="Rating: {html.escape(str(rating))}">'
+            f'{image}\n'
+            f'                <div class="movie-title">{title}</div>\n'
+            f'                <div class="movie-year">{html.escape(str(year))}</div>\n'
+            f'            </div>\n'
+            f'        </li>')
+
+
+def render_movie(movie) -> str:
+    """Return the <li> for one movie in the movie grid."""
+    return _render_row(_row(movie))
+
+
+def render_pagination(number: int, has_next: bool) -> str:
+    """Return the previous/next links of a page.
+
+    Only neighbouring pages are named (no "of N"), so adding movies at the
+    end leaves the earlier pages byte-for-byte the same.
+    """
+    links = []
+    if number > 1:
+        links.append(f'<a class="page-prev" href="{page_name(number - 1)}">&laquo; Previous</a>')
+    links.append(f'<span class="page-number">Page {number}</span>')
+    if has_next:
+        links.append(f'<a class="page-next" href="{page_name(number + 1)}">Next &raquo;</a>')
+    return '<nav class="pagination">\n    ' + "\n    ".join(links) + '\n</nav>\n'
+
+
+def _split_template(template: str, title: str) -> List[str]:
+    try:
+        head, tail = template.split(GRID_PLACEHOLDER)
+    except ValueError:
+        raise ValueError(f"The template must contain {GRID_PLACEHOLDER} exactly once") from None
+    return [head.replace(TITLE_PLACEHOLDER, html.escape(title)), tail]
+
+
+def _page_chunks(head: str, tail: str, rows: Iterable[Row], number: int,
+                 has_next: bool, paginated: bool) -> Iterator[str]:
+    yield head
+    separator = "\n        "
+    rows = iter(rows)
+    first = True
+    while True:
+        batch = list(islice(rows, CHUNK_SIZE))
+        if not batch:
+            break
+        chunk = separator.join(map(_render_row, batch))
+        yield chunk if first else separator + chunk
+        first = False
+    if paginated and (number > 1 or has_next):
+        body_end = tail.rfind("</body>")
+        if body_end >= 0:
+            yield tail[:body_end]
+            yield render_pagination(number, has_next)
+            yield tail[body_end:]
+            return
+    yield tail
+
+
+def _pages(movies: Iterable[Any], page_size: int) -> Iterator[Iterable[Row]]:
+    """Yield lists of page_size rows; there is always a first page.
+
+    With page_size 0 the one page is an iterator over every row, so the
+    catalog is rendered as it is read instead of being held in a list.
+    """
+    rows = map(_row, movies)
+    if page_size <= 0:
+        yield rows
+        return
+    yield list(islice(rows, page_size))
+    while True:
+        page = list(islice(rows, page_size))
+        if not page:
+            return
+        yield page
+
+
+def _load_manifest(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+class _Unchanged(Exception):
+    """Raised from inside atomic_write to drop a page the last build wrote."""
+
+
+def _write_if_changed(path: str, chunks: Iterable[str],
+                      old_digest: Optional[str]) -> Tuple[str, bool]:
+    """Write chunks to path unless the last build wrote the same content.
+
+    Chunks are hashed as they are written to the temporary file, which is
+    discarded instead of renamed when the digest matches old_digest.
+    Returns the content's digest and whether the file was written.
+    """
+    digest = hashlib.sha256()
+
+    def write(file) -> None:
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            digest.update(data)
+            file.write(data)
+        if digest.hexdigest() == old_digest and os.path.exists(path):
+            raise _Unchanged
+
+    try:
+        movie_storage.atomic_write(path, write)
+    except _Unchanged:
+        return old_digest, False
+    return digest.hexdigest(), True
+
+
+# The template halves, sent to each worker once instead of with every page.
+_template: List[str] = []
+
+
+def _set_template(head: str, tail: str) -> None:
+    _template[:] = [head, tail]
+
+
+def _build_page(path: str, rows: Iterable[Row], number: int, has_next: bool, paginated: bool,
+                old_digest: Optional[str]) -> Tuple[str, bool]:
+    """Render and write one page; runs in a worker process when parallel."""
+    head, tail = _template
+    return _write_if_changed(path, _page_chunks(head, tail, rows, number, has_next, paginated),
+                             old_digest)
+
+
+class _InProcess:
+    """Runs pages in this process, with the part of the executor API used."""
+
+    def __init__(self, head: str, tail: str) -> None:
+        _set_template(head, tail)
+
+    def submit(self, func, *args):
+        return _Done(func(*args))
+
+    def __enter__(self) -> "_InProcess":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+class _Done:
+    def __init__(self, value: Any) -> None:
+        self._value = value
+
+    def result(self) -> Any:
+        return self._value
+
+
+def _executor(workers: int, head: str, tail: str):
+    if workers == 1:
+        return _InProcess(head, tail)
+    # imported here: multiprocessing adds to every start of movies.py
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(workers, initializer=_set_template, initargs=(head, tail))
+
+
+def generate_website(output_dir: str = STATIC_DIR, movies: Optional[Iterable[Any]] = None,
+                     title: str = DEFAULT_TITLE, page_size: Optional[int] = None,
+                     template_file: str = TEMPLATE_FILE,
+                     workers: Optional[int] = None) -> Dict[str, int]:
+    """Build index.html (and index-N.html pages) in output_dir.
+
+    `movies` defaults to the catalog, from iter_movies(). Each
+    page is rendered in CHUNK_SIZE pieces and hashed; pages whose hash
+    matches the last build's manifest are not rewritten, and pages left
+    over from a larger catalog are removed. style.css is copied next to
+    the pages when building elsewhere than _static.
+
+    With more than one worker, pages are rendered and written by a process
+    pool. Each page is sent as a list of (title, rating, year, poster)
+    rows, and at most two pages per worker are in flight, so memory stays
+    bounded. The files are the same whatever the worker count. A single
+    page (page_size 0) is always rendered here, as the movies are read.
+
+    Returns counts of "movies", "pages", "written" and "removed".
+    """
+    page_size = PAGE_SIZE if page_size is None else page_size
+    workers = WORKERS if workers is None else workers
+    workers = workers if workers > 0 else os.cpu_count() or 1
+    with open(template_file, encoding="utf-8") as file:
+        head, tail = _split_template(file.read(), title)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+    new_manifest: Dict[str, str] = {}
+    stats = {"movies": 0, "pages": 0, "written": 0, "removed": 0}
+
+    def finished(name: str, result: Tuple[str, bool]) -> None:
+        new_manifest[name], written = result
+        stats["written"] += written
+
+    if os.path.abspath(output_dir) != os.path.abspath(os.path.dirname(template_file)):
+        with open(STYLE_FILE, encoding="utf-8") as file:
+            style = file.read()
+        finished("style.css", _write_if_changed(os.path.join(output_dir, "style.css"),
+                                                [style], manifest.get("style.css")))
+
+    paginated = page_size > 0
+    if not paginated:
+        workers = 1
+
+    def counted(movies: Iterable[Any]) -> Iterator[Any]:
+        for movie in movies:
+            stats["movies"] += 1
+            yield movie
+
+    pages = _pages(counted(movie_storage.iter_movies() if movies is None else movies),
+                   page_size)
+    pending: deque = deque()
+    with _executor(workers, head, tail) as executor:
+        page = next(pages)
+        number = 1
+        while True:
+            following = next(pages, None)
+            name = page_name(number)
+            pending.append((name, executor.submit(
+                _build_page, os.path.join(output_dir, name), page, number,
+                following is not None, paginated, manifest.get(name))))
+            while len(pending) > 2 * workers:
+                name, future = pending.popleft()
+                finished(name, future.result())
+            if following is None:
+                break
+            page = following
+            number += 1
+        for name, future in pending:
+            finished(name, future.result())
+    stats["pages"] = number
+
+    for name in manifest.keys() - new_manifest.keys():
+        try:
+            os.remove(os.path.join(output_dir, os.path.basename(name)))
+            stats["removed"] += 1
+        except FileNotFoundError:
+            pass
+    movie_storage.atomic_write(manifest_path, lambda file: file.write(
+        json.dumps(new_manifest, indent=4, sort_keys=True).encode("utf-8")))
+    return stats
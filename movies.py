@@ -1,11 +1,30 @@
+import argparse
+import contextlib
+import itertools
+import os
+import shlex
+import sys
+from typing import List, Optional
+import movie_formats
+import movie_histogram
+import movie_output
 import movie_storage
-import matplotlib.pyplot as plt
-from fuzzywuzzy import process
-from colorama import Fore, Style, init
-import random
-import statistics
+import movie_website
+from movie_output import Fore
 # Initialize colorama
-init(autoreset=True)
+movie_output.use_color(True)
+
+
+def _pyplot():
+    """Import matplotlib.pyplot on first use; it is slow to load."""
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _movie_server():
+    """Import the HTTP server on first use; asyncio is slow to load."""
+    import movie_server
+    return movie_server
 
 
 def add_movie_flow():
@@ -15,27 +34,20 @@ def add_movie_flow():
         print(Fore.RED + "Movie title cannot be empty.")
         return
 
-    movies = movie_storage.load_movies()
-    if any(m["title"].strip().lower() == title.lower() for m in movies):
+    if movie_storage.movie_exists(title):
         print(Fore.RED + "Movie already exists.")
         return
 
     try:
-        rating = float(input(Fore.BLUE + "Enter movie rating (0-10): "))
-        if not (0 <= rating <= 10):
-            print(Fore.RED + "Rating must be between 0 and 10.")
-            return
-    except ValueError:
-        print(Fore.RED + "Invalid rating input.")
+        rating = movie_storage.parse_rating(input(Fore.BLUE + "Enter movie rating (0-10): "))
+    except ValueError as error:
+        print(Fore.RED + str(error))
         return
 
     try:
-        year = int(input(Fore.BLUE + "Enter release year: "))
-        if not (1800 <= year <= 2100):
-            print(Fore.RED + "Please enter a valid 4-digit year between 1800 and 2100.")
-            return
-    except ValueError:
-        print(Fore.RED + "Invalid year input.")
+        year = movie_storage.parse_year(input(Fore.BLUE + "Enter release year: "))
+    except ValueError as error:
+        print(Fore.RED + str(error))
         return
 
     movie_storage.add_movie(title, rating, year)
@@ -55,12 +67,9 @@ def update_rating_flow():
     """Handle updating a movie rating."""
     title = input(Fore.BLUE + "Enter movie title to update rating: ")
     try:
-        new_rating = float(input(Fore.BLUE + "Enter new rating (0-10): "))
-        if not (0 <= new_rating <= 10):
-            print(Fore.RED + "Rating must be between 0 and 10.")
-            return
-    except ValueError:
-        print(Fore.RED + "Invalid rating input.")
+        new_rating = movie_storage.parse_rating(input(Fore.BLUE + "Enter new rating (0-10): "))
+    except ValueError as error:
+        print(Fore.RED + str(error))
         return
 
     if update_movie_rating(title, new_rating):
@@ -69,7 +78,7 @@ def update_rating_flow():
         print(Fore.RED + "Movie not found.")
 
 
-def show_stats_flow():
+def show_stats_flow() -> bool:
     """Handle showing movie statistics."""
     stats = get_stats()
     if stats:
@@ -84,8 +93,9 @@ def show_stats_flow():
         print(Fore.YELLOW + "Lowest Rated:")
         for m in stats['lowest_rated']:
             print(Fore.YELLOW + f"{m['title']} ({m['rating']})")
-    else:
-        print(Fore.RED + "No movies available.")
+        return True
+    print(Fore.RED + "No movies available.")
+    return False
 
 
 def exit_app():
@@ -111,134 +121,376 @@ def show_menu() -> None:
 
 def search_movie() -> None:
     """Search for a movie using exact match and fuzzy fallback."""
-    query = input(Fore.BLUE + "Enter the movie title: ").strip().lower()
-    movies = movie_storage.load_movies()
-    matches = [m for m in movies if query in m["title"].strip().lower()]
+    show_search_results(input(Fore.BLUE + "Enter the movie title: "))
+
+
+def show_search_results(query: str) -> bool:
+    """Print the movies matching query, or close suggestions; True if any matched."""
+    matches, suggestions = movie_storage.lookup_movies(query.strip().lower())
 
     if matches:
         print(Fore.GREEN + "Exact match(es) found:")
         for m in matches:
             print(Fore.YELLOW + f"{m['title']} ({m['year']}) - Rating: {m['rating']}")
+        return True
     else:
-        titles = [movie["title"] for movie in movies]
-        best_match = process.extractOne(query, titles)
-        if best_match and best_match[1] > 70:
-            print(Fore.GREEN + f"Did you mean: {best_match[0]}?")
+        if suggestions:
+            print(Fore.GREEN + f"Did you mean: {suggestions[0][0]['title']}?")
+            if len(suggestions) > 1:
+                others = ", ".join(movie["title"] for movie, _ in suggestions[1:])
+                print(Fore.YELLOW + f"Other close matches: {others}")
         else:
             print(Fore.RED + "No close matches found.")
+        return False
 
 
 def show_ratings_histogram() -> None:
-    """Display a histogram of movie ratings."""
-    movies = movie_storage.load_movies()
-    ratings = [movie["rating"] for movie in movies]
-
-    if not ratings:
+    """Display a histogram of movie ratings, drawn from the store's bin counts."""
+    bins = get_rating_bins()
+    if not len(bins):
         print(Fore.RED + "No movie ratings available to display.")
         return
 
-    plt.hist(ratings, bins=10, edgecolor="black")
+    plt = _pyplot()
+    # one bar per maintained bin, weighted by its count
+    plt.hist(bins.edges[:-1], bins=bins.edges, weights=bins.counts, edgecolor="black")
     plt.xlabel("Ratings")
     plt.ylabel("Number of Movies")
     plt.title("Movie Ratings Distribution")
     plt.show()
 
 
-def pick_random_movie() -> None:
+def get_rating_bins():
+    """Return histogram bin counts."""
+    return movie_storage.get_store().bins
+
+
+def histogram_command(args: argparse.Namespace) -> int:
+    """Print a text histogram, or save it as a PNG or SVG without a GUI."""
+    bins = get_rating_bins()
+    if not len(bins):
+        print(Fore.RED + "No movie ratings available to display.")
+        return 1
+    if args.output is None:
+        movie_output.write_lines(movie_histogram.text(bins.counts, bins.edges, args.width),
+                                 Fore.YELLOW)
+        return 0
+    try:
+        image = movie_histogram.render(bins.counts, bins.edges,
+                                       movie_histogram.format_for(args.output))
+        with open(args.output, "wb") as file:
+            file.write(image)
+    except (OSError, ValueError) as error:
+        print(Fore.RED + f"Could not save the histogram: {error}")
+        return 1
+    print(Fore.GREEN + f"Saved the ratings histogram to {args.output}.")
+    return 0
+
+
+def website_command(args: argparse.Namespace) -> int:
+    """Fill the HTML template with the catalog, one or more pages."""
+    try:
+        stats = movie_website.generate_website(args.output_dir, title=args.title,
+                                               page_size=args.per_page,
+                                               workers=args.workers)
+    except (OSError, ValueError) as error:
+        print(Fore.RED + f"Website generation failed: {error}")
+        return 1
+    print(Fore.GREEN + f"Website was generated successfully: {stats['movies']} movies on "
+                       f"{stats['pages']} page(s), {stats['written']} file(s) written.")
+    return 0
+
+
+def pick_random_movie() -> bool:
     """Pick and display a random movie."""
     movie = pick_random_movie_internal()
     if movie:
         print(Fore.GREEN + f"Random Pick: {movie['title']} "
                           f"({movie['year']}) - "
                           f"Rating: {movie['rating']}")
-    else:
-        print(Fore.RED + "No movies available.")
+        return True
+    print(Fore.RED + "No movies available.")
+    return False
 
 
-def list_movies_sorted() -> None:
-    """List movies sorted by rating."""
-    movies = get_movies_sorted_by_rating()
-    if not movies:
+def list_movies_sorted() -> bool:
+    """List movies sorted by rating, a page of the rating index at a time."""
+    movies = movie_storage.iter_movies_by_rating()
+    first = next(movies, None)
+    if first is None:
         print(Fore.RED + "No movies available.")
-        return
+        return False
 
     print(Fore.MAGENTA + "\nMovies Sorted by Rating:")
-    for movie in movies:
-        print(Fore.YELLOW + f"{movie['title']} "
-                           f"({movie['year']}) - "
-                           f"Rating: {movie['rating']}")
+    movie_output.show_lines(map(movie_output.format_movie, itertools.chain([first], movies)),
+                            Fore.YELLOW)
+    return True
 
 
-def list_movies() -> None:
+def list_movies() -> bool:
     """List all movies with title, year, and rating."""
-    movies = movie_storage.load_movies()
-    if not movies:
+    movies = movie_storage.iter_movies()
+    first = next(movies, None)
+    if first is None:
         print(Fore.RED + "No movies found.")
-        return
+        return False
     print(Fore.MAGENTA + "\nAll Movies:")
-    for movie in movies:
-        print(Fore.YELLOW + f"{movie['title']} "
-                           f"({movie['year']}) - "
-                           f"Rating: {movie['rating']}")
+    movie_output.show_lines(map(movie_output.format_movie, itertools.chain([first], movies)),
+                            Fore.YELLOW)
+    return True
 
 
 def update_movie_rating(title: str, new_rating: float) -> bool:
     """Update the rating of a movie."""
-    movies = movie_storage.load_movies()
-    updated = False
-    for movie in movies:
-        if movie["title"].lower() == title.lower():
-            movie["rating"] = new_rating
-            updated = True
-            break
-    if updated:
-        movie_storage.save_movies(movies)
-    return updated
+    return movie_storage.update_movie_rating(title, new_rating)
 
 
 def get_stats():
     """Calculate and return statistics about the movies."""
-    movies = movie_storage.load_movies()
-    if not movies:
-        return None
-    ratings = [movie["rating"] for movie in movies]
-    total_movies = len(movies)
-    average_rating = round(statistics.mean(ratings), 2)
-    median_rating = round(statistics.median(ratings), 2)
-    try:
-        mode_rating = statistics.mode(ratings)
-    except statistics.StatisticsError:
-        mode_rating = "No unique mode"
-    max_rating = max(ratings)
-    min_rating = min(ratings)
-    highest_rated = [m for m in movies if m["rating"] == max_rating]
-    lowest_rated = [m for m in movies if m["rating"] == min_rating]
-
-    return {
-        "total_movies": total_movies,
-        "average_rating": average_rating,
-        "median_rating": median_rating,
-        "mode_rating": mode_rating,
-        "highest_rated": highest_rated,
-        "lowest_rated": lowest_rated,
-    }
+    return movie_storage.get_store().summary()
 
 
 def pick_random_movie_internal():
     """Return a random movie."""
-    movies = movie_storage.load_movies()
-    if not movies:
-        return None
-    return random.choice(movies)
+    return movie_storage.random_movie()
 
 
 def get_movies_sorted_by_rating():
     """Return movies sorted by rating descending."""
-    movies = movie_storage.load_movies()
-    return sorted(movies, key=lambda x: x["rating"], reverse=True)
+    return movie_storage.get_store().sorted_by_rating()
+
+
+def import_command(args: argparse.Namespace) -> int:
+    """Add every movie in a CSV or JSON lines file in one write."""
+    total = 0
+
+    def counted(rows):
+        nonlocal total
+        for total, row in enumerate(rows, 1):
+            yield row
+
+    try:
+        added = movie_storage.bulk_add_movies(
+            counted(movie_formats.read_movies(args.file, args.format)))
+    except (OSError, ValueError) as error:
+        print(Fore.RED + f"Import failed, nothing was added: {error}")
+        return 1
+    print(Fore.GREEN + f"Imported {added} of {total} movies.")
+    if added < total:
+        print(Fore.YELLOW + f"{total - added} were already in the database.")
+    return 0
+
+
+def export_command(args: argparse.Namespace) -> int:
+    """Write every movie to a CSV or JSON lines file."""
+    try:
+        written = movie_formats.write_movies(args.file, movie_storage.iter_movies(), args.format)
+    except (OSError, ValueError) as error:
+        print(Fore.RED + f"Export failed: {error}")
+        return 1
+    print(Fore.GREEN + f"Exported {written} movies to {args.file}.")
+    return 0
+
+
+def add_command(args: argparse.Namespace) -> int:
+    """Add one movie, checked like the menu's add."""
+    try:
+        movie = movie_storage.validate_movie(args.title, args.rating, args.year)
+    except ValueError as error:
+        print(Fore.RED + str(error))
+        return 1
+    if not movie_storage.add_movie(movie.title, movie.rating, movie.year):
+        print(Fore.RED + "Movie already exists.")
+        return 1
+    print(Fore.GREEN + f"Movie '{movie.title}' added successfully!")
+    return 0
+
+
+def delete_command(args: argparse.Namespace) -> int:
+    """Delete one movie by title."""
+    if not movie_storage.delete_movie(args.title):
+        print(Fore.RED + "Movie not found.")
+        return 1
+    print(Fore.GREEN + f"Movie '{args.title}' deleted successfully!")
+    return 0
+
+
+def update_command(args: argparse.Namespace) -> int:
+    """Change the rating of one movie."""
+    try:
+        rating = movie_storage.parse_rating(args.rating)
+    except ValueError as error:
+        print(Fore.RED + str(error))
+        return 1
+    if not update_movie_rating(args.title, rating):
+        print(Fore.RED + "Movie not found.")
+        return 1
+    print(Fore.GREEN + f"Movie '{args.title}' rating updated successfully!")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """Serve the database as JSON over HTTP until interrupted."""
+    movie_server = _movie_server()
+
+    def ready(address):
+        print(Fore.GREEN + f"Serving {movie_storage.MOVIES_FILE} on http://{address[0]}:{address[1]}",
+              flush=True)
+
+    try:
+        movie_server.run(args.host, args.port, ready)
+    except OSError as error:
+        print(Fore.RED + f"Could not start the server: {error}")
+        return 1
+    return 0
+
+
+def batch_command(source: str) -> int:
+    """Run one command per line of a file ("-" for stdin) as a single batch.
+
+    Lines are split like a shell would and take the same commands as the
+    command line; blank lines and lines starting with # are skipped. The
+    database is read once and every change is written in one go at the
+    end. A failing line is reported and the rest still run; the exit
+    status is 1 if any line failed.
+    """
+    parser = build_parser()
+    failed = total = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            # stdin may hold the commands; never stop to prompt
+            stack.callback(setattr, movie_output, "PAGE_SIZE", movie_output.PAGE_SIZE)
+            movie_output.PAGE_SIZE = 0
+            lines = sys.stdin if source == "-" else stack.enter_context(
+                open(source, encoding="utf-8"))
+            stack.enter_context(movie_storage.batch())
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                total += 1
+                try:
+                    args = parser.parse_args(shlex.split(line))
+                except ValueError as error:  # unbalanced quotes
+                    print(Fore.RED + str(error))
+                    args = None
+                except SystemExit:  # argparse has printed the usage error
+                    args = None
+                if args is not None and (args.command is None or args.batch is not None):
+                    print(Fore.RED + "Each line needs a single command.")
+                    args = None
+                status = 1 if args is None else args.func(args)
+                if status:
+                    failed += 1
+                    print(Fore.RED + f"Line {number} failed: {line}")
+    except OSError as error:
+        print(Fore.RED + f"Batch failed, nothing was saved: {error}")
+        return 1
+    if failed:
+        print(Fore.RED + f"{failed} of {total} commands failed.")
+        return 1
+    return 0
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got {value!r}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the command-line parser; no command starts the menu."""
+    parser = argparse.ArgumentParser(description="Manage your movie database.")
+    parser.add_argument("--no-color", action="store_true",
+                        help="plain output without colors (default when not on a terminal)")
+    parser.add_argument("--page-size", type=int, default=movie_output.PAGE_SIZE,
+                        help="movies per screen in listings, 0 to print everything "
+                             f"(default: {movie_output.PAGE_SIZE})")
+    parser.add_argument("--batch", metavar="FILE", nargs="?", const="-",
+                        help="run one command per line from FILE (default: stdin), "
+                             "saving once at the end")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    add = commands.add_parser("add", help="add a movie")
+    add.add_argument("title")
+    add.add_argument("rating")
+    add.add_argument("year")
+    add.set_defaults(func=add_command)
+    delete = commands.add_parser("delete", help="delete a movie by title")
+    delete.add_argument("title")
+    delete.set_defaults(func=delete_command)
+    update = commands.add_parser("update", help="change a movie's rating")
+    update.add_argument("title")
+    update.add_argument("rating")
+    update.set_defaults(func=update_command)
+    search = commands.add_parser("search", help="find movies by title, with suggestions")
+    search.add_argument("query")
+    search.set_defaults(func=lambda args: 0 if show_search_results(args.query) else 1)
+    stats = commands.add_parser("stats", help="show rating statistics")
+    stats.set_defaults(func=lambda args: 0 if show_stats_flow() else 1)
+    listing = commands.add_parser("list", help="list all movies")
+    listing.add_argument("--sorted", action="store_true", help="highest rated first")
+    listing.set_defaults(
+        func=lambda args: 0 if (list_movies_sorted() if args.sorted else list_movies()) else 1)
+    random_pick = commands.add_parser("random", help="pick a random movie")
+    random_pick.set_defaults(func=lambda args: 0 if pick_random_movie() else 1)
+    for name, func, help_text in (
+            ("import", import_command, "add movies from a CSV or JSON lines file"),
+            ("export", export_command, "write all movies to a CSV or JSON lines file")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("file")
+        command.add_argument("--format", choices=sorted(set(movie_formats.FORMATS.values())),
+                             help="file format (default: from the extension)")
+        command.set_defaults(func=func)
+    histogram = commands.add_parser(
+        "histogram", help="print the ratings histogram, or save it as a PNG or SVG")
+    histogram.add_argument("-o", "--output", help="image file (.png or .svg) to write "
+                                                  "instead of printing text")
+    histogram.add_argument("--width", type=positive_int, default=40, help="longest text bar")
+    histogram.set_defaults(func=histogram_command)
+    website = commands.add_parser("generate-website", aliases=["generate_website"],
+                                  help="write the catalog into _static/index.html")
+    website.add_argument("--output-dir", default=movie_website.STATIC_DIR,
+                         help="where to write the pages (default: _static)")
+    website.add_argument("--title", default=movie_website.DEFAULT_TITLE)
+    website.add_argument("--per-page", type=int,
+                         default=movie_website.PAGE_SIZE,
+                         help="movies per page, 0 for a single page "
+                              f"(default: {movie_website.PAGE_SIZE})")
+    website.add_argument("--workers", type=int, default=movie_website.WORKERS,
+                         help="processes rendering pages, 0 for one per core "
+                              f"(default: {movie_website.WORKERS})")
+    website.set_defaults(func=website_command)
+    serve = commands.add_parser("serve", help="serve the database as JSON over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000,
+                       help="0 picks a free port (default: 8000)")
+    serve.set_defaults(func=serve_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a command, or the interactive menu if none is given."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.no_color or "NO_COLOR" in os.environ or not sys.stdout.isatty():
+        movie_output.use_color(False)
+    movie_output.PAGE_SIZE = args.page_size
+    if args.batch is not None:
+        if args.command is not None:
+            parser.error("--batch reads its commands from the file, not the command line")
+        sys.exit(batch_command(args.batch))
+    if args.command is None:
+        run_menu()
+    else:
+        sys.exit(args.func(args))
 
 
-def main() -> None:
+def run_menu() -> None:
     """Main application loop."""
     while True:
         show_menu()
@@ -0,0 +1,111 @@
+import unittest
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+import movie_storage
+
+# Rewrites the snapshot forever, alternating between two catalogs; the
+# test kills it at random moments.
+WRITER = """
+import sys
+import movie_storage
+backend = movie_storage.JsonBackend(sys.argv[1], backups=int(sys.argv[2]))
+catalogs = [[{"title": f"{name} {i}", "rating": 5.0, "year": 2000} for i in range(20000)]
+            for name in ("Old", "New")]
+print("ready", flush=True)
+while True:
+    for movies in catalogs:
+        backend.save(movies)
+"""
+
+class TestAtomicSave(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database and its backups
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def read(self, path=None):
+        with open(path or self.temp_filename) as f:
+            return json.load(f)["movies"]
+
+    def test_interrupted_save_keeps_old_snapshot(self):
+        """Test that an exception mid-write leaves the file and no temp behind."""
+        def half_dump(file, *args, **kwargs):
+            file.write(b'{"movies": [')
+            raise KeyboardInterrupt
+
+        with patch('movie_formats.write_snapshot', side_effect=half_dump):
+            with self.assertRaises(KeyboardInterrupt):
+                movie_storage.save_movies([{"title": "Heat", "rating": 8.3, "year": 1995}])
+        self.assertEqual(self.read(), self.sample_movies)
+        self.assertEqual([f for f in os.listdir(self.temp_dir.name) if f.endswith(".tmp")], [])
+
+    def test_failed_rename_keeps_old_snapshot(self):
+        """Test that a failing os.replace leaves the previous snapshot."""
+        with patch('os.replace', side_effect=OSError("disk gone")):
+            with self.assertRaises(OSError):
+                movie_storage.save_movies([])
+        self.assertEqual(self.read(), self.sample_movies)
+        self.assertEqual([f for f in os.listdir(self.temp_dir.name) if f.endswith(".tmp")], [])
+
+    def test_file_mode_preserved(self):
+        """Test that the replaced file keeps its permissions."""
+        os.chmod(self.temp_filename, 0o640)
+        movie_storage.save_movies(self.sample_movies)
+        self.assertEqual(os.stat(self.temp_filename).st_mode & 0o777, 0o640)
+
+    def test_rotating_backups(self):
+        """Test that the last BACKUP_COUNT snapshots are kept, newest first."""
+        backend = movie_storage.JsonBackend(self.temp_filename, backups=2)
+        for title in ("A", "B", "C"):
+            backend.save([{"title": title, "rating": 5.0, "year": 2000}])
+        self.assertEqual(self.read()[0]["title"], "C")
+        self.assertEqual(self.read(self.temp_filename + ".1")[0]["title"], "B")
+        self.assertEqual(self.read(self.temp_filename + ".2")[0]["title"], "A")
+        self.assertFalse(os.path.exists(self.temp_filename + ".3"))
+
+    def test_killed_writer_never_corrupts(self):
+        """Test that killing a saving process at random points keeps a whole snapshot."""
+        rng = random.Random(13)
+        root = os.path.dirname(os.path.abspath(__file__))
+        for _ in range(8):
+            proc = subprocess.Popen([sys.executable, "-c", WRITER, self.temp_filename, "1"],
+                                    cwd=root, stdout=subprocess.PIPE, text=True)
+            try:
+                proc.stdout.readline()
+                time.sleep(rng.uniform(0, 0.3))
+            finally:
+                proc.kill()
+                proc.wait()
+                proc.stdout.close()
+            for path in (self.temp_filename, self.temp_filename + ".1"):
+                if os.path.exists(path):
+                    movies = self.read(path)
+                    self.assertIn(len(movies), (len(self.sample_movies), 20000))
+
+if __name__ == '__main__':
+    unittest.main()
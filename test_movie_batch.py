@@ -0,0 +1,111 @@
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import movie_storage
+import movies
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database and command files
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def run_main(self, argv, stdin=""):
+        with patch('sys.stdout', new_callable=StringIO) as stdout, \
+                patch('sys.stderr', new_callable=StringIO), \
+                patch('sys.stdin', StringIO(stdin)):
+            with self.assertRaises(SystemExit) as exit_code:
+                movies.main(argv)
+        return exit_code.exception.code, stdout.getvalue()
+
+    def test_commands(self):
+        """Test the single-action commands."""
+        self.assertEqual(self.run_main(["add", "Heat", "8.3", "1995"])[0], 0)
+        self.assertEqual(self.run_main(["add", "heat", "5", "1995"]),
+                         (1, "Movie already exists.\n"))
+        self.assertEqual(self.run_main(["add", "Alien", "11", "1979"])[0], 1)
+        self.assertEqual(self.run_main(["update", "Heat", "9.1"])[0], 0)
+        code, output = self.run_main(["search", "heat"])
+        self.assertEqual(code, 0)
+        self.assertIn("Heat (1995) - Rating: 9.1", output)
+        code, output = self.run_main(["list", "--sorted"])
+        self.assertLess(output.index("Heat"), output.index("Titanic"))
+        self.assertIn("Total Movies: 3", self.run_main(["stats"])[1])
+        self.assertIn("Random Pick:", self.run_main(["random"])[1])
+        self.assertEqual(self.run_main(["delete", "Heat"])[0], 0)
+        self.assertEqual(self.run_main(["delete", "Heat"])[0], 1)
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).movies, self.sample_movies)
+
+    def test_batch_from_stdin_persists_once(self):
+        """Test that a batch reads commands from stdin and writes once at the end."""
+        commands = "\n".join([f'add "Movie {i}" 5 2000' for i in range(500)]
+                             + ["# a comment", "", 'update "Movie 7" 9', "delete Titanic",
+                                'search "movie 7"'])
+        store = movie_storage.get_store()
+        with patch.object(store.backend, 'append_many',
+                          wraps=store.backend.append_many) as write:
+            code, output = self.run_main(["--batch"], commands)
+        self.assertEqual(code, 0)
+        write.assert_called_once()
+        self.assertIn("Movie 7 (2000) - Rating: 9.0", output)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual(len(fresh), 501)
+        self.assertEqual(fresh.get("movie 7")["rating"], 9.0)
+        self.assertEqual(fresh.version, 502)
+
+    def test_batch_reports_failed_lines(self):
+        """Test that bad lines are reported and the rest still run."""
+        path = os.path.join(self.temp_dir.name, "commands.txt")
+        with open(path, 'w') as f:
+            f.write('add Heat 8.3 1995\nfly away\nadd "Unclosed 5 2000\n'
+                    'delete Nothing\n--batch\nadd Alien 8.5 1979\n')
+        code, output = self.run_main(["--batch", path])
+        self.assertEqual(code, 1)
+        for number in (2, 3, 4, 5):
+            self.assertIn(f"Line {number} failed", output)
+        self.assertIn("4 of 6 commands failed.", output)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertIn("Heat", fresh)
+        self.assertIn("Alien", fresh)
+
+    def test_store_batch_discarded_on_error(self):
+        """Test that an exception inside a batch writes nothing."""
+        with self.assertRaises(RuntimeError):
+            with movie_storage.batch():
+                movie_storage.add_movie("Heat", 8.3, 1995)
+                self.assertTrue(movie_storage.movie_exists("Heat"))
+                raise RuntimeError("stop")
+        self.assertFalse(movie_storage.movie_exists("Heat"))
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).version, 0)
+
+    def test_batch_rejects_command_argument(self):
+        """Test that --batch cannot be combined with a command."""
+        with patch('sys.stderr', new_callable=StringIO):
+            with self.assertRaises(SystemExit) as exit_code:
+                movies.main(["--batch", "x.txt", "stats"])
+        self.assertEqual(exit_code.exception.code, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import movie_storage
+import movies
+
+class TestBulkOperations(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database and import files
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def path(self, name, text):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_bulk_add_skips_duplicates(self):
+        """Test that existing and repeated titles are skipped."""
+        added = movie_storage.bulk_add_movies([
+            {"title": "Heat", "rating": 8.3, "year": 1995},
+            {"title": " titanic", "rating": 1.0, "year": 2000},
+            {"title": "HEAT", "rating": 2.0, "year": 2001},
+            {"title": "Alien", "rating": "8.5", "year": "1979"},
+        ])
+        self.assertEqual(added, 2)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual([m["title"] for m in fresh], ["Titanic", "The Matrix", "Heat", "Alien"])
+        self.assertEqual(fresh.get("alien"), {"title": "Alien", "rating": 8.5, "year": 1979})
+
+    def test_bulk_add_validates_everything_first(self):
+        """Test that one invalid record rejects the whole batch."""
+        for bad, message in (({"title": "", "rating": 5, "year": 2000}, "title cannot be empty"),
+                             ({"title": "A", "rating": 11, "year": 2000}, "between 0 and 10"),
+                             ({"title": "A", "rating": "x", "year": 2000}, "Invalid rating"),
+                             ({"title": "A", "rating": 5, "year": 1700}, "between 1800 and 2100")):
+            with self.assertRaisesRegex(ValueError, "Movie 2: .*" + message):
+                movie_storage.bulk_add_movies([{"title": "Heat", "rating": 8.3, "year": 1995}, bad])
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).movies, self.sample_movies)
+
+    def test_bulk_add_persists_once(self):
+        """Test that a large batch is written with a single backend call."""
+        store = movie_storage.get_store()
+        batch = [{"title": f"Movie {i}", "rating": 5.0, "year": 2000} for i in range(20000)]
+        with patch.object(store.backend, 'append_many', wraps=store.backend.append_many) as write:
+            self.assertEqual(movie_storage.bulk_add_movies(batch), 20000)
+        write.assert_called_once()
+        self.assertEqual(len(movie_storage.MovieStore(self.temp_filename)), 20002)
+
+    def test_bulk_delete(self):
+        """Test deleting several titles at once."""
+        self.assertEqual(movie_storage.bulk_delete_movies(["titanic", "Heat", "The Matrix"]), 2)
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).movies, [])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_import_csv(self, mock_stdout):
+        """Test `movies.py import file.csv`."""
+        path = self.path("new.csv", "title,rating,year\nHeat,8.3,1995\nTitanic,8.5,1997\n")
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["import", path])
+        self.assertEqual(exit_code.exception.code, 0)
+        self.assertIn("Imported 1 of 2 movies.", mock_stdout.getvalue())
+        self.assertIn("Heat", movie_storage.MovieStore(self.temp_filename))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_import_jsonl_error(self, mock_stdout):
+        """Test that a bad line aborts the import without changes."""
+        path = self.path("new.jsonl", '{"title": "Heat", "rating": 8.3, "year": 1995}\n'
+                                      '{"title": "Alien", "rating": 8.5, "year": 3000}\n')
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["import", path])
+        self.assertEqual(exit_code.exception.code, 1)
+        self.assertIn("Movie 2", mock_stdout.getvalue())
+        self.assertNotIn("Heat", movie_storage.MovieStore(self.temp_filename))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_import_jsonl_line_not_an_object(self, mock_stdout):
+        """Test that a JSON line holding a list or number is reported, not a crash."""
+        path = self.path("new.jsonl", '{"title": "Heat", "rating": 8.3, "year": 1995}\n'
+                                      '["Alien", 8.5, 1979]\n')
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["import", path])
+        self.assertEqual(exit_code.exception.code, 1)
+        self.assertIn("Line 2: expected a JSON object", mock_stdout.getvalue())
+        self.assertNotIn("Heat", movie_storage.MovieStore(self.temp_filename))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_round_trip(self, mock_stdout):
+        """Test that an export can be imported into an empty database."""
+        for name in ("out.csv", "out.jsonl"):
+            path = os.path.join(self.temp_dir.name, name)
+            with self.assertRaises(SystemExit):
+                movies.main(["export", path])
+            movie_storage.save_movies([])
+            with self.assertRaises(SystemExit):
+                movies.main(["import", path])
+            self.assertEqual(movie_storage.load_movies(), self.sample_movies, name)
+
+if __name__ == '__main__':
+    unittest.main()
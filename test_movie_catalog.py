@@ -0,0 +1,101 @@
+import unittest
+import os
+import random
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+import movie_formats
+import movie_storage
+
+
+class TestBinaryCatalog(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the snapshot, journal and lock
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing, with an int rating and an extra field
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "the Matrix", "rating": 9, "year": 1999},
+            {"title": "Amélie", "rating": 8.3, "year": 2001, "poster": "a.jpg"},
+            {"title": "Alien", "rating": 8.5, "year": 1979}
+        ]
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.temp_dir.cleanup()
+
+    def write(self, movies, version=1):
+        movie_storage.JsonBackend(self.temp_filename, snapshot_format="binary").save(movies, version)
+
+    def test_random_access_matches_iteration(self):
+        """Test that indexing decodes the same records as a full read."""
+        self.write(self.sample_movies, 5)
+        with movie_formats.BinaryCatalog(self.temp_filename) as catalog:
+            self.assertEqual(len(catalog), 4)
+            self.assertEqual(catalog.version, 5)
+            self.assertEqual([catalog[i] for i in range(4)], self.sample_movies)
+            self.assertEqual(list(catalog), self.sample_movies)
+            self.assertEqual(catalog[-1], self.sample_movies[-1])
+            with self.assertRaises(IndexError):
+                catalog[4]
+
+    def test_find(self):
+        """Test lookups through the sorted key table."""
+        self.write(self.sample_movies)
+        with movie_formats.BinaryCatalog(self.temp_filename) as catalog:
+            for movie in self.sample_movies:
+                self.assertEqual(catalog.find(f" {movie['title'].upper()} "), movie)
+            for missing in ("", "Heat", "Zzz", "A"):
+                self.assertIsNone(catalog.find(missing))
+
+    def test_empty_and_truncated(self):
+        """Test an empty catalog and one cut short."""
+        self.write([])
+        with movie_formats.BinaryCatalog(self.temp_filename) as catalog:
+            self.assertEqual(len(catalog), 0)
+            self.assertIsNone(catalog.find("Titanic"))
+        self.write(self.sample_movies)
+        with open(self.temp_filename, 'r+b') as f:
+            f.truncate(os.path.getsize(self.temp_filename) - 1)
+        with self.assertRaises(ValueError):
+            movie_formats.BinaryCatalog(self.temp_filename)
+
+    def test_store_reads_without_loading(self):
+        """Test that get and random_movie leave the store unloaded."""
+        self.write(self.sample_movies)
+        store = movie_storage.MovieStore(self.temp_filename)
+        with patch.object(store.backend, 'load', side_effect=AssertionError("loaded")):
+            self.assertEqual(store.get("alien"), self.sample_movies[3])
+            self.assertIsNone(store.get("Heat"))
+            picks = {store.random_movie(random.Random(seed))["title"] for seed in range(50)}
+        self.assertEqual(picks, {m["title"] for m in self.sample_movies})
+        self.assertFalse(store.in_memory)
+
+    def test_pending_journal_falls_back_to_load(self):
+        """Test that journaled changes are seen by lookups."""
+        self.write(self.sample_movies)
+        other = movie_storage.MovieStore(self.temp_filename)
+        other.mutate({"op": "add", "movie": {"title": "Heat", "rating": 8.3, "year": 1995}})
+        store = movie_storage.MovieStore(self.temp_filename)
+        self.assertIsNone(store.backend.catalog())
+        self.assertEqual(store.get("heat")["year"], 1995)
+        other.compact()
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).get("heat")["year"], 1995)
+
+    def test_random_pick_memory_independent_of_size(self):
+        """Test that a cold pick from a large catalog allocates almost nothing."""
+        self.write([{"title": f"Movie {i}", "rating": 5.0, "year": 2000} for i in range(100000)])
+        store = movie_storage.MovieStore(self.temp_filename)
+        tracemalloc.start()
+        try:
+            movie = store.random_movie()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertTrue(movie["title"].startswith("Movie "))
+        self.assertLess(peak, 64 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import contextlib
+import json
+import multiprocessing
+import os
+import tempfile
+from unittest.mock import patch
+import movie_storage
+
+WORKERS = 4
+MOVIES_PER_WORKER = 40
+
+
+def hammer(path, worker, journal_max_bytes):
+    """Add this worker's movies, then delete every other one and re-rate the rest."""
+    movie_storage.MOVIES_FILE = path
+    movie_storage.JOURNAL_MAX_BYTES = journal_max_bytes
+    for i in range(MOVIES_PER_WORKER):
+        assert movie_storage.add_movie(f"Worker {worker} movie {i}", 5.0, 2000)
+    for i in range(0, MOVIES_PER_WORKER, 2):
+        assert movie_storage.delete_movie(f"Worker {worker} movie {i}")
+    for i in range(1, MOVIES_PER_WORKER, 2):
+        assert movie_storage.update_movie_rating(f"Worker {worker} movie {i}", worker + i / 100)
+    movie_storage.get_store().compact()
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database, journal and lock
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.temp_dir.cleanup()
+
+    def run_workers(self, path, journal_max_bytes=1024 * 1024):
+        context = multiprocessing.get_context("spawn")
+        procs = [context.Process(target=hammer, args=(path, worker, journal_max_bytes))
+                 for worker in range(WORKERS)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join(60)
+            self.assertEqual(proc.exitcode, 0)
+
+    def check_no_lost_writes(self, path):
+        store = movie_storage.MovieStore(path)
+        expected = {m["title"]: m["rating"] for m in self.sample_movies}
+        for worker in range(WORKERS):
+            for i in range(1, MOVIES_PER_WORKER, 2):
+                expected[f"Worker {worker} movie {i}"] = worker + i / 100
+        self.assertEqual({m["title"]: m["rating"] for m in store}, expected)
+        # every add, delete and update bumped the version exactly once
+        self.assertEqual(store.version, 1 + WORKERS * MOVIES_PER_WORKER * 2)
+
+    @unittest.skipUnless(movie_storage.FileLock("").supported, "fcntl is not available")
+    def test_json_journal(self):
+        """Test that concurrent journaled writers lose nothing."""
+        path = os.path.join(self.temp_dir.name, "data.json")
+        movie_storage.JsonBackend(path).save(self.sample_movies)
+        self.run_workers(path)
+        self.check_no_lost_writes(path)
+
+    @unittest.skipUnless(movie_storage.FileLock("").supported, "fcntl is not available")
+    def test_json_with_frequent_compaction(self):
+        """Test that snapshot rewrites racing with appends lose nothing."""
+        path = os.path.join(self.temp_dir.name, "data.json")
+        movie_storage.JsonBackend(path).save(self.sample_movies)
+        self.run_workers(path, journal_max_bytes=1000)
+        self.check_no_lost_writes(path)
+
+    def test_sqlite(self):
+        """Test that concurrent SQLite writers lose nothing."""
+        path = os.path.join(self.temp_dir.name, "movies.db")
+        movie_storage.SqliteBackend(path).save(self.sample_movies)
+        self.run_workers(path)
+        self.check_no_lost_writes(path)
+
+class TestVersionStamp(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database, journal and lock
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": [{"title": "Titanic", "rating": 8.5, "year": 1997}]}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_version_persisted(self):
+        """Test that the version survives journaling and compaction."""
+        store = movie_storage.get_store()
+        self.assertEqual(store.version, 0)
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        movie_storage.update_movie_rating("Heat", 9.0)
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).version, 2)
+        store.compact()
+        with open(self.temp_filename) as f:
+            self.assertEqual(json.load(f)["version"], 2)
+        movie_storage.delete_movie("Heat")
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).version, 3)
+
+    def test_other_writer_tail_replayed(self):
+        """Test that another process's journal entries are applied without a reload."""
+        store = movie_storage.get_store()
+        len(store)
+        other = movie_storage.MovieStore(self.temp_filename)
+        other.mutate({"op": "add", "movie": {"title": "Heat", "rating": 8.3, "year": 1995}})
+        with patch.object(store, 'reload') as reload:
+            self.assertIn("Heat", store)
+        reload.assert_not_called()
+        self.assertEqual(store.version, other.version)
+
+    def test_lost_race_is_retried(self):
+        """Test that a write landing between re-read and append is retried."""
+        store = movie_storage.get_store()
+        other = movie_storage.MovieStore(self.temp_filename)
+        real_apply = store._apply
+        raced = []
+
+        def apply_after_other_writer(op):
+            if not raced:
+                raced.append(True)
+                other.mutate({"op": "add", "movie": {"title": "Heat", "rating": 8.3, "year": 1995}})
+            return real_apply(op)
+
+        with patch.object(store, '_apply', side_effect=apply_after_other_writer):
+            with patch.object(store.backend, 'lock', return_value=contextlib.nullcontext()):
+                movie_storage.add_movie("Alien", 8.5, 1979)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual([m["title"] for m in fresh], ["Titanic", "Heat", "Alien"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -75,6 +75,17 @@ class TestMovieDisplay(unittest.TestCase):
         # Verify an empty list is returned
         self.assertEqual(len(all_movies), 0)
     
+    def test_sorted_listing_reads_only_the_pages_shown(self):
+        """Test that the sorted listing pulls rating pages as it is read."""
+        store = movie_storage.get_store()
+        with patch.object(store, 'rating_page', wraps=store.rating_page) as page:
+            movies_by_rating = store.iter_by_rating(page_size=2)
+            self.assertEqual([next(movies_by_rating)["title"] for _ in range(2)],
+                             ["The Matrix", "Inception"])
+            self.assertEqual(page.call_count, 1)
+            self.assertEqual([movie["title"] for movie in movies_by_rating], ["Titanic"])
+            self.assertEqual(page.call_count, 2)
+
     @patch('sys.stdout', new_callable=StringIO)
     def test_list_movies_sorted_output(self, mock_stdout):
         """Test the output of list_movies_sorted function."""
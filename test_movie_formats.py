@@ -0,0 +1,104 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import movie_formats
+import movie_storage
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TestSnapshotFormats(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the snapshots
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing, with an int rating and an extra field
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9, "year": 1999},
+            {"title": "Amélie \"✓\"", "rating": 8.3, "year": 2001, "poster": None,
+             "tags": ["a", {"b": 1.5}]}
+        ]
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.temp_dir.cleanup()
+
+    def formats(self):
+        for fmt in movie_formats.SNAPSHOT_FORMATS:
+            if fmt == "jsonl-zstd" and zstandard is None:
+                continue
+            yield fmt
+
+    def write(self, movies, version, fmt):
+        with open(self.temp_filename, 'wb') as f:
+            movie_formats.write_snapshot(f, movies, version, fmt)
+
+    def test_pretty_json_matches_json_dump(self):
+        """Test that the default format is byte-identical to json.dump(indent=4)."""
+        for movies in (self.sample_movies, []):
+            self.write(movies, 7, "json")
+            with open(self.temp_filename, encoding='utf-8') as f:
+                written = f.read()
+            expected = io.StringIO()
+            json.dump({"version": 7, "movies": movies}, expected, indent=4)
+            self.assertEqual(written, expected.getvalue())
+
+    def test_round_trip_and_detection(self):
+        """Test that every format reads back the same movies and version."""
+        for fmt in self.formats():
+            self.write(self.sample_movies, 42, fmt)
+            self.assertEqual(movie_formats.detect_snapshot_format(self.temp_filename), fmt)
+            for read in (movie_formats.read_snapshot, movie_formats.load_snapshot):
+                meta = {}
+                movies = [dict(m) for m in read(self.temp_filename, meta)]
+                self.assertEqual(movies, self.sample_movies, fmt)
+                self.assertIs(type(movies[1]["rating"]), int, fmt)
+                self.assertEqual(meta.get("version"), 42, fmt)
+
+    def test_truncated_snapshot_raises(self):
+        """Test that a cut-off snapshot raises ValueError in every format."""
+        for fmt in self.formats():
+            self.write(self.sample_movies * 50, 1, fmt)
+            with open(self.temp_filename, 'r+b') as f:
+                f.truncate(os.path.getsize(self.temp_filename) // 2)
+            with self.assertRaises(ValueError, msg=fmt):
+                list(movie_formats.read_snapshot(self.temp_filename))
+            with self.assertRaises(ValueError, msg=fmt):
+                movie_formats.load_snapshot(self.temp_filename)
+
+    @unittest.skipIf(zstandard is not None, "zstandard is installed")
+    def test_zstd_without_package(self):
+        """Test that zstd snapshots need the optional zstandard package."""
+        with self.assertRaisesRegex(ValueError, "zstandard"):
+            self.write(self.sample_movies, 1, "jsonl-zstd")
+
+    def test_backend_keeps_detected_format(self):
+        """Test that a store rewrites a snapshot in the format it found."""
+        self.write(self.sample_movies, 3, "jsonl-gzip")
+        with patch('movie_storage.MOVIES_FILE', self.temp_filename):
+            store = movie_storage.MovieStore(self.temp_filename)
+            self.assertEqual(store.version, 3)
+            store.mutate({"op": "add", "movie": {"title": "Heat", "rating": 8.3, "year": 1995}})
+            store.compact()
+        self.assertEqual(movie_formats.detect_snapshot_format(self.temp_filename), "jsonl-gzip")
+        self.assertEqual([m["title"] for m in movie_storage.MovieStore(self.temp_filename)][-1], "Heat")
+
+    def test_backend_converts_format(self):
+        """Test that snapshot_format switches the encoding on the next save."""
+        movie_storage.JsonBackend(self.temp_filename).save(self.sample_movies)
+        backend = movie_storage.JsonBackend(self.temp_filename, snapshot_format="binary")
+        movies, _ = backend.load()
+        backend.save(movies, changes=0)
+        self.assertEqual(movie_formats.detect_snapshot_format(self.temp_filename), "binary")
+        self.assertEqual(movie_storage.MovieStore(self.temp_filename).movies, self.sample_movies)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import importlib.util
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import movie_search
+import movie_storage
+import movies
+
+class TestFuzzySuggestions(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "The Matrix Reloaded", "rating": 7.2, "year": 2003},
+            {"title": "Inception", "rating": 8.8, "year": 2010},
+            {"title": "Interstellar", "rating": 8.6, "year": 2014}
+        ] + [{"title": f"Filler Movie {i}", "rating": 5.0, "year": 2000} for i in range(50)]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_candidates_are_pruned(self):
+        """Test that only titles sharing trigrams with the query are scored."""
+        with patch('movie_search.fuzzy_matches', return_value=[]) as scorer:
+            movie_storage.suggest_movies("matirx")
+        titles = scorer.call_args[0][1]
+        self.assertIn("The Matrix", titles)
+        self.assertNotIn("Titanic", titles)
+        self.assertLess(len(titles), len(self.sample_movies))
+
+    def test_candidate_limit(self):
+        """Test that at most MAX_FUZZY_CANDIDATES titles are scored."""
+        with patch('movie_search.MAX_FUZZY_CANDIDATES', 5):
+            index = movie_search.TrigramIndex(
+                movie_storage.normalize_title(m["title"]) for m in self.sample_movies)
+            self.assertEqual(len(index.candidates("filler movie")), 5)
+
+    def test_best_suggestion_matches_full_scan(self):
+        """Test that pruning keeps the suggestion a full extractOne would give."""
+        from fuzzywuzzy import process
+        titles = [m["title"] for m in self.sample_movies]
+        for query in ["matirx", "titanik", "incepshun", "intersteller"]:
+            expected = process.extractOne(query, titles)
+            suggestions = movie_storage.suggest_movies(query)
+            if expected[1] > movie_search.FUZZY_CUTOFF:
+                self.assertEqual(suggestions[0][0]["title"], expected[0], query)
+            else:
+                self.assertEqual(suggestions, [], query)
+
+    def test_top_n_suggestions(self):
+        """Test that several suggestions above the cutoff are returned, best first."""
+        suggestions = movie_storage.suggest_movies("matirx", limit=2)
+        self.assertEqual([m["title"] for m, _ in suggestions],
+                         ["The Matrix", "The Matrix Reloaded"])
+        scores = [score for _, score in suggestions]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(score > movie_search.FUZZY_CUTOFF for score in scores))
+
+    def test_no_suggestion_below_cutoff(self):
+        """Test that nothing is suggested for an unrelated query."""
+        self.assertEqual(movie_storage.suggest_movies("zzzzqqq"), [])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_search_movie_prints_suggestion(self, mock_stdout):
+        """Test the 'Did you mean' output of search_movie."""
+        with patch('builtins.input', return_value="titanik"):
+            movies.search_movie()
+        self.assertIn("Did you mean: Titanic?", mock_stdout.getvalue())
+
+    @unittest.skipUnless(importlib.util.find_spec("rapidfuzz"), "rapidfuzz is not installed")
+    def test_rapidfuzz_scorer(self):
+        """Test that the C scorer is picked up when installed."""
+        with patch('movie_search._extract', None):
+            result = movie_search.fuzzy_matches("matirx", ["The Matrix", "Titanic"])
+        self.assertEqual(result[0][0], "The Matrix")
+
+if __name__ == '__main__':
+    unittest.main()
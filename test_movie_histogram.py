@@ -3,9 +3,12 @@ import json
 import os
 import tempfile
 from unittest.mock import patch, MagicMock
+import movie_histogram
+import movie_stats
 import movie_storage
 import movies
 from io import StringIO
+import subprocess
 import sys
 
 class TestMovieHistogram(unittest.TestCase):
@@ -55,16 +58,15 @@ class TestMovieHistogram(unittest.TestCase):
         mock_title.assert_called_once()
         mock_show.assert_called_once()
         
-        # Verify the data passed to hist
+        # Verify the data passed to hist: the store's bins, weighted by count
         args, kwargs = mock_hist.call_args
-        ratings = args[0]
-        
-        # Verify the ratings match our sample data
-        expected_ratings = [movie["rating"] for movie in self.sample_movies]
-        self.assertEqual(sorted(ratings), sorted(expected_ratings))
-        
-        # Verify the bins parameter
-        self.assertEqual(kwargs.get('bins', None), 10)
+        bins = movie_storage.get_store().bins
+        self.assertEqual(list(args[0]), list(bins.edges[:-1]))
+        self.assertEqual(list(kwargs['weights']), list(bins.counts))
+        self.assertEqual(sum(kwargs['weights']), len(self.sample_movies))
+
+        # Verify the bins parameter: ten bins over the rating range
+        self.assertEqual(len(kwargs['bins']), 11)
     
     @patch('matplotlib.pyplot.hist')
     @patch('matplotlib.pyplot.xlabel')
@@ -103,5 +105,105 @@ class TestMovieHistogram(unittest.TestCase):
         self.assertEqual(ratings.count(8.8), 1)  # Inception
         self.assertEqual(ratings.count(8.6), 1)  # Interstellar
 
+class TestHeadlessHistogram(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database and images
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "Perfect", "rating": 10, "year": 2000},
+            {"title": "Zero", "rating": 0, "year": 2001}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_bins_follow_changes(self):
+        """Test that the store's bin counts are updated, not recounted."""
+        store = movie_storage.get_store()
+        self.assertEqual(store.bins.counts, (1, 0, 0, 0, 0, 0, 0, 0, 1, 2))
+        self.assertEqual(store.bins.edges, tuple(float(i) for i in range(11)))
+        with patch('movie_storage.RatingBins', side_effect=AssertionError("recounted")):
+            movie_storage.add_movie("Heat", 8.3, 1995)
+            movie_storage.update_movie_rating("Perfect", 2.5)
+            movie_storage.delete_movie("Zero")
+            counts = store.bins.counts
+        self.assertEqual(counts, movie_storage.rating_bins(store).counts)
+        self.assertEqual(counts, (0, 0, 1, 0, 0, 0, 0, 0, 2, 1))
+
+    def test_bins_match_numpy(self):
+        """Test the bin edges against np.histogram over the rating range."""
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        ratings = [i / 7 for i in range(71)]
+        expected, _ = np.histogram(ratings, bins=10, range=(0, 10))
+        self.assertEqual(movie_stats.RatingBins(ratings).counts, tuple(expected.tolist()))
+
+    def test_render_is_cached(self):
+        """Test that unchanged bins return the cached bytes without drawing."""
+        bins = movie_storage.get_store().bins
+        for fmt, magic in (("png", b"\x89PNG"), ("svg", b"<?xml")):
+            image = movie_histogram.render(bins.counts, bins.edges, fmt)
+            self.assertTrue(image.startswith(magic), fmt)
+            with patch('movie_histogram._draw', side_effect=AssertionError("redrawn")):
+                self.assertIs(movie_histogram.render(bins.counts, bins.edges, fmt), image)
+        with self.assertRaises(ValueError):
+            movie_histogram.render(bins.counts, bins.edges, "gif")
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_command_saves_image(self, mock_stdout):
+        """Test `movies.py histogram -o file.svg`."""
+        path = os.path.join(self.temp_dir.name, "ratings.svg")
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["histogram", "-o", path])
+        self.assertEqual(exit_code.exception.code, 0)
+        with open(path, 'rb') as f:
+            self.assertIn(b"<svg", f.read())
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["histogram", "-o", path[:-4] + ".gif"])
+        self.assertEqual(exit_code.exception.code, 1)
+
+    def test_text_histogram_skips_matplotlib(self):
+        """Test that the text histogram never imports matplotlib."""
+        code = ("import sys, movie_storage, movies\n"
+                "movie_storage.MOVIES_FILE = sys.argv[1]\n"
+                "try:\n"
+                "    movies.main(['histogram', '--width', '10'])\n"
+                "except SystemExit:\n"
+                "    print('matplotlib' in sys.modules)\n")
+        root = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run([sys.executable, "-c", code, self.temp_filename],
+                                cwd=root, capture_output=True, text=True)
+        lines = result.stdout.splitlines()
+        self.assertEqual(lines[-1], "False", result.stderr)
+        self.assertIn("9-10 | ########## 2", lines)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_width_must_be_positive(self, mock_stderr):
+        """Test that a zero or negative width is a usage error, not a traceback."""
+        for width in ("-3", "0", "wide"):
+            with self.assertRaises(SystemExit) as exit_code:
+                movies.main(["histogram", "--width", width])
+            self.assertEqual(exit_code.exception.code, 2)
+        self.assertIn("argument --width", mock_stderr.getvalue())
+        with self.assertRaises(ValueError):
+            movie_histogram.text([1, 2], [0, 5, 10], width=0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,213 @@
+import unittest
+import random
+from bisect import bisect_left, bisect_right
+from unittest.mock import patch
+from movie_index import FenwickTree, MovieSampler, RatingIndex, SortedList, movie_filter
+from movie_record import Movie
+
+class TestSortedList(unittest.TestCase):
+    def setUp(self):
+        # Use tiny buckets so splits and merges actually happen
+        self.patcher = patch.object(SortedList, 'LOAD', 4)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_matches_sorted_builtin_list(self):
+        """Test random adds and removes against a plain sorted list."""
+        rng = random.Random(7)
+        sorted_list = SortedList(rng.randint(0, 50) for _ in range(20))
+        reference = sorted(sorted_list)
+        for _ in range(2000):
+            if reference and rng.random() < 0.4:
+                value = rng.choice(reference)
+                reference.remove(value)
+                sorted_list.remove(value)
+            else:
+                value = rng.randint(0, 50)
+                reference.append(value)
+                reference.sort()
+                sorted_list.add(value)
+            self.assertEqual(len(sorted_list), len(reference))
+            if reference:
+                middle = len(reference) // 2
+                self.assertEqual(sorted_list[middle], reference[middle])
+                self.assertEqual(sorted_list[-1], reference[-1])
+        self.assertEqual(list(sorted_list), reference)
+        self.assertEqual(list(reversed(sorted_list)), reference[::-1])
+
+    def test_bisect_and_irange(self):
+        """Test positional bisection and range iteration across buckets."""
+        values = [1, 2, 2, 2, 3, 5, 5, 8, 8, 8, 8, 9, 13]
+        sorted_list = SortedList(values)
+        for probe in range(15):
+            self.assertEqual(sorted_list.bisect_left(probe), bisect_left(values, probe))
+            self.assertEqual(sorted_list.bisect_right(probe), bisect_right(values, probe))
+            for stop in (None, probe + 3):
+                self.assertEqual(list(sorted_list.irange(probe, stop)),
+                                 [v for v in values if v >= probe and (stop is None or v < stop)])
+        self.assertEqual(list(sorted_list.irange()), values)
+
+    def test_remove_missing_raises(self):
+        """Test that removing an absent value raises ValueError."""
+        sorted_list = SortedList([1, 2, 3])
+        with self.assertRaises(ValueError):
+            sorted_list.remove(5)
+        self.assertNotIn(5, sorted_list)
+        self.assertIn(2, sorted_list)
+
+    def test_index_out_of_range(self):
+        """Test that positional access checks bounds."""
+        with self.assertRaises(IndexError):
+            SortedList()[0]
+
+class TestRatingIndex(unittest.TestCase):
+    def setUp(self):
+        # Use tiny buckets so queries cross bucket boundaries
+        self.patcher = patch.object(SortedList, 'LOAD', 4)
+        self.patcher.start()
+        rng = random.Random(9)
+        self.movies = {f"movie {i}": Movie(f"Movie {i}", rng.randint(0, 6) / 2, 2000) for i in range(40)}
+        self.index = RatingIndex(self.movies.items())
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def expected(self, reverse=True):
+        return sorted(self.movies.values(), key=lambda m: m.rating, reverse=reverse)
+
+    def test_matches_sorted_under_changes(self):
+        """Test the order against sorted() while movies come, go and change."""
+        rng = random.Random(4)
+        for step in range(300):
+            action = rng.random()
+            if action < 0.3 and self.movies:
+                key = rng.choice(list(self.movies))
+                del self.movies[key]
+                self.index.remove(key)
+            elif action < 0.6:
+                key = f"new {step}"
+                self.movies[key] = Movie(key, rng.randint(0, 6) / 2, 2000)
+                self.index.add(key, self.movies[key])
+            elif self.movies:
+                key = rng.choice(list(self.movies))
+                self.movies[key].rating = rng.randint(0, 6) / 2
+                self.index.rerate(key, self.movies[key])
+            if step % 30 == 0:
+                self.assertEqual(list(self.index), self.expected())
+        for k in (0, 1, 5, 17, 1000):
+            self.assertEqual(self.index.top_n(k), self.expected()[:k], k)
+            self.assertEqual(self.index.bottom_n(k), self.expected(reverse=False)[:k], k)
+
+    def test_between(self):
+        """Test inclusive rating ranges, open at either end."""
+        for low, high in ((1, 2), (1.5, 1.5), (None, 1), (2.5, None), (4, 9), (None, None)):
+            expected = [m for m in self.expected()
+                        if (low is None or m.rating >= low) and (high is None or m.rating <= high)]
+            self.assertEqual(self.index.between(low, high), expected, (low, high))
+
+    def test_cursor_pages(self):
+        """Test that paging returns everything once, even across changes."""
+        pages, cursor = [], None
+        while True:
+            page, cursor = self.index.page(7, cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+            if len(pages) == 2:
+                # a change behind the cursor does not shift later pages
+                first = pages[0][0]
+                self.index.remove(normalize(first.title))
+        seen = [m.title for page in pages for m in page]
+        self.assertEqual(seen, [m.title for m in self.expected()])
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(self.index.page(0), ([], None))
+
+
+def normalize(title):
+    return title.strip().lower()
+
+class TestFenwickTree(unittest.TestCase):
+    def test_matches_plain_sums(self):
+        """Test updates, appends and pops against a plain list."""
+        rng = random.Random(3)
+        reference = [rng.randint(0, 9) for _ in range(13)]
+        tree = FenwickTree(reference)
+        for _ in range(1000):
+            action = rng.random()
+            if action < 0.3:
+                value = rng.randint(0, 9)
+                reference.append(value)
+                tree.append(value)
+            elif action < 0.5 and reference:
+                self.assertEqual(tree.pop(), reference.pop())
+            elif reference:
+                i = rng.randrange(len(reference))
+                reference[i] = rng.randint(0, 9)
+                tree.set(i, reference[i])
+            end = rng.randint(0, len(reference))
+            self.assertEqual(tree.prefix(end), sum(reference[:end]))
+        self.assertEqual(tree.total(), sum(reference))
+
+    def test_find_skips_zero_weights(self):
+        """Test that every total maps to the slot it falls in."""
+        tree = FenwickTree([0, 2, 0, 0, 3, 1, 0])
+        slots = [tree.find(target) for target in range(tree.total())]
+        self.assertEqual(slots, [1, 1, 4, 4, 4, 5])
+
+class TestMovieSampler(unittest.TestCase):
+    def setUp(self):
+        # Sample movie data for testing
+        self.movies = {f"movie {i}": Movie(f"Movie {i}", i % 11, 1950 + i) for i in range(60)}
+        self.sampler = MovieSampler(self.movies.items())
+
+    def test_tracks_changes(self):
+        """Test that adds, deletes and re-ratings keep picks in sync."""
+        rng = random.Random(5)
+        for i in range(0, 60, 3):
+            self.sampler.remove(f"movie {i}")
+            del self.movies[f"movie {i}"]
+        self.movies["new"] = Movie("New", 10, 2024)
+        self.sampler.add("new", self.movies["new"])
+        self.movies["movie 1"].rating = 0
+        self.sampler.rerate("movie 1", self.movies["movie 1"])
+        self.assertEqual(len(self.sampler), len(self.movies))
+        everything = self.sampler.sample(1000, rng)
+        self.assertCountEqual([m.title for m in everything], [m.title for m in self.movies.values()])
+        weighted = self.sampler.sample(len(self.movies), rng, weighted=True)
+        self.assertEqual(len({m.title for m in weighted}), len(self.movies))
+        # zero-rated movies only come after every rated one
+        self.assertTrue(all(m.rating == 0 for m in weighted[-len(
+            [m for m in self.movies.values() if m.rating == 0]):]))
+
+    def test_weighted_frequencies(self):
+        """Test that weighted picks follow the ratings."""
+        rng = random.Random(11)
+        sampler = MovieSampler([("a", Movie("A", 1, 2000)), ("b", Movie("B", 3, 2000)),
+                                ("c", Movie("C", 0, 2000))])
+        counts = {"A": 0, "B": 0, "C": 0}
+        for _ in range(4000):
+            counts[sampler.pick(rng, weighted=True).title] += 1
+        self.assertEqual(counts["C"], 0)
+        self.assertAlmostEqual(counts["B"] / 4000, 0.75, delta=0.03)
+
+    def test_filters(self):
+        """Test filtered picks, common and rare, with and without weights."""
+        rng = random.Random(2)
+        nineties = movie_filter(start_year=1990, end_year=1999)
+        for weighted in (False, True):
+            picks = self.sampler.sample(5, rng, weighted, nineties)
+            self.assertEqual(len({m.title for m in picks}), 5)
+            self.assertTrue(all(1990 <= m.year <= 1999 for m in picks))
+            rare = self.sampler.sample(5, rng, weighted, movie_filter(min_rating=10, end_year=1990))
+            self.assertCountEqual([m.title for m in rare], ["Movie 10", "Movie 21", "Movie 32"])
+            self.assertIsNone(self.sampler.pick(rng, weighted, movie_filter(min_rating=11)))
+
+    def test_empty(self):
+        """Test picks from an empty sampler."""
+        self.assertIsNone(MovieSampler().pick())
+        self.assertEqual(MovieSampler().sample(3, weighted=True), [])
+
+if __name__ == '__main__':
+    unittest.main()
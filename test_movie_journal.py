@@ -0,0 +1,126 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import movie_storage
+
+class TestMovieJournal(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+        self.journal_filename = self.temp_filename + ".journal"
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary files
+        self.patcher.stop()
+        for path in (self.temp_filename, self.journal_filename, self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def read_snapshot(self):
+        with open(self.temp_filename) as f:
+            return json.load(f)["movies"]
+
+    def test_add_appends_to_journal(self):
+        """Test that adding a movie leaves the snapshot untouched."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        self.assertEqual(self.read_snapshot(), self.sample_movies)
+        with open(self.journal_filename) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 2)  # header + one operation
+        self.assertEqual(json.loads(lines[1])["op"], "add")
+
+    def test_journal_replayed_by_fresh_store(self):
+        """Test that a new store sees journaled changes."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        movie_storage.delete_movie("Titanic")
+        movie_storage.update_movie_rating("The Matrix", 7.5)
+
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual(fresh.movies, [
+            {"title": "The Matrix", "rating": 7.5, "year": 1999},
+            {"title": "Inception", "rating": 8.8, "year": 2010}
+        ])
+
+    def test_compact_folds_journal(self):
+        """Test that compaction writes the snapshot and drops the journal."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        movie_storage.get_store().compact()
+        self.assertFalse(os.path.exists(self.journal_filename))
+        self.assertEqual(len(self.read_snapshot()), 3)
+
+    def test_first_change_writes_snapshot(self):
+        """Test that a new database gets a snapshot rather than just a journal."""
+        os.unlink(self.temp_filename)
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        self.assertEqual(self.read_snapshot(), [{"title": "Inception", "rating": 8.8, "year": 2010}])
+        self.assertFalse(os.path.exists(self.journal_filename))
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        self.assertEqual(len(self.read_snapshot()), 1)  # later changes are journaled
+        self.assertTrue(os.path.exists(self.journal_filename))
+
+    def test_compact_without_changes_keeps_snapshot(self):
+        """Test that compacting with nothing journaled rewrites nothing."""
+        store = movie_storage.get_store()
+        store.movies
+        mtime = os.stat(self.temp_filename).st_mtime_ns
+        store.compact()
+        self.assertEqual(os.stat(self.temp_filename).st_mtime_ns, mtime)
+        self.assertFalse(os.path.exists(self.journal_filename))
+
+    def test_exit_hook_leaves_deleted_database_alone(self):
+        """Test that compacting at exit does not recreate a deleted database."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        for path in (self.temp_filename, self.journal_filename, self.temp_filename + ".lock"):
+            os.unlink(path)
+        movie_storage.get_store()._compact_at_exit()
+        for path in (self.temp_filename, self.journal_filename, self.temp_filename + ".lock"):
+            self.assertFalse(os.path.exists(path))
+
+    def test_compacts_past_threshold(self):
+        """Test that a journal larger than the threshold is compacted."""
+        with patch('movie_storage.JOURNAL_MAX_BYTES', 200):
+            for i in range(5):
+                movie_storage.add_movie(f"Movie {i}", 5.0, 2000)
+        self.assertGreater(len(self.read_snapshot()), 2)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual(len(fresh.movies), 7)
+
+    def test_stale_journal_ignored(self):
+        """Test that a journal written for an older snapshot is ignored."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies[:1]}, f)
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies[:1])
+
+    def test_torn_last_line_skipped(self):
+        """Test that a half-written trailing record does not break loading."""
+        movie_storage.add_movie("Inception", 8.8, 2010)
+        with open(self.journal_filename, 'a') as f:
+            f.write('{"op": "add", "movie": {"title": "Ha')
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual(len(fresh.movies), 3)
+
+        # The next append replaces the torn tail instead of gluing onto it
+        fresh.mutate({"op": "add", "movie": {"title": "Heat", "rating": 8.3, "year": 1995}})
+        self.assertEqual(len(movie_storage.MovieStore(self.temp_filename).movies), 4)
+
+if __name__ == '__main__':
+    unittest.main()
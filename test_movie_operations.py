@@ -28,10 +28,12 @@ class TestMovieOperations(unittest.TestCase):
             json.dump({"movies": self.sample_movies}, f)
     
     def tearDown(self):
-        # Remove the temporary file
+        # Remove the temporary file, its journal and its lock
         self.patcher.stop()
-        if os.path.exists(self.temp_filename):
-            os.unlink(self.temp_filename)
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_update_movie_rating_existing(self):
         """Test updating the rating of an existing movie."""
@@ -0,0 +1,123 @@
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import movie_output
+import movie_storage
+import movies
+
+class CountingStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+class TestBufferedOutput(unittest.TestCase):
+    def test_lines_written_in_chunks(self):
+        """Test that a long listing takes one write per OUTPUT_CHUNK lines."""
+        stream = CountingStream()
+        with patch('movie_output.OUTPUT_CHUNK', 100):
+            movie_output.write_lines((f"line {i}" for i in range(250)), stream=stream)
+        self.assertEqual(stream.writes, 3)
+        self.assertEqual(stream.getvalue().splitlines(), [f"line {i}" for i in range(250)])
+
+    def test_plain_mode_has_no_escape_codes(self):
+        """Test that turning color off empties the palette."""
+        stream = StringIO()
+        movie_output.Fore.enable(False)
+        try:
+            movie_output.write_lines(["Heat"], movie_output.Fore.YELLOW, stream)
+            self.assertEqual(movie_output.Fore.RED, "")
+        finally:
+            movie_output.Fore.enable(True)
+        self.assertEqual(stream.getvalue(), "Heat\n")
+        self.assertNotEqual(movie_output.Fore.RED, "")
+
+class TestPager(unittest.TestCase):
+    def run_pager(self, answers, count=45):
+        prompts = []
+        answers = iter(answers)
+
+        def prompt(text):
+            prompts.append(text)
+            return next(answers)
+
+        pulled = []
+
+        def lines():
+            for i in range(count):
+                pulled.append(i)
+                yield f"Movie {i}"
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            movie_output.Pager(lines(), 20, prompt=prompt).run()
+        return stdout.getvalue().splitlines(), prompts, pulled
+
+    def test_next_prev_quit(self):
+        """Test paging forward, back and quitting early."""
+        output, prompts, pulled = self.run_pager(["", "p", "n", "q"], count=100)
+        starts = [line for line in output if line in ("Movie 0", "Movie 20")]
+        self.assertEqual(starts, ["Movie 0", "Movie 20", "Movie 0", "Movie 20"])
+        self.assertEqual(len(prompts), 4)
+        # only one page past the one on screen is read ahead
+        self.assertEqual(len(pulled), 60)
+
+    def test_stops_after_last_page(self):
+        """Test that moving past the last page ends the pager."""
+        output, prompts, _ = self.run_pager(["", "", ""])
+        self.assertEqual(output[-1], "Movie 44")
+        self.assertIn("(end)", prompts[-1])
+        self.assertEqual(len(prompts), 3)
+
+    def test_single_page_does_not_prompt(self):
+        """Test that a short listing is shown without a prompt."""
+        output, prompts, _ = self.run_pager([], count=5)
+        self.assertEqual(len(output), 5)
+        self.assertEqual(prompts, [])
+
+class TestListingModes(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": [{"title": f"Movie {i}", "rating": i % 10, "year": 2000}
+                                  for i in range(50)]}, f)
+
+    def tearDown(self):
+        # Remove the temporary file
+        self.patcher.stop()
+        if os.path.exists(self.temp_filename):
+            os.unlink(self.temp_filename)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_terminal_listing_is_paged(self, mock_stdout):
+        """Test that an interactive terminal gets the pager."""
+        with patch('sys.stdin.isatty', return_value=True), \
+                patch.object(mock_stdout, 'isatty', return_value=True, create=True), \
+                patch('builtins.input', return_value="q") as answer:
+            movies.list_movies_sorted()
+        answer.assert_called_once()
+        self.assertEqual(mock_stdout.getvalue().count(" - Rating: "), movie_output.PAGE_SIZE)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_piped_listing_is_written_whole(self, mock_stdout):
+        """Test that without a terminal everything is printed without prompts."""
+        with patch('builtins.input', side_effect=AssertionError("prompted")):
+            movies.list_movies()
+        self.assertEqual(mock_stdout.getvalue().count(" - Rating: "), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import movies
 from io import StringIO
 import sys
 import random
+import movie_index
 
 class TestMovieRandom(unittest.TestCase):
     def setUp(self):
@@ -32,10 +33,12 @@ class TestMovieRandom(unittest.TestCase):
             json.dump({"movies": self.sample_movies}, f)
     
     def tearDown(self):
-        # Remove the temporary file
+        # Remove the temporary file, its journal and its lock
         self.patcher.stop()
-        if os.path.exists(self.temp_filename):
-            os.unlink(self.temp_filename)
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_pick_random_movie_internal(self):
         """Test picking a random movie internally."""
@@ -119,5 +122,21 @@ class TestMovieRandom(unittest.TestCase):
         for title, count in counts.items():
             self.assertLess(count / num_picks, 0.3, f"Movie '{title}' was picked too frequently")
 
+    def test_sampler_kept_up_to_date(self):
+        """Test that weighted and filtered picks see changes without a rebuild."""
+        rng = random.Random(1)
+        store = movie_storage.get_store()
+        store.sample(1, rng, weighted=True)
+        with patch('movie_storage.MovieSampler', side_effect=AssertionError("rebuilt")):
+            movie_storage.add_movie("Heat", 8.3, 1995)
+            movie_storage.delete_movie("Titanic")
+            movie_storage.update_movie_rating("Inception", 0)
+            titles = {m["title"] for m in store.sample(10, rng, weighted=True)}
+            self.assertEqual(titles, {"The Matrix", "Heat", "Inception"})
+            nineties = movie_index.movie_filter(start_year=1990, end_year=1999)
+            for _ in range(20):
+                self.assertIn(movie_storage.random_movie(weighted=True, where=nineties)["title"],
+                              ("The Matrix", "Heat"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+import movie_storage
+from movie_record import Movie
+
+class TestMovieRecord(unittest.TestCase):
+    def test_dict_style_access(self):
+        """Test that callers written for dicts keep working."""
+        movie = Movie("Heat", 8.3, 1995)
+        self.assertEqual(movie["title"], "Heat")
+        movie["rating"] = 9.0
+        self.assertEqual(movie.rating, 9.0)
+        self.assertEqual(movie.get("poster"), None)
+        self.assertEqual(dict(movie), {"title": "Heat", "rating": 9.0, "year": 1995})
+        self.assertEqual(movie, {"title": "Heat", "rating": 9.0, "year": 1995})
+        self.assertNotEqual(movie, {"title": "Heat", "rating": 8.3, "year": 1995})
+        with self.assertRaises(KeyError):
+            movie["poster"]
+
+    def test_extra_keys_round_trip(self):
+        """Test that unknown keys survive from_dict/to_dict."""
+        data = {"title": "Heat", "rating": 8.3, "year": 1995, "poster": "heat.jpg"}
+        movie = Movie.from_dict(data)
+        self.assertEqual(movie["poster"], "heat.jpg")
+        self.assertEqual(movie.to_dict(), data)
+
+    def test_smaller_than_dict(self):
+        """Test that a record takes less memory than the dict it replaces."""
+        data = {"title": "Heat", "rating": 8.3, "year": 1995}
+        self.assertLess(sys.getsizeof(Movie.from_dict(data)), sys.getsizeof(data))
+
+class TestStoreRecords(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999, "director": "Wachowskis"}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_store_hands_out_records(self):
+        """Test that loaded movies are Movie records equal to the file's dicts."""
+        loaded = movie_storage.load_movies()
+        self.assertTrue(all(isinstance(m, Movie) for m in loaded))
+        self.assertEqual(loaded, self.sample_movies)
+
+    def test_saved_as_plain_json(self):
+        """Test that records are written back as dicts, extra keys included."""
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        movie_storage.get_store().compact()
+        with open(self.temp_filename) as f:
+            saved = json.load(f)["movies"]
+        self.assertEqual(saved, self.sample_movies + [{"title": "Heat", "rating": 8.3, "year": 1995}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,10 +32,11 @@ class TestMovieSearch(unittest.TestCase):
             json.dump({"movies": self.sample_movies}, f)
     
     def tearDown(self):
-        # Remove the temporary file
+        # Remove the temporary files
         self.patcher.stop()
-        if os.path.exists(self.temp_filename):
-            os.unlink(self.temp_filename)
+        for path in (self.temp_filename, self.temp_filename + ".journal", self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_search_exact_match(self):
         """Test searching for a movie with an exact match."""
@@ -0,0 +1,94 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import movie_storage
+from movie_search import LRUCache
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 1, "size": 2, "maxsize": 2})
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "Inception", "rating": 8.8, "year": 2010}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_repeated_query_is_cached(self):
+        """Test that the same query, in any case, is answered from the cache."""
+        store = movie_storage.get_store()
+        with patch.object(store, 'search', wraps=store.search) as search:
+            first = movie_storage.lookup_movies("matrix")
+            second = movie_storage.lookup_movies("  MATRIX ")
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(movie_storage.search_cache_info()["hits"], 1)
+
+    def test_suggestions_are_cached(self):
+        """Test that fuzzy suggestions are only computed once per query."""
+        with patch('movie_search.fuzzy_matches', wraps=movie_storage.movie_search.fuzzy_matches) as scorer:
+            matches, suggestions = movie_storage.lookup_movies("titanik")
+            movie_storage.lookup_movies("titanik")
+        self.assertEqual(matches, [])
+        self.assertEqual(suggestions[0][0]["title"], "Titanic")
+        self.assertEqual(scorer.call_count, 1)
+
+    def test_mutations_invalidate(self):
+        """Test that adds, deletes and rating updates are visible at once."""
+        self.assertEqual(movie_storage.lookup_movies("heat")[0], [])
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        self.assertEqual([m["title"] for m in movie_storage.lookup_movies("heat")[0]], ["Heat"])
+        movie_storage.update_movie_rating("Heat", 9.9)
+        self.assertEqual(movie_storage.lookup_movies("heat")[0][0]["rating"], 9.9)
+        movie_storage.delete_movie("Heat")
+        self.assertEqual(movie_storage.lookup_movies("heat")[0], [])
+
+    def test_external_change_invalidates(self):
+        """Test that another process rewriting the file is picked up."""
+        movie_storage.lookup_movies("heat")
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": [{"title": "Heat", "rating": 8.3, "year": 1995}]}, f)
+        self.assertEqual([m["title"] for m in movie_storage.lookup_movies("heat")[0]], ["Heat"])
+
+    def test_results_are_copies(self):
+        """Test that callers mutating a result list do not corrupt the cache."""
+        matches, _ = movie_storage.lookup_movies("matrix")
+        matches.clear()
+        self.assertEqual(len(movie_storage.lookup_movies("matrix")[0]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
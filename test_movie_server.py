@@ -0,0 +1,131 @@
+import unittest
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import movie_server
+import movie_storage
+
+class TestMovieServer(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "Heat", "rating": 8.3, "year": 1995}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+        # Serve it on a free localhost port from a background event loop
+        self.server = movie_server.MovieServer(flush_interval=0.02)
+        self.loop = asyncio.new_event_loop()
+        self.host, self.port = self.loop.run_until_complete(self.server.start("127.0.0.1", 0))
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        # Stop the server, then remove the temporary directory
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+        self.loop.close()
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def request(self, method, path, payload=None, connection=None):
+        conn = connection or http.client.HTTPConnection(self.host, self.port, timeout=10)
+        body = None if payload is None else json.dumps(payload)
+        conn.request(method, path, body)
+        response = conn.getresponse()
+        data = response.read()
+        if connection is None:
+            conn.close()
+        return response.status, json.loads(data) if data else None
+
+    def test_reads(self):
+        """Test the read routes over one keep-alive connection."""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        status, stats = self.request("GET", "/stats", connection=conn)
+        self.assertEqual((status, stats["total_movies"]), (200, 3))
+        self.assertEqual(stats["highest_rated"], [self.sample_movies[1]])
+        self.assertEqual(self.request("GET", "/movies/the%20MATRIX", connection=conn),
+                         (200, self.sample_movies[1]))
+        status, found = self.request("GET", "/search?q=tita", connection=conn)
+        self.assertEqual(found["matches"], [self.sample_movies[0]])
+        status, found = self.request("GET", "/search?q=titanik", connection=conn)
+        self.assertEqual(found["suggestions"][0]["movie"]["title"], "Titanic")
+        status, movie = self.request("GET", "/random?min_rating=8.9", connection=conn)
+        self.assertEqual(movie["title"], "The Matrix")
+        # page through the listing by cursor
+        titles, cursor = [], ""
+        while cursor is not None:
+            status, page = self.request("GET", f"/movies?limit=2&cursor={cursor}",
+                                        connection=conn)
+            titles += [m["title"] for m in page["movies"]]
+            cursor = page["next"]
+        self.assertEqual(titles, ["The Matrix", "Titanic", "Heat"])
+        conn.close()
+        self.assertEqual(self.request("GET", "/movies/Alien")[0], 404)
+        self.assertEqual(self.request("GET", "/random?min_rating=9.5")[0], 404)
+        self.assertEqual(self.request("GET", "/movies?cursor=nope")[0], 400)
+        for cursor in ("nan:1", "inf:1", "-inf:0"):
+            self.assertEqual(self.request("GET", f"/movies?cursor={cursor}")[0], 400, cursor)
+        self.assertEqual(self.request("PUT", "/stats")[0], 404)
+
+    def test_writes_are_persisted(self):
+        """Test adding, updating and deleting over HTTP."""
+        new = {"title": "Alien", "rating": 8.5, "year": 1979}
+        self.assertEqual(self.request("POST", "/movies", new), (201, new))
+        self.assertEqual(self.request("POST", "/movies", new)[0], 409)
+        self.assertEqual(self.request("POST", "/movies", dict(new, year=3000))[0], 400)
+        self.assertEqual(self.request("PATCH", "/movies/heat", {"rating": 9.5}),
+                         (200, {"title": "Heat", "rating": 9.5, "year": 1995}))
+        self.assertEqual(self.request("PATCH", "/movies/Nothing", {"rating": 5})[0], 404)
+        self.assertEqual(self.request("DELETE", "/movies/Titanic"), (204, None))
+        self.assertEqual(self.request("DELETE", "/movies/Titanic")[0], 404)
+        # each response came after its write reached the disk
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual([m["title"] for m in fresh], ["The Matrix", "Heat", "Alien"])
+        self.assertEqual(fresh.get("heat")["rating"], 9.5)
+        self.assertEqual(fresh.version, 3)
+
+    def test_concurrent_writes_are_batched(self):
+        """Test that writes arriving together are saved with a few writes."""
+        def add(i):
+            return self.request("POST", "/movies", {"title": f"Movie {i}", "rating": 5,
+                                                    "year": 2000})[0]
+
+        with ThreadPoolExecutor(20) as pool:
+            self.assertEqual(set(pool.map(add, range(100))), {201})
+        self.assertLess(self.server.flushes, 100)
+        fresh = movie_storage.MovieStore(self.temp_filename)
+        self.assertEqual((len(fresh), fresh.version), (103, 100))
+
+    def test_unexpected_errors_get_a_500(self):
+        """Test that an error from the store is answered and the connection kept."""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        error = movie_storage.ConcurrentWriteError("kept changing")
+        with patch.object(self.server.store, "mutate", side_effect=error):
+            status, body = self.request("DELETE", "/movies/Heat", connection=conn)
+        self.assertEqual(status, 500)
+        self.assertIn("kept changing", body["error"])
+        self.assertEqual(self.request("GET", "/movies/Heat", connection=conn)[0], 200)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import json
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+import movie_storage
+import movies
+
+class TestMovieSqlite(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database files
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.temp_dir.name, "movies.db")
+        self.json_filename = os.path.join(self.temp_dir.name, "data.json")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.db_filename)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        store = movie_storage.get_store()
+        if isinstance(store.backend, movie_storage.SqliteBackend):
+            store.backend.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_backend_chosen_by_extension(self):
+        """Test that a .db file is opened with the SQLite backend."""
+        store = movie_storage.get_store()
+        self.assertIsInstance(store.backend, movie_storage.SqliteBackend)
+
+    def test_add_delete_update(self):
+        """Test the basic operations against SQLite."""
+        movie_storage.add_movie("Titanic", 8.5, 1997)
+        movie_storage.add_movie("The Matrix", 9.0, 1999)
+        self.assertTrue(movies.update_movie_rating("TITANIC", 7.0))
+        self.assertTrue(movie_storage.delete_movie("the matrix"))
+        self.assertFalse(movie_storage.delete_movie("Inception"))
+
+        fresh = movie_storage.MovieStore(self.db_filename)
+        self.assertEqual(fresh.movies, [{"title": "Titanic", "rating": 7.0, "year": 1997}])
+        fresh.backend.conn.close()
+
+    def test_title_index_is_unique_and_case_insensitive(self):
+        """Test that the same title in another case is rejected."""
+        movie_storage.add_movie("Titanic", 8.5, 1997)
+        conn = movie_storage.get_store().backend.conn
+        with self.assertRaises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO movies (title, title_key, rating, year) "
+                         "VALUES ('TITANIC', 'titanic', 1, 1997)")
+        self.assertFalse(movie_storage.add_movie("TITANIC", 8.5, 1997))
+        self.assertEqual(len(movie_storage.load_movies()), 1)
+
+    def test_statements_use_indexes(self):
+        """Test that title lookups are index searches, not table scans."""
+        conn = movie_storage.get_store().backend.conn
+        for sql in ("DELETE FROM movies WHERE title_key = ?",
+                    "UPDATE movies SET rating = 1 WHERE title_key = ?"):
+            plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("x",)))
+            self.assertIn("idx_movies_title_key", plan)
+
+    def test_cold_store_writes_without_reading_the_table(self):
+        """Test that a store with nothing loaded runs each change directly."""
+        other = movie_storage.MovieStore(self.db_filename)
+        other.backend.save(self.sample_movies)
+        other.backend.conn.close()
+
+        store = movie_storage.get_store()
+        statements = []
+        store.backend.conn.set_trace_callback(statements.append)
+        self.assertTrue(movie_storage.add_movie("Inception", 8.8, 2010))
+        self.assertFalse(movie_storage.add_movie("TITANIC", 1.0, 1997))
+        self.assertTrue(movie_storage.update_movie_rating("the matrix", 7.5))
+        self.assertFalse(movie_storage.delete_movie("Heat"))
+        store.backend.conn.set_trace_callback(None)
+        self.assertFalse(any(sql.startswith("SELECT") for sql in statements))
+
+        self.assertEqual(movie_storage.load_movies(), [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 7.5, "year": 1999},
+            {"title": "Inception", "rating": 8.8, "year": 2010}])
+        self.assertEqual(store.backend.conn.execute("PRAGMA user_version").fetchone()[0], 3)
+
+    def test_reload_after_other_connection_commits(self):
+        """Test that a change made by another connection is picked up."""
+        self.assertEqual(movie_storage.load_movies(), [])
+        other = movie_storage.MovieStore(self.db_filename)
+        other.mutate({"op": "add", "movie": self.sample_movies[0]})
+        other.backend.conn.close()
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies[:1])
+
+    def test_migrate_json_to_sqlite(self):
+        """Test the one-shot migration from the JSON format."""
+        with open(self.json_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies + [
+                {"title": "titanic", "rating": 1.0, "year": 1953}]}, f)
+        inserted = movie_storage.migrate_json_to_sqlite(self.json_filename, self.db_filename)
+        self.assertEqual(inserted, 2)
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies)
+
+if __name__ == '__main__':
+    unittest.main()
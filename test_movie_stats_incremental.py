@@ -0,0 +1,99 @@
+import unittest
+import json
+import os
+import random
+import tempfile
+from unittest.mock import patch
+import movie_storage
+import movie_stats
+import movies
+
+class TestIncrementalStats(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "Inception", "rating": 8.8, "year": 2010},
+            {"title": "The Room", "rating": 1, "year": 2003}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def assertConsistent(self):
+        store = movie_storage.get_store()
+        self.assertEqual(store.stats.snapshot(), movie_stats.compute_stats(store.movies))
+
+    def test_matches_full_recompute(self):
+        """Test that the running aggregates agree with a full recompute."""
+        self.assertEqual(movies.get_stats(), movie_stats.compute_stats(self.sample_movies))
+
+    def test_consistent_under_random_mutations(self):
+        """Test add/delete/update sequences against a full recompute."""
+        rng = random.Random(1234)
+        ratings = [1, 2, 5, 5.5, 7, 7.25, 8.5, 9.0, 10]
+        titles = [f"Movie {i}" for i in range(40)]
+        self.assertConsistent()
+        for _ in range(400):
+            title = rng.choice(titles)
+            action = rng.random()
+            if action < 0.45:
+                movie_storage.add_movie(title, rng.choice(ratings), 2000)
+            elif action < 0.7:
+                movie_storage.delete_movie(title)
+            else:
+                movie_storage.update_movie_rating(title, rng.choice(ratings))
+            self.assertConsistent()
+
+    def test_mode_tie_goes_to_first_seen(self):
+        """Test that ties pick the rating that appears first, like statistics.mode."""
+        movie_storage.add_movie("A", 1, 2000)
+        movie_storage.add_movie("B", 8.5, 2000)
+        self.assertEqual(movies.get_stats()["mode_rating"], 8.5)
+        movie_storage.delete_movie("Titanic")
+        self.assertEqual(movies.get_stats()["mode_rating"], 1)
+        self.assertConsistent()
+
+    def test_integer_ratings_keep_integer_results(self):
+        """Test that all-integer catalogs report integer averages like statistics.mean."""
+        movie_storage.save_movies([
+            {"title": "A", "rating": 6, "year": 2000},
+            {"title": "B", "rating": 8, "year": 2000}
+        ])
+        self.assertConsistent()
+        self.assertIsInstance(movies.get_stats()["average_rating"], int)
+
+    def test_empty_catalog(self):
+        """Test that an emptied catalog reports no stats."""
+        for movie in self.sample_movies:
+            movie_storage.delete_movie(movie["title"])
+        self.assertIsNone(movies.get_stats())
+
+    def test_stats_not_rebuilt_on_mutation(self):
+        """Test that changes update the existing aggregates in place."""
+        stats = movie_storage.get_store().stats
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        self.assertIs(movie_storage.get_store().stats, stats)
+        self.assertEqual(len(stats), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,10 +23,12 @@ class TestMovieStorage(unittest.TestCase):
         self.patcher.start()
     
     def tearDown(self):
-        # Remove the temporary file
+        # Remove the temporary file, its journal and its lock
         self.patcher.stop()
-        if os.path.exists(self.temp_filename):
-            os.unlink(self.temp_filename)
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_load_movies_empty_file(self):
         """Test loading movies from an empty file."""
@@ -0,0 +1,140 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import movie_storage
+
+class TestMovieStore(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_load_is_cached(self):
+        """Test that repeated loads do not re-read an unchanged file."""
+        store = movie_storage.get_store()
+        self.assertEqual(store.movies, self.sample_movies)
+        with patch.object(store.backend, 'load', side_effect=AssertionError("re-read")):
+            self.assertEqual(movie_storage.load_movies(), self.sample_movies)
+
+    def test_reload_on_external_change(self):
+        """Test that a file changed behind the store's back is picked up."""
+        self.assertEqual(len(movie_storage.load_movies()), 2)
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies[:1]}, f)
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies[:1])
+
+    def test_store_follows_movies_file(self):
+        """Test that patching MOVIES_FILE switches to a fresh store."""
+        store = movie_storage.get_store()
+        self.assertEqual(store.path, self.temp_filename)
+        self.assertIs(movie_storage.get_store(), store)
+
+    def test_load_returns_copy(self):
+        """Test that mutating the returned list does not touch the cache."""
+        movies = movie_storage.load_movies()
+        movies.append({"title": "Extra", "rating": 1.0, "year": 2000})
+        self.assertEqual(len(movie_storage.load_movies()), 2)
+
+    def test_writes_to_loaded_movies_do_not_reach_the_store(self):
+        """Test that editing a loaded movie leaves the store and its indexes alone."""
+        movies = movie_storage.load_movies()
+        self.assertIsNotNone(movie_storage.get_store().stats.snapshot())
+        movies[0]["rating"] = 9
+        self.assertTrue(movie_storage.update_movie_rating("Titanic", 3))
+        store = movie_storage.get_store()
+        self.assertEqual(store.get("titanic")["rating"], 3)
+        self.assertEqual(store.stats.snapshot()["lowest_rated"][0]["title"], "Titanic")
+        self.assertEqual(store.bins.counts[3], 1)
+
+    def test_records_from_the_store_are_read_only(self):
+        """Test that searches, listings and lookups cannot change the store behind its back."""
+        records = [movie_storage.search_movies("titanic")[0], next(movie_storage.iter_movies()),
+                   movie_storage.get_store().get("titanic"), movie_storage.random_movie(),
+                   movie_storage.top_rated_movies(1)[0]]
+        for movie in records:
+            with self.assertRaises(TypeError):
+                movie["rating"] = 1
+            with self.assertRaises(TypeError):
+                movie.title = "zzz"
+        self.assertTrue(movie_storage.update_movie_rating("Titanic", 3))
+        self.assertTrue(movie_storage.movie_exists("the matrix"))
+        copy = records[0].copy()
+        copy["rating"] = 1
+        self.assertEqual(movie_storage.get_store().get("titanic")["rating"], 3)
+
+    def test_failed_change_rereads_the_database(self):
+        """Test that an operation failing half-way leaves memory matching the file."""
+        with self.assertRaises(ValueError):
+            movie_storage.get_store().mutate_many([
+                {"op": "update", "title": "Titanic", "rating": 1.0},
+                {"op": "rename", "title": "The Matrix"}])
+        self.assertEqual(movie_storage.get_store().get("titanic")["rating"], 8.5)
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies)
+
+    def test_title_lookup_is_normalized(self):
+        """Test that lookups ignore case and surrounding whitespace."""
+        self.assertTrue(movie_storage.movie_exists("  titanic "))
+        self.assertFalse(movie_storage.movie_exists("Titanic 2"))
+        self.assertEqual(movie_storage.get_store().get("THE MATRIX")["year"], 1999)
+
+    def test_delete_uses_normalized_title(self):
+        """Test that delete strips the title the same way add does."""
+        self.assertTrue(movie_storage.delete_movie(" Titanic "))
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies[1:])
+
+    def test_add_duplicate_rejected(self):
+        """Test that adding an existing title is a no-op."""
+        self.assertFalse(movie_storage.add_movie("the matrix ", 1.0, 2020))
+        self.assertEqual(movie_storage.load_movies(), self.sample_movies)
+
+    def test_lookups_do_not_scan(self):
+        """Test that existence checks are served from the index."""
+        store = movie_storage.get_store()
+        store.refresh()
+        with patch('movie_storage.normalize_title', wraps=movie_storage.normalize_title) as norm:
+            store.get("Titanic")
+            movie_storage.update_movie_rating("Titanic", 7.0)
+        self.assertEqual(norm.call_count, 2)
+
+    def test_rating_index_follows_changes(self):
+        """Test top-N and paging against sorted() after mutations, without re-sorting."""
+        store = movie_storage.get_store()
+        self.assertEqual(store.top_rated(1)[0]["title"], "The Matrix")
+        with patch('movie_storage.RatingIndex', side_effect=AssertionError("rebuilt")):
+            movie_storage.add_movie("Heat", 9.5, 1995)
+            movie_storage.update_movie_rating("Titanic", 9.5)
+            self.assertEqual([m["title"] for m in movie_storage.top_rated_movies(2)], ["Titanic", "Heat"])
+            self.assertEqual(store.lowest_rated(1)[0]["title"], "The Matrix")
+            self.assertEqual([m["title"] for m in store.rated_between(9.5, 10)], ["Titanic", "Heat"])
+            page, cursor = movie_storage.movies_by_rating_page(2)
+            rest, end = movie_storage.movies_by_rating_page(2, cursor)
+        self.assertEqual(page + rest, sorted(store.movies, key=lambda m: m["rating"], reverse=True))
+        self.assertIsNone(end)
+
+if __name__ == '__main__':
+    unittest.main()
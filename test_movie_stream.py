@@ -0,0 +1,167 @@
+import unittest
+import json
+import os
+import tempfile
+import tracemalloc
+from io import StringIO
+from unittest.mock import patch
+import movie_formats
+import movie_stats
+import movie_storage
+import movies
+
+class TestIterJsonMovies(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+    def tearDown(self):
+        # Remove the temporary file
+        if os.path.exists(self.temp_filename):
+            os.unlink(self.temp_filename)
+
+    def write(self, text):
+        with open(self.temp_filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_matches_json_load_at_any_chunk_size(self):
+        """Test that records split across chunk boundaries decode correctly."""
+        data = {"version": [1, {"x": "]}"}],
+                "movies": [{"title": f"Film \"{i}\" é", "rating": i / 3, "year": 1900 + i}
+                           for i in range(40)] + [{"title": "Last", "rating": 12345678, "year": 2000}],
+                "after": None}
+        self.write(json.dumps(data, indent=4))
+        for chunk_size in (1, 2, 7, 64, 100000):
+            self.assertEqual(list(movie_formats.iter_json_movies(self.temp_filename, chunk_size)),
+                             data["movies"], chunk_size)
+
+    def test_empty_and_missing_array(self):
+        """Test documents with no movies."""
+        for text in ('{}', '{"movies": []}', ' {"other": 1} '):
+            self.write(text)
+            self.assertEqual(list(movie_formats.iter_json_movies(self.temp_filename)), [], text)
+
+    def test_malformed_raises(self):
+        """Test that broken documents raise JSONDecodeError."""
+        for text in ('', '[]', '{"movies": [{"title": "A"}', '{"movies": [1 2]}'):
+            self.write(text)
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                list(movie_formats.iter_json_movies(self.temp_filename, 4))
+
+    def test_peak_memory_below_json_load(self):
+        """Test that streaming holds far less memory than parsing it whole."""
+        self.write(json.dumps({"movies": [
+            {"title": f"Movie number {i}", "rating": 5.5, "year": 2000} for i in range(20000)]}))
+        tracemalloc.start()
+        try:
+            for _ in movie_formats.iter_json_movies(self.temp_filename):
+                pass
+            streamed = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            with open(self.temp_filename) as f:
+                json.load(f)
+            loaded = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(streamed * 5, loaded)
+
+class TestStoreStream(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing, with a duplicate title
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "titanic ", "rating": 1.0, "year": 2020},
+            {"title": "Inception", "rating": 8.8, "year": 2010}
+        ]
+
+        # Patch the MOVIES_FILE constant and stream rather than load
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+        self.low_memory = patch('movie_storage.LOW_MEMORY', True)
+        self.low_memory.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.low_memory.stop()
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_streams_without_loading(self):
+        """Test that iterating does not load the store and drops duplicates."""
+        store = movie_storage.get_store()
+        titles = [m["title"] for m in movie_storage.iter_movies()]
+        self.assertEqual(titles, ["Titanic", "The Matrix", "Inception"])
+        self.assertFalse(store.in_memory)
+        self.assertEqual(titles, [m["title"] for m in movie_storage.load_movies()])
+
+    def test_pending_journal_is_replayed(self):
+        """Test that journaled changes show up in the stream."""
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        movie_storage.get_store()._loaded = False
+        titles = [m["title"] for m in movie_storage.iter_movies()]
+        self.assertEqual(titles[-1], "Heat")
+
+    def test_stats_from_stream_match_store(self):
+        """Test that stats computed from the stream equal the store's."""
+        streamed = movies.get_stats()
+        self.assertFalse(movie_storage.get_store().in_memory)
+        self.assertEqual(streamed, movie_storage.get_store().stats.snapshot())
+        self.assertEqual(streamed, movie_stats.compute_stats(movie_storage.load_movies()))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_list_movies_streams(self, mock_stdout):
+        """Test that list_movies prints every movie without loading the store."""
+        movies.list_movies()
+        output = mock_stdout.getvalue()
+        self.assertIn("Inception (2010) - Rating: 8.8", output)
+        self.assertNotIn("2020", output)
+        self.assertFalse(movie_storage.get_store().in_memory)
+
+    def count_parses(self, reader='read_snapshot'):
+        return patch(f'movie_formats.{reader}', wraps=getattr(movie_formats, reader))
+
+    def test_stats_and_bins_cached_until_change(self):
+        """Test that repeated streaming stats and histograms parse the file once."""
+        with self.count_parses() as parse:
+            for _ in range(3):
+                self.assertEqual(movies.get_stats()["total_movies"], 3)
+                self.assertEqual(len(movies.get_rating_bins()), 3)
+        self.assertEqual(parse.call_count, 2)  # one pass each
+        self.assertFalse(movie_storage.get_store().in_memory)
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies[:2]}, f)
+        self.assertEqual(movies.get_stats()["total_movies"], 2)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_default_mode_parses_once(self, mock_stdout):
+        """Test that without LOW_MEMORY, repeated commands reuse one load."""
+        self.low_memory.stop()
+        try:
+            with self.count_parses('load_snapshot') as load, self.count_parses() as stream:
+                for _ in range(3):
+                    movies.get_stats()
+                    movies.get_rating_bins()
+                    movies.list_movies()
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual(stream.call_count, 0)  # a whole load uses json.load
+            self.assertTrue(movie_storage.get_store().in_memory)
+        finally:
+            self.low_memory.start()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import json
+import os
+import random
+import tempfile
+from unittest.mock import patch
+import movie_storage
+from movie_search import TrigramIndex
+
+class TestTrigramIndex(unittest.TestCase):
+    def brute_force(self, keys, query):
+        return [key for key in keys if query in key]
+
+    def test_matches_linear_scan(self):
+        """Test that indexed search returns exactly what a scan returns."""
+        rng = random.Random(3)
+        words = ["the", "matrix", "heat", "inception", "titanic", "ic", "room", "a"]
+        keys = list(dict.fromkeys(
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(200)))
+        index = TrigramIndex(keys)
+        for query in ["", "i", "ic", "tit", "the m", "heat room", "xyz", "matrix the", " "]:
+            self.assertEqual(index.search(query), self.brute_force(keys, query), query)
+
+    def test_removed_titles_not_returned(self):
+        """Test that deleted titles drop out and re-added ones come back last."""
+        index = TrigramIndex(["titanic", "the matrix", "titan a.e."])
+        index.remove("titanic")
+        self.assertEqual(index.search("tita"), ["titan a.e."])
+        index.add("titanic")
+        self.assertEqual(index.search("tita"), ["titan a.e.", "titanic"])
+
+    def test_rebuild_after_many_deletes(self):
+        """Test that compaction of dead entries keeps results intact."""
+        keys = [f"movie {i}" for i in range(50)]
+        index = TrigramIndex(keys)
+        for key in keys[:40]:
+            index.remove(key)
+        self.assertEqual(index.search("movie"), keys[40:])
+        self.assertEqual(len(index), 10)
+
+class TestStoreSearch(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary file for testing
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_filename = self.temp_file.name
+        self.temp_file.close()
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "The Matrix", "rating": 9.0, "year": 1999},
+            {"title": "Inception", "rating": 8.8, "year": 2010}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary file, its journal and its lock
+        self.patcher.stop()
+        for path in (self.temp_filename, self.temp_filename + ".journal",
+                     self.temp_filename + ".lock"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_search_movies(self):
+        """Test case-insensitive substring search through the store."""
+        self.assertEqual(movie_storage.search_movies("tI"),
+                         [self.sample_movies[0], self.sample_movies[2]])
+        self.assertEqual(movie_storage.search_movies("MATRIX"), [self.sample_movies[1]])
+
+    def test_index_follows_mutations(self):
+        """Test that added and deleted movies are reflected in search."""
+        self.assertEqual(movie_storage.search_movies("heat"), [])
+        movie_storage.add_movie("Heat", 8.3, 1995)
+        movie_storage.delete_movie("Titanic")
+        self.assertEqual([m["title"] for m in movie_storage.search_movies("eat")], ["Heat"])
+        self.assertEqual([m["title"] for m in movie_storage.search_movies("tit")], [])
+
+if __name__ == '__main__':
+    unittest.main()
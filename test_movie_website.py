@@ -0,0 +1,138 @@
+import unittest
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import movie_output
+import movie_storage
+import movie_website
+import movies
+
+class TestGenerateWebsite(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the database and the site
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_filename = os.path.join(self.temp_dir.name, "data.json")
+        self.site = os.path.join(self.temp_dir.name, "site")
+
+        # Sample movie data for testing
+        self.sample_movies = [
+            {"title": "Titanic", "rating": 8.5, "year": 1997},
+            {"title": "Tom & Jerry <3", "rating": 9.0, "year": 1999, "poster": "t.jpg"},
+            {"title": "Inception", "rating": 8.8, "year": 2010}
+        ]
+
+        # Patch the MOVIES_FILE constant
+        self.patcher = patch('movie_storage.MOVIES_FILE', self.temp_filename)
+        self.patcher.start()
+
+        # Initialize the file with sample data
+        with open(self.temp_filename, 'w') as f:
+            json.dump({"movies": self.sample_movies}, f)
+
+    def tearDown(self):
+        # Remove the temporary directory
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.site, name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_fills_template(self):
+        """Test that the placeholders are replaced and titles escaped."""
+        stats = movie_website.generate_website(self.site, title="Films")
+        self.assertEqual(stats, {"movies": 3, "pages": 1, "written": 2, "removed": 0})
+        page = self.read("index.html")
+        self.assertNotIn("__TEMPLATE_", page)
+        self.assertIn("<h1>Films</h1>", page)
+        self.assertIn('<div class="movie-title">Tom &amp; Jerry &lt;3</div>', page)
+        self.assertIn('<img class="movie-poster" src="t.jpg"', page)
+        self.assertLess(page.index("Titanic"), page.index("Inception"))
+        self.assertNotIn("pagination", page)
+        self.assertTrue(os.path.exists(os.path.join(self.site, "style.css")))
+
+    def test_pages_link_to_neighbours(self):
+        """Test paginated output for a larger catalog."""
+        catalog = [{"title": f"Movie {i}", "rating": 5, "year": 2000} for i in range(25)]
+        with patch('movie_website.CHUNK_SIZE', 3):
+            stats = movie_website.generate_website(self.site, catalog, page_size=10)
+        self.assertEqual(stats["pages"], 3)
+        middle = self.read("index-2.html")
+        self.assertIn('href="index.html"', middle)
+        self.assertIn('href="index-3.html"', middle)
+        self.assertEqual(middle.count("<li>"), 10)
+        self.assertIn("Movie 10<", middle)
+        self.assertNotIn("page-next", self.read("index-3.html"))
+        self.assertEqual(self.read("index-3.html").count("<li>"), 5)
+
+    def test_unchanged_pages_not_rewritten(self):
+        """Test that only pages whose content changed are written again."""
+        catalog = [{"title": f"Movie {i}", "rating": 5, "year": 2000} for i in range(25)]
+        movie_website.generate_website(self.site, catalog, page_size=10)
+        pages = sorted(name for name in os.listdir(self.site) if name != movie_website.MANIFEST_FILE)
+        inodes = {name: os.stat(os.path.join(self.site, name)).st_ino for name in pages}
+        stats = movie_website.generate_website(self.site, catalog, page_size=10)
+        self.assertEqual(stats["written"], 0)
+        # no page was replaced, and no temporary file was left behind
+        self.assertEqual(sorted(os.listdir(self.site)), sorted(pages + [movie_website.MANIFEST_FILE]))
+        self.assertEqual({name: os.stat(os.path.join(self.site, name)).st_ino for name in pages},
+                         inodes)
+        catalog[-1]["rating"] = 6
+        stats = movie_website.generate_website(self.site, catalog, page_size=10)
+        self.assertEqual(stats["written"], 1)
+        # a shrinking catalog removes the pages it no longer needs
+        stats = movie_website.generate_website(self.site, catalog[:5], page_size=10)
+        self.assertEqual((stats["pages"], stats["removed"]), (1, 2))
+        self.assertFalse(os.path.exists(os.path.join(self.site, "index-2.html")))
+
+    def test_parallel_build_is_identical(self):
+        """Test that a process pool writes the same files as one process."""
+        catalog = [{"title": f"Movie <{i}>", "rating": i % 11, "year": 1900 + i % 120}
+                   for i in range(95)]
+        catalog[7]["poster"] = "poster.jpg"
+        serial = os.path.join(self.temp_dir.name, "serial")
+        movie_website.generate_website(serial, catalog, page_size=10, workers=1)
+        stats = movie_website.generate_website(self.site, catalog, page_size=10, workers=3)
+        self.assertEqual((stats["pages"], stats["written"]), (10, 11))
+        self.assertEqual(sorted(os.listdir(serial)), sorted(os.listdir(self.site)))
+        for name in os.listdir(serial):
+            with open(os.path.join(serial, name), 'rb') as f, \
+                    open(os.path.join(self.site, name), 'rb') as g:
+                self.assertEqual(f.read(), g.read(), name)
+        # the manifest written by the pool lets the next build skip everything
+        stats = movie_website.generate_website(self.site, catalog, page_size=10, workers=3)
+        self.assertEqual(stats["written"], 0)
+
+    def test_single_page_streams_the_catalog(self):
+        """Test that page_size 0 renders movies as they are read, in chunks."""
+        catalog = ({"title": f"Movie {i}", "rating": 5, "year": 2000} for i in range(7))
+        with patch('movie_website.CHUNK_SIZE', 3):
+            stats = movie_website.generate_website(self.site, catalog, page_size=0, workers=2)
+        self.assertEqual((stats["movies"], stats["pages"]), (7, 1))
+        page = self.read("index.html")
+        self.assertEqual(page.count("<li>"), 7)
+        self.assertNotIn("pagination", page)
+
+    def test_template_needs_grid_placeholder(self):
+        """Test that a template without the grid placeholder is rejected."""
+        template = os.path.join(self.temp_dir.name, "bad.html")
+        with open(template, 'w') as f:
+            f.write("<html>__TEMPLATE_TITLE__</html>")
+        with self.assertRaises(ValueError):
+            movie_website.generate_website(self.site, template_file=template)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_command(self, mock_stdout):
+        """Test `movies.py generate_website`."""
+        with self.assertRaises(SystemExit) as exit_code:
+            movies.main(["--page-size", "20", "generate_website", "--output-dir", self.site, "--per-page", "2"])
+        self.assertEqual(exit_code.exception.code, 0)
+        self.assertIn("3 movies on 2 page(s)", mock_stdout.getvalue())
+        self.assertIn("Inception", self.read("index-2.html"))
+        # the global listing page size is not overwritten by --per-page
+        self.assertEqual(movie_output.PAGE_SIZE, 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import os
+import subprocess
+import sys
+
+# Cold `import movies` must stay under this many microseconds, as reported
+# by `python -X importtime`. Importing matplotlib.pyplot alone blows it.
+STARTUP_BUDGET_US = 300_000
+
+HEAVY_MODULES = ("matplotlib", "fuzzywuzzy", "rapidfuzz", "numpy")
+
+class TestStartupTime(unittest.TestCase):
+    def import_times(self):
+        """Return {module: cumulative microseconds} for a cold `import movies`."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import movies"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        return times
+
+    def test_heavy_modules_not_imported(self):
+        """Test that plotting, fuzzy matching and NumPy load lazily."""
+        times = self.import_times()
+        for name in times:
+            self.assertFalse(name.split(".")[0] in HEAVY_MODULES,
+                             f"{name} is imported at startup")
+
+    def test_startup_within_budget(self):
+        """Test that importing the CLI stays within the startup budget."""
+        times = self.import_times()
+        self.assertLess(times["movies"], STARTUP_BUDGET_US)
+
+if __name__ == '__main__':
+    unittest.main()